@@ -0,0 +1,62 @@
+# benchmarks/gate.py
+"""
+Percentiles and the regression gate for benchmark results.
+
+Results and baselines share one shape: {"<size>/<flow>": {"p50": s, "p95": s, "n": count}}.
+A flow regresses when its p50 or p95 exceeds the baseline by more than `threshold` (relative)
+and by more than `min_delta` seconds, so sub-millisecond noise on fast flows doesn't fail a run.
+"""
+import json
+import math
+import os
+
+# -----------------------------------------------------------------------------
+# CONSTANTS
+# -----------------------------------------------------------------------------
+DEFAULT_THRESHOLD = 0.20
+DEFAULT_MIN_DELTA = 0.05
+PERCENTILES = ("p50", "p95")
+
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of samples (fraction in 0..1)."""
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(samples):
+    return {"p50": percentile(samples, 0.50), "p95": percentile(samples, 0.95), "n": len(samples)}
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD, min_delta=DEFAULT_MIN_DELTA):
+    """Return one line per regressed percentile; flows missing from the baseline are not gated."""
+    regressions = []
+    for key, current in sorted(results.items()):
+        reference = baseline.get(key)
+        if not reference:
+            continue
+        for name in PERCENTILES:
+            allowed = reference[name] * (1 + threshold)
+            if current[name] > allowed and current[name] - reference[name] > min_delta:
+                regressions.append(
+                    f"{key} {name}: {current[name]:.3f}s vs baseline {reference[name]:.3f}s "
+                    f"(+{(current[name] / reference[name] - 1) * 100 if reference[name] else float('inf'):.0f}%)"
+                )
+    return regressions
+
+
+def load(path):
+    try:
+        with open(path) as _f:
+            return json.load(_f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save(path, results):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as _f:
+        json.dump(results, _f, indent=2, sort_keys=True)
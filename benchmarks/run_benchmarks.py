@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Time the page-object hot paths against the local stand-in site and fail on regressions.
+
+For each catalogue size (total openings over two departments) a local site is started and one
+browser session times: the home page load check, click_careers_button, select_department,
+harvesting the department's job cards, and fill_up_position_form per opening. p50/p95 per
+size and flow are compared with the baseline JSON; the run exits with status 1 when one regressed.
+
+    python -m benchmarks.run_benchmarks                        # compare with benchmarks/baseline.json
+    python -m benchmarks.run_benchmarks --update-baseline      # record a new baseline on this machine
+    python -m benchmarks.run_benchmarks --sizes 10 100 --iterations 3
+"""
+import argparse
+import datetime
+import logging
+import os
+import sys
+import time
+
+from decouple import config
+
+from benchmarks import gate
+from pages.careers_page import CareersPage
+from pages.home_page import HomePage
+from pages.position_page import PositionPage
+from utils.constants import Constant as CONST
+from utils.driver_factory import create_driver
+from utils.local_site import LocalCareersSite
+from utils.locators import CareersPageLocators
+
+logger = logging.getLogger(__name__)
+
+# -----------------------------------------------------------------------------
+# CONSTANTS
+# -----------------------------------------------------------------------------
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(PROJECT_ROOT, "benchmarks", "baseline.json")
+RESULTS_FILE = os.path.join(PROJECT_ROOT, "reports", "benchmarks", "latest.json")
+DEFAULT_SIZES = (10, 100, 1000)
+DEPARTMENT = "R&D"
+FLOWS = (
+    "check_homepage_page_loaded", "click_careers_button", "select_department",
+    "harvest_job_cards", "fill_up_position_form",
+)
+CANDIDATE_DETAILS = {
+    'first_name': CONST.TEST_FIRST_NAME, 'last_name': CONST.TEST_LAST_NAME,
+    'email': CONST.TEST_EMAIL, 'phone': CONST.TEST_PHONE,
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the page-object hot paths")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="Catalogue sizes (total openings) to run at (default: 10 100 1000)")
+    parser.add_argument("--iterations", type=int, default=5, help="Timed repetitions per flow (default: 5)")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed repetitions first (default: 1)")
+    parser.add_argument("--form-samples", type=int, default=5,
+                        help="Openings whose form is filled per size (default: 5)")
+    parser.add_argument("--latency-ms", type=int, default=0, help="Server latency injected by the local site")
+    parser.add_argument("--browser", default=config('BROWSER', default='chrome'), choices=["chrome", "firefox", "edge"])
+    parser.add_argument("--baseline", default=config('BENCHMARK_BASELINE', default=DEFAULT_BASELINE))
+    parser.add_argument("--threshold", type=float, default=gate.DEFAULT_THRESHOLD,
+                        help="Allowed relative slowdown of p50/p95 (default: 0.20)")
+    parser.add_argument("--min-delta", type=float, default=gate.DEFAULT_MIN_DELTA,
+                        help="Slowdowns smaller than this many seconds never fail (default: 0.05)")
+    parser.add_argument("--update-baseline", action="store_true", help="Write the results as the new baseline")
+    return parser.parse_args()
+
+
+def timed(samples, func, *args, **kwargs):
+    start_time = time.perf_counter()
+    result = func(*args, **kwargs)
+    samples.append(time.perf_counter() - start_time)
+    return result
+
+
+def run_size(size, args):
+    """Time every flow against a site with `size` openings; returns {"<size>/<flow>": summary}."""
+    site = LocalCareersSite(departments=2, openings=max(1, size // 2), latency_ms=args.latency_ms, closed_every=0)
+    url = site.start()
+    os.environ["CONNECTEAM_URL"] = url
+    session_id = f"benchmark_{size}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+    driver = create_driver(args.browser, session_id)
+    samples = {flow: [] for flow in FLOWS}
+    try:
+        home_page = HomePage(driver)
+        careers_page = CareersPage(driver)
+        position_page = PositionPage(driver)
+        job_cards_locator = CareersPageLocators(param=DEPARTMENT).RND_JOB_CARDS
+
+        job_cards = []
+        for iteration in range(args.warmup + args.iterations):
+            # Warm-up rounds are timed into a throwaway dict
+            target = samples if iteration >= args.warmup else {flow: [] for flow in FLOWS}
+            driver.get(url)
+            timed(target["check_homepage_page_loaded"], home_page.check_homepage_page_loaded)
+            timed(target["click_careers_button"], home_page.click_careers_button)
+            timed(target["select_department"], careers_page.select_department, DEPARTMENT)
+            job_cards = timed(target["harvest_job_cards"], careers_page.harvest, *job_cards_locator)
+
+        for job_card in job_cards[:args.form_samples]:
+            driver.get(job_card["url"])
+            position_page.wait_for_page_load()
+            timed(samples["fill_up_position_form"], position_page.fill_up_position_form,
+                  CANDIDATE_DETAILS, card_number=job_card["index"], card_url=job_card["href"])
+            driver.switch_to.default_content()
+    finally:
+        driver.quit()
+        site.stop()
+    return {f"{size}/{flow}": gate.summarize(values) for flow, values in samples.items() if values}
+
+
+def main():
+    args = parse_args()
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    results = {}
+    for size in args.sizes:
+        print(f"Benchmarking with {size} openings...")
+        results.update(run_size(size, args))
+
+    gate.save(RESULTS_FILE, results)
+    baseline = gate.load(args.baseline)
+    print(f"\n{'flow':<40} {'p50':>8} {'p95':>8} {'base p50':>9} {'base p95':>9}")
+    for key, summary in sorted(results.items(), key=lambda item: (int(item[0].split('/')[0]), item[0])):
+        reference = baseline.get(key, {})
+        print(f"{key:<40} {summary['p50']:8.3f} {summary['p95']:8.3f} "
+              f"{reference.get('p50', float('nan')):9.3f} {reference.get('p95', float('nan')):9.3f}")
+    print(f"\nResults written to {RESULTS_FILE}")
+
+    if args.update_baseline:
+        gate.save(args.baseline, results)
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+    if not baseline:
+        print(f"No baseline at {args.baseline}; run with --update-baseline to record one")
+        return 0
+
+    regressions = gate.compare(results, baseline, args.threshold, args.min_delta)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print(f"\nNo regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,7 @@
 import time
 import logging
-import decouple
+import allure
 
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.common.exceptions import (
     TimeoutException, 
     StaleElementReferenceException,
@@ -14,7 +13,10 @@ from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.common.by import By
-BASE_URL = decouple.config('CONNECTEAM_URL')
+
+from utils import artifacts, deadline, navigation, resource_policy, settle, site, table_watch, tracing, wait_engine
+from utils.deadline import DeadlineWait
+from utils.tracing import traced
 LOGGER = logging.getLogger(__name__)
 
 # -----------------------------------------------------------------------------
@@ -25,17 +27,112 @@ DEFAULT_TIMEOUT = 30
 SHORT_TIMEOUT = 10
 LONG_TIMEOUT = 60
 
+# In-page element lookup shared by the bulk scripts below: arguments[0] is 'css' or 'xpath',
+# arguments[1] the selector.
+_MATCH_ELEMENTS_JS = """
+function matchElements(kind, selector) {
+    if (kind === 'xpath') {
+        var result = document.evaluate(selector, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        var nodes = [];
+        for (var i = 0; i < result.snapshotLength; i++) { nodes.push(result.snapshotItem(i)); }
+        return nodes;
+    }
+    return Array.prototype.slice.call(document.querySelectorAll(selector));
+}
+"""
+
+# Compact record per matched element, collected in a single WebDriver round trip
+HARVEST_SCRIPT = _MATCH_ELEMENTS_JS + """
+return matchElements(arguments[0], arguments[1]).map(function (element, index) {
+    var row = element.closest('[role="row"]');
+    var holder = element.closest('[data-department]');
+    return {
+        index: index,
+        text: (element.innerText || element.textContent || '').trim(),
+        href: element.getAttribute('href'),
+        url: element.href || null,
+        department: holder ? holder.getAttribute('data-department') : null,
+        row_index: row && row.parentElement ? Array.prototype.indexOf.call(row.parentElement.children, row) : -1,
+        visible: !!(element.offsetWidth || element.offsetHeight || element.getClientRects().length)
+    };
+});
+"""
+
+# Scroll to and click the match with the expected href (falling back to the index) in one round trip
+CLICK_MATCH_SCRIPT = _MATCH_ELEMENTS_JS + """
+var elements = matchElements(arguments[0], arguments[1]);
+var expectedHref = arguments[3];
+var target = elements[arguments[2]];
+if (expectedHref !== null && (!target || target.getAttribute('href') !== expectedHref)) {
+    target = elements.filter(function (element) { return element.getAttribute('href') === expectedHref; })[0];
+}
+if (!target) { return false; }
+target.scrollIntoView(true);
+target.click();
+return true;
+"""
+
+# [index, element] of the first [kind, selector, state] check with a match in that state
+# ('present', 'visible' or 'clickable'), or null, in one round trip
+ELEMENT_STATE_SCRIPT = _MATCH_ELEMENTS_JS + """
+function inState(element, state) {
+    if (state === 'present') { return true; }
+    var visible = !!(element.offsetWidth || element.offsetHeight || element.getClientRects().length)
+        && window.getComputedStyle(element).visibility !== 'hidden';
+    return state === 'visible' ? visible : visible && !element.disabled;
+}
+var checks = arguments[0];
+for (var i = 0; i < checks.length; i++) {
+    var state = checks[i][2];
+    var matches = matchElements(checks[i][0], checks[i][1]).filter(function (element) {
+        return inState(element, state);
+    });
+    if (matches.length) { return [i, matches[0]]; }
+}
+return null;
+"""
+
+# [token, generation] of the MutationObserver watching the table that holds the matches, or null
+TABLE_WATCH_SCRIPT = _MATCH_ELEMENTS_JS + table_watch.WATCH_SCRIPT
+
+# Running these keeps the page ready as far as utils/navigation.py is concerned
+navigation.read_only(HARVEST_SCRIPT, ELEMENT_STATE_SCRIPT, TABLE_WATCH_SCRIPT, resource_policy.PAGE_WEIGHT_SCRIPT)
+
 class BasePage(object):
     """
     Base class for all page objects in the framework.
     Provides common methods for interacting with pages.
     """
-    def __init__(self, driver, base_url=BASE_URL):
-        self.base_url = base_url
+    def __init__(self, driver, base_url=None, deferred=None):
+        self.base_url = base_url or site.base_url()
         self.driver = driver
         self.timeout = DEFAULT_TIMEOUT
+        # DeferredAllure recorder when this page object is driven from a worker thread
+        self.deferred = deferred
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
 
+    def step(self, title):
+        """Allure step context; recorded for later replay when the page object is deferred."""
+        if self.deferred is not None:
+            return self.deferred.step(title)
+        return allure.step(title)
+
+    def attach(self, body, name, attachment_type):
+        """Attach to the Allure report, or to the deferred recorder."""
+        if self.deferred is not None:
+            self.deferred.attach(body, name, attachment_type)
+        else:
+            allure.attach(body, name=name, attachment_type=attachment_type)
+
+    @traced(category=tracing.SCREENSHOT)
+    def attach_screenshot(self, name, kind=artifacts.STEP):
+        """
+        Take a screenshot for the report; it is written and attached off this thread
+        (see utils/artifacts.py). kind is artifacts.STEP or artifacts.ERROR, for SCREENSHOT_POLICY.
+        A failed capture is only logged.
+        """
+        return artifacts.capture(self.driver, name, kind, recorder=self.deferred) is not None
+
     def find_element(self, *locator):
         """Find an element with appropriate error handling."""
         try:
@@ -47,13 +144,96 @@ class BasePage(object):
     def find_elements(self, *locator):
         """Find multiple elements with appropriate error handling."""
         try:
+            start_time = time.monotonic()
             elements = self.driver.find_elements(*locator)
+            if not elements:
+                wait_engine.record_negative(f"find_elements {locator}", time.monotonic() - start_time, 0)
             self.logger.debug(f"Found {len(elements)} elements with locator: {locator}")
             return elements
         except NoSuchElementException as e:
             self.logger.error(f"No elements found with locator: {locator}")
             return []
 
+    @traced
+    def harvest(self, *locator):
+        """
+        Return a snapshot of every element matching locator as a list of dicts
+        (index, text, href, url, department, row_index, visible) using one execute_script
+        instead of a WebDriver round trip per element and attribute.
+        """
+        kind, selector = self._script_selector(*locator)
+        records = self.driver.execute_script(HARVEST_SCRIPT, kind, selector) or []
+        self.logger.debug(f"Harvested {len(records)} elements with locator: {locator}")
+        return records
+
+    @traced
+    def click_harvested(self, *locator, index, expected_href=None):
+        """
+        Scroll to and click a harvested element in one round trip.
+        When expected_href is given and the element at index no longer has it,
+        the match with that href is clicked instead. Returns False if nothing matched.
+        """
+        kind, selector = self._script_selector(*locator)
+        return bool(self.driver.execute_script(CLICK_MATCH_SCRIPT, kind, selector, index, expected_href))
+
+    def table_generation(self, *locator):
+        """
+        (token, generation) of the table holding the elements matching locator, watched by an in-page
+        MutationObserver installed on first call (see utils/table_watch.py); None when nothing matches.
+        Equal values mean the table's rows and links have not changed in between.
+        """
+        kind, selector = self._script_selector(*locator)
+        try:
+            generation = self.driver.execute_script(TABLE_WATCH_SCRIPT, kind, selector)
+        except WebDriverException as e:
+            self.logger.debug(f"Could not read the table generation: {e.__class__.__name__}")
+            return None
+        return tuple(generation) if generation else None
+
+    @staticmethod
+    def _script_selector(by, value):
+        """Translate a Selenium locator into ('css' | 'xpath', selector) for in-page scripts."""
+        if by == By.XPATH:
+            return "xpath", value
+        if by == By.ID:
+            return "css", f'[id={BasePage._css_string(value)}]'
+        if by == By.NAME:
+            return "css", f'[name={BasePage._css_string(value)}]'
+        if by == By.CLASS_NAME:
+            return "css", f".{value}"
+        if by == By.LINK_TEXT:
+            return "xpath", f'//a[normalize-space(.)={BasePage._xpath_string(value)}]'
+        if by == By.PARTIAL_LINK_TEXT:
+            return "xpath", f'//a[contains(., {BasePage._xpath_string(value)})]'
+        return "css", value
+
+    @staticmethod
+    def _css_string(value):
+        """Quoted CSS string for value, with backslashes and double quotes escaped."""
+        return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+    @staticmethod
+    def _xpath_string(value):
+        """XPath string literal for value; XPath has no escapes, so mixed quotes go through concat()."""
+        if '"' not in value:
+            return f'"{value}"'
+        if "'" not in value:
+            return f"'{value}'"
+        return "concat(" + ", '\"', ".join(f'"{part}"' for part in value.split('"')) + ")"
+
+    def _wait_for_state(self, locator, state, timeout, label):
+        """
+        Explicit-mode wait: poll ELEMENT_STATE_SCRIPT, with backoff, until an element matching locator
+        is in state and return it. Each poll is one round trip whatever the state.
+        """
+        checks = [[*self._script_selector(*locator), state]]
+
+        def element_in_state(driver):
+            match = driver.execute_script(ELEMENT_STATE_SCRIPT, checks)
+            return match[1] if match else None
+        return wait_engine.poll(self.driver, element_in_state, timeout, label)
+
+    @traced
     def open(self, url):
         """Open a URL, handling potential errors."""
         try:
@@ -81,6 +261,7 @@ class BasePage(object):
             self.logger.error(f"Failed to get current URL: {str(e)}")
             return ""
 
+    @traced
     def hover(self, *locator):
         """Hover over an element with error handling and retries."""
         max_attempts = 3
@@ -94,37 +275,86 @@ class BasePage(object):
             except (StaleElementReferenceException, NoSuchElementException) as e:
                 if attempt < max_attempts - 1:
                     self.logger.warning(f"Retry {attempt+1}/{max_attempts} hovering over element: {locator}")
-                    time.sleep(1)
+                    deadline.sleep(1)
                 else:
                     self.logger.error(f"Failed to hover over element after {max_attempts} attempts: {str(e)}")
                     raise e
 
+    @traced(category=tracing.WAIT)
     def wait_element(self, *locator, timeout=None):
         """Wait for an element to be present with robust error handling."""
         timeout = timeout or self.timeout
         try:
             self.logger.debug(f"Waiting for element: {locator} (timeout: {timeout}s)")
-            element = WebDriverWait(self.driver, timeout).until(
+            if wait_engine.explicit():
+                return self._wait_for_state(locator, wait_engine.PRESENT, timeout, "BasePage.wait_element")
+            element = DeadlineWait(self.driver, timeout).until(
                 EC.presence_of_element_located(locator)
             )
             return element
         except TimeoutException:
             self.logger.error(f"Element not found within {timeout} seconds: {locator}")
             # Take screenshot for debugging
-            try:
-                screenshot_path = f"screenshots/element_not_found_{time.time()}.png"
-                self.driver.save_screenshot(screenshot_path)
-                self.logger.info(f"Screenshot saved to {screenshot_path}")
-            except Exception as e:
-                self.logger.warning(f"Could not take screenshot: {str(e)}")
+            self.attach_screenshot(f"Element_Not_Found_{locator[1]}", artifacts.ERROR)
             raise TimeoutException(f"Element not found within {timeout} seconds: {locator}")
 
+    @traced(category=tracing.WAIT)
+    def wait_any(self, outcomes, timeout=None, visible=False, poll_frequency=0.1):
+        """
+        Wait for whichever of several outcomes shows up first and return its name.
+        outcomes maps a name to a locator tuple or to a callable(driver) returning truthy; they are
+        checked in order on every poll, all locators in a single script so no implicit wait applies.
+        With visible=True a locator only matches a visible element.
+        Raises TimeoutException naming every outcome when none appears within timeout.
+        """
+        timeout = timeout or self.timeout
+        names = list(outcomes)
+        checks = []
+        for name in names:
+            if callable(outcomes[name]):
+                checks.append(None)
+            else:
+                kind, selector = self._script_selector(*outcomes[name])
+                checks.append([kind, selector, wait_engine.VISIBLE if visible else wait_engine.PRESENT])
+        script_checks = [check for check in checks if check is not None]
+        script_names = [name for name, check in zip(names, checks) if check is not None]
+
+        def first_outcome(driver):
+            try:
+                if script_checks:
+                    match = driver.execute_script(ELEMENT_STATE_SCRIPT, script_checks)
+                    if match:
+                        return script_names[match[0]]
+                for name, check in zip(names, checks):
+                    if check is None and outcomes[name](driver):
+                        return name
+            except (StaleElementReferenceException, NoSuchElementException):
+                pass
+            except WebDriverException as e:
+                # The page navigated between polls; try again on the next one
+                self.logger.debug(f"wait_any poll failed: {e.__class__.__name__}")
+            return False
+
+        self.logger.debug(f"Waiting for any of {names} (timeout: {timeout}s)")
+        try:
+            outcome = DeadlineWait(self.driver, timeout, poll_frequency=poll_frequency).until(first_outcome)
+        except TimeoutException:
+            self.logger.error(f"None of {names} appeared within {timeout} seconds")
+            raise TimeoutException(f"None of {names} appeared within {timeout} seconds")
+        self.logger.debug(f"wait_any matched '{outcome}'")
+        return outcome
+
+    @traced(category=tracing.WAIT)
     def wait_for_element_visible(self, *locator, timeout=None):
         """Wait for an element to be visible on the page."""
         timeout = timeout or self.timeout
         try:
             self.logger.debug(f"Waiting for element to be visible: {locator} (timeout: {timeout}s)")
-            element = WebDriverWait(self.driver, timeout).until(
+            if wait_engine.explicit():
+                return self._wait_for_state(
+                    locator, wait_engine.VISIBLE, timeout, "BasePage.wait_for_element_visible"
+                )
+            element = DeadlineWait(self.driver, timeout).until(
                 EC.visibility_of_element_located(locator)
             )
             return element
@@ -132,12 +362,17 @@ class BasePage(object):
             self.logger.error(f"Element not visible within {timeout} seconds: {locator}")
             raise TimeoutException(f"Element not visible within {timeout} seconds: {locator}")
 
+    @traced(category=tracing.WAIT)
     def wait_for_element_clickable(self, *locator, timeout=None):
         """Wait for an element to be clickable."""
         timeout = timeout or self.timeout
         try:
             self.logger.debug(f"Waiting for element to be clickable: {locator} (timeout: {timeout}s)")
-            element = WebDriverWait(self.driver, timeout).until(
+            if wait_engine.explicit():
+                return self._wait_for_state(
+                    locator, wait_engine.CLICKABLE, timeout, "BasePage.wait_for_element_clickable"
+                )
+            element = DeadlineWait(self.driver, timeout).until(
                 EC.element_to_be_clickable(locator)
             )
             return element
@@ -145,18 +380,34 @@ class BasePage(object):
             self.logger.error(f"Element not clickable within {timeout} seconds: {locator}")
             raise TimeoutException(f"Element not clickable within {timeout} seconds: {locator}")
 
+    @property
+    def navigation(self):
+        """URL, load generation and readiness of this session's page (see utils/navigation.py)."""
+        return navigation.state(self.driver)
+
+    def page_settled(self, call_site):
+        """True when the page is still the one the last page-load wait saw settle; the caller need not wait."""
+        return navigation.settled(self.driver, call_site)
+
+    @traced(category=tracing.WAIT)
     def wait_for_page_load(self, timeout=LONG_TIMEOUT):
         """
         Wait for the page to be fully loaded.
         This method uses document.readyState to determine if the page is complete.
+        Returns at once when the page has not changed since it was last seen loaded and settled.
         """
         try:
+            if self.page_settled("BasePage.wait_for_page_load"):
+                return True
             self.logger.debug(f"Waiting for page to load (timeout: {timeout}s)")
-            WebDriverWait(self.driver, timeout).until(
-                lambda d: d.execute_script("return document.readyState") == "complete"
-            )
+            if self.navigation.ready_state != "complete":
+                DeadlineWait(self.driver, timeout).until(
+                    lambda d: d.execute_script(navigation.READY_STATE_SCRIPT) == "complete"
+                )
+            resource_policy.record_page(self.driver)
             # Additional wait for AJAX requests to complete
-            time.sleep(1)
+            if self.settle("BasePage.wait_for_page_load", legacy_sleep=1):
+                navigation.loaded(self.driver)
             self.logger.debug("Page fully loaded")
             return True
         except TimeoutException:
@@ -166,6 +417,47 @@ class BasePage(object):
             self.logger.error(f"Error waiting for page load: {str(e)}")
             return False
 
+    @traced(category=tracing.WAIT)
+    def settle(self, call_site, legacy_sleep=None, timeout=None, quiet_ms=settle.QUIET_MS):
+        """
+        Wait until the page is quiet: document complete, no fetch/XHR in flight and no DOM
+        mutation, scrolling or animation for quiet_ms. Returns as soon as that is true.
+        legacy_sleep is the fixed sleep this call replaces; it doubles as the default cap,
+        so a page that never goes quiet costs no more than the old sleep did.
+        Returns True if the page settled before the cap.
+        """
+        timeout = deadline.clamp(timeout or legacy_sleep or settle.DEFAULT_TIMEOUT, call_site)
+        start_time = time.monotonic()
+        if settle.MODE == "sleep" and legacy_sleep:
+            tracing.sleep(min(legacy_sleep, timeout))
+            settle.record(call_site, time.monotonic() - start_time, legacy_sleep, True)
+            deadline.charge(call_site, time.monotonic() - start_time)
+            return True
+
+        try:
+            result = self.driver.execute_async_script(
+                settle.SETTLE_SCRIPT, quiet_ms, int(timeout * 1000), settle.POLL_MS
+            )
+            settled = bool(result and result.get("settled"))
+            if not settled:
+                self.logger.debug(f"{call_site}: page not quiet after {timeout}s ({result})")
+        except WebDriverException as e:
+            # The document went away mid-wait (navigation); the new one still has to finish loading
+            self.logger.debug(f"{call_site}: settle interrupted ({e.__class__.__name__}), waiting for readyState")
+            remaining = max(timeout - (time.monotonic() - start_time), 0.1)
+            try:
+                DeadlineWait(self.driver, remaining).until(
+                    lambda d: d.execute_script(navigation.READY_STATE_SCRIPT) == "complete"
+                )
+                settled = True
+            except (TimeoutException, WebDriverException):
+                settled = False
+
+        settle.record(call_site, time.monotonic() - start_time, legacy_sleep or 0, settled)
+        deadline.charge(call_site, time.monotonic() - start_time)
+        return settled
+
+    @traced
     def safe_click(self, *locator, timeout=None):
         """
         Safely click an element with retries and waits.
@@ -183,7 +475,7 @@ class BasePage(object):
             except (StaleElementReferenceException, NoSuchElementException, WebDriverException) as e:
                 if attempt < max_attempts - 1:
                     self.logger.warning(f"Retry {attempt+1}/{max_attempts} clicking element: {locator}")
-                    time.sleep(1)
+                    deadline.sleep(1)
                 else:
                     self.logger.error(f"Failed to click element after {max_attempts} attempts: {str(e)}")
                     # Try JavaScript click as a fallback
@@ -196,22 +488,29 @@ class BasePage(object):
                         self.logger.error(f"JavaScript click also failed: {str(js_error)}")
                         raise e
 
+    @traced(category=tracing.WAIT)
     def is_element_present(self, *locator, timeout=SHORT_TIMEOUT):
         """Check if an element is present on the page."""
+        start_time = time.monotonic()
         try:
             self.wait_element(*locator, timeout=timeout)
             return True
         except (TimeoutException, NoSuchElementException):
+            wait_engine.record_negative(f"is_element_present {locator}", time.monotonic() - start_time, timeout)
             return False
 
+    @traced(category=tracing.WAIT)
     def is_element_visible(self, *locator, timeout=SHORT_TIMEOUT):
         """Check if an element is visible on the page."""
+        start_time = time.monotonic()
         try:
             self.wait_for_element_visible(*locator, timeout=timeout)
             return True
         except (TimeoutException, NoSuchElementException):
+            wait_engine.record_negative(f"is_element_visible {locator}", time.monotonic() - start_time, timeout)
             return False
 
+    @traced
     def safe_send_keys(self, *locator, text, clear_first=True, timeout=None):
         """Safely send keys to an element with proper waits and error handling."""
         timeout = timeout or self.timeout
@@ -226,6 +525,7 @@ class BasePage(object):
             self.logger.error(f"Failed to send keys to element: {str(e)}")
             raise e
 
+    @traced
     def safe_get_text(self, *locator, timeout=None):
         """Safely get text from an element with proper waits and error handling."""
         timeout = timeout or self.timeout
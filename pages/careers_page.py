@@ -6,9 +6,6 @@ import logging
 
 from selenium.webdriver.remote.remote_connection import LOGGER
 
-import utils.helpers
-from utils.helpers import *
-from utils.constants import Constant as CONST
 # Third-party imports -----------------------------------------------
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.action_chains import ActionChains
@@ -21,24 +18,43 @@ from pages.base_page import BasePage
 from pages.position_page import PositionPage
 from utils.locators import CareersPageLocators, HomePageLocators
 from utils.decorators import time_func
+from utils.tracing import traced
+from utils import application_results, artifacts, checkpoint, resource_monitor, site, table_watch
+from utils.application_results import OpeningResult
+from utils.deferred_allure import DeferredAllure
+from utils.driver_factory import create_driver
+from utils.driver_pool import DriverPool
+from concurrent.futures import ThreadPoolExecutor
+from decouple import config
 
 
 timeout = 60
+# Visit each opening's URL directly instead of clicking it and returning to the careers page
+DIRECT_URLS = config('DIRECT_URLS', default=False, cast=bool)
+# Number of extra browser sessions used to apply to a department's openings in parallel (1 = sequential)
+OPENINGS_POOL_SIZE = config('OPENINGS_POOL_SIZE', default=1, cast=int)
 # -----------------------------------------------------------------------------
 class CareersPage(BasePage):
-    def __init__(self, driver):
+    def __init__(self, driver, deferred=None, driver_factory=None):
         self.locator = CareersPageLocators
-        super().__init__(driver)  # Python3 version
-        self.position_page = PositionPage(driver)
+        super().__init__(driver, deferred=deferred)  # Python3 version
+        self.position_page = PositionPage(driver, deferred=deferred)
+        # Launches the extra sessions for concurrent applications: factory(session_id) -> WebDriver
+        self.driver_factory = driver_factory
         self.logger = logging.getLogger(__name__)
         LOGGER = self.logger
 
     @time_func
     # @allure.step("Apply to all the openings in the selected department")
-    def apply_to_all_the_openings_per_department(self, department_name, candidate_details):
+    def apply_to_all_the_openings_per_department(self, department_name, candidate_details, direct_urls=DIRECT_URLS,
+                                                  pool_size=OPENINGS_POOL_SIZE):
         """Apply to all the openings in the selected department
-        This test will apply to all the openings in the selected department"""
+        This test will apply to all the openings in the selected department.
+        With direct_urls the department is filtered once and each opening URL is visited directly;
+        with pool_size > 1 the opening URLs are spread over that many extra browser sessions.
+        Returns an OpeningResult per opening."""
         ELEMENT = CareersPageLocators(param=department_name)
+        results = []
         try:
             self.logger.info("Trying to search for jobs with R&D in the title")
             # Wait for page to be fully loaded after selection
@@ -46,43 +62,51 @@ class CareersPage(BasePage):
             
             # Use our enhanced wait methods
             with allure.step(f"Finding job cards for {department_name}"):
-                # Use find_elements with better error handling
-                rnd_job_cards = self.find_elements(*ELEMENT.RND_JOB_CARDS)
-                self.logger.info(f"Found {len(rnd_job_cards)} job cards on the page")
+                # One round trip for text/href of every card; the loop below works off this snapshot
+                job_cards = self.harvest(*ELEMENT.RND_JOB_CARDS)
+                self.logger.info(f"Found {len(job_cards)} job cards on the page")
                 
                 # Take screenshot for debugging
-                try:
-                    screenshot = self.driver.get_screenshot_as_png()
-                    allure.attach(
-                        screenshot,
-                        name=f"{department_name}_Jobs_Found",
-                        attachment_type=allure.attachment_type.PNG
-                    )
-                except Exception as e:
-                    self.logger.warning(f"Could not take screenshot: {e}")
+                self.attach_screenshot(f"{department_name}_Jobs_Found")
             
-            # Process each job card
-            for i in range(len(rnd_job_cards)):
-                # Re-find elements to avoid stale references in parallel execution
+            if direct_urls or pool_size > 1:
+                openings = [job_card for job_card in job_cards if job_card["text"] == "Apply now"]
+                if pool_size > 1:
+                    return self.apply_to_openings_concurrently(department_name, openings, candidate_details, pool_size)
+                return self.apply_to_openings(department_name, openings, candidate_details)
+
+            # Process each job card; the table generation tells whether the harvested cards are still valid
+            pending = list(job_cards)
+            seen = {job_card["href"] for job_card in job_cards}
+            generation = self.job_table_generation(department_name)
+            retried = set()
+            while pending:
+                job_card = pending.pop(0)
+                i = job_card["index"]
+                start_time = time.monotonic()
+                if job_card["text"] == "Apply now" and self._already_done(department_name, job_card):
+                    results.append(self._skipped_result(department_name, job_card))
+                    continue
                 try:
-                    rnd_job_cards = self.find_elements(*ELEMENT.RND_JOB_CARDS)
-                    if i >= len(rnd_job_cards):
-                        self.logger.warning(f"Job card index {i} is out of range. Total cards: {len(rnd_job_cards)}")
-                        break
-                        
-                    self.logger.info(f"Job card {i}: {rnd_job_cards[i].text}")
+                    self.logger.info(f"Job card {i}: {job_card['text']}")
                     
                     # Process card if it has "Apply now" text
-                    if rnd_job_cards[i].text == "Apply now":
+                    if job_card["text"] == "Apply now":
+                        current = self.job_table_generation(department_name)
+                        if current != generation:
+                            # The table changed (or the page was reloaded): re-resolve the cards, not the page
+                            job_card = self._reresolve_job_cards(department_name, job_card, pending, seen, results)
+                            generation = current
+                            if job_card is None or job_card["text"] != "Apply now":
+                                continue
+                            i = job_card["index"]
                         with allure.step(f"Processing job card {i} with 'Apply now'"):
-                            # Get the URL safely
-                            card_url = utils.helpers.get_element_attributes_info(
-                                self.driver, element=rnd_job_cards[i], attribute='href'
-                            )
+                            card_url = job_card["href"]
                             self.logger.info(f"Found URL in job card: {card_url}")
                             
-                            # Scroll and click with enhanced method
-                            scroll_to_element_and_click(self.driver, rnd_job_cards[i])
+                            # Scroll and click in a single script, matched by href in case the table changed
+                            if not self.click_harvested(*ELEMENT.RND_JOB_CARDS, index=i, expected_href=card_url):
+                                raise NoSuchElementException(f"Job card {i} with URL {card_url} is no longer on the page")
                             
                             # Wait for page load and verify URL
                             self.wait_for_page_load()
@@ -94,12 +118,17 @@ class CareersPage(BasePage):
 
                             # Fill the application form
                             self.logger.info("\n=== Step 4: Filling Out Application Form ===")
-                            self.position_page.fill_up_position_form(candidate_details, card_number=i, card_url=card_url)
+                            filled = self.position_page.fill_up_position_form(candidate_details, card_number=i, card_url=card_url)
+                            self._finish(results, OpeningResult(
+                                department_name, i, card_url,
+                                application_results.APPLIED if filled else application_results.CLOSED,
+                                duration=time.monotonic() - start_time
+                            ))
 
                             # Go back to careers page
                             with allure.step("Returning to careers page"):
-                                self.driver.get(CONST.CAREERS_PAGE)
-                                self.logger.info(f"Navigated back to {CONST.CAREERS_PAGE}")
+                                self.driver.get(site.careers_url())
+                                self.logger.info(f"Navigated back to {site.careers_url()}")
                                 # Wait for careers page to load
                                 self.wait_for_page_load()
                                 
@@ -108,20 +137,34 @@ class CareersPage(BasePage):
                     else:
                         self.logger.info("Job card has no 'Apply now' text on page")
                 except (StaleElementReferenceException, NoSuchElementException) as e:
+                    # Indexes move when cards are re-resolved; the URL identifies the opening
+                    finished = bool(results) and results[-1].url == job_card["href"]
+                    if not finished and job_card["href"] not in retried \
+                            and self.job_table_generation(department_name) is not None:
+                        # The table is still here: re-resolve the card on the next pass instead of reloading
+                        self.logger.warning(f"Job card {i} went stale ({e.__class__.__name__}); re-resolving it in place")
+                        table_watch.record(retried=1)
+                        retried.add(job_card["href"])
+                        pending.insert(0, job_card)
+                        generation = None
+                        continue
                     self.logger.warning(f"Element became stale or disappeared during processing: {e}")
+                    self._record_failure(results, department_name, job_card, start_time, e)
                     # Try to recover by refreshing the department selection
                     try:
-                        self.driver.get(CONST.CAREERS_PAGE)
+                        table_watch.record(reloads=1)
+                        self.driver.get(site.careers_url())
                         self.wait_for_page_load()
                         self.select_department(department_name)
                     except Exception as recover_error:
                         self.logger.error(f"Could not recover from stale element: {recover_error}")
                 except NoSuchWindowException as e:
                     self.logger.error(f"Window was closed unexpectedly: {e}")
+                    self._record_failure(results, department_name, job_card, start_time, e)
                     # Try to recover by creating a new window
                     try:
                         self.driver.switch_to.window(self.driver.window_handles[0])
-                        self.driver.get(CONST.CAREERS_PAGE)
+                        self.driver.get(site.careers_url())
                         self.wait_for_page_load()
                         self.select_department(department_name)
                     except Exception as window_error:
@@ -129,32 +172,196 @@ class CareersPage(BasePage):
                         raise e
                 except Exception as e:
                     self.logger.error(f"Error processing job card {i}: {e}")
+                    self._record_failure(results, department_name, job_card, start_time, e)
                     # Take screenshot for debugging
-                    try:
-                        screenshot = self.driver.get_screenshot_as_png()
-                        allure.attach(
-                            screenshot,
-                            name=f"Error_Job_Card_{i}",
-                            attachment_type=allure.attachment_type.PNG
-                        )
-                    except Exception as screenshot_error:
-                        self.logger.warning(f"Could not take error screenshot: {screenshot_error}")
+                    self.attach_screenshot(f"Error_Job_Card_{i}", artifacts.ERROR)
+
+            self.report_results(department_name, results)
+            return results
 
         except Exception as e:
             self.logger.error(f"Error in clicking job card: {e}")
             # Take screenshot for debugging
-            try:
-                screenshot = self.driver.get_screenshot_as_png()
-                allure.attach(
-                    screenshot,
-                    name="Error_Department_Processing",
-                    attachment_type=allure.attachment_type.PNG
-                )
-            except Exception as screenshot_error:
-                self.logger.warning(f"Could not take error screenshot: {screenshot_error}")
+            self.attach_screenshot("Error_Department_Processing", artifacts.ERROR)
             raise e
 
 
+    @traced
+    def apply_to_openings(self, department_name, openings, candidate_details):
+        """Apply to harvested openings by visiting each URL directly.
+        A failing opening is recorded and the remaining ones are still processed."""
+        results = []
+        self.logger.info(f"Applying directly to {len(openings)} {department_name} openings")
+        for job_card in openings:
+            results.append(self.apply_to_opening(department_name, job_card, candidate_details))
+        self.report_results(department_name, results)
+        return results
+
+    @traced
+    def apply_to_openings_concurrently(self, department_name, openings, candidate_details, pool_size=OPENINGS_POOL_SIZE):
+        """Apply to harvested openings from a thread pool, each thread driving its own browser session.
+        Allure steps and screenshots are recorded per opening and replayed on the test thread
+        in opening order, followed by one combined summary for the department."""
+        pool_size = max(1, min(pool_size, len(openings)))
+        factory = self.driver_factory or (
+            lambda session_id: create_driver(config('BROWSER', default='chrome'), session_id)
+        )
+        pool = DriverPool(factory, size=pool_size, max_uses=max(1, len(openings)),
+                          max_rss=resource_monitor.RECYCLE_BYTES)
+        recorders = {job_card["index"]: DeferredAllure() for job_card in openings}
+        self.logger.info(f"Applying to {len(openings)} {department_name} openings with {pool_size} browser sessions")
+
+        start_time = time.monotonic()
+        try:
+            with ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="opening") as executor:
+                futures = [
+                    executor.submit(
+                        self._apply_in_pooled_session, pool, department_name, job_card,
+                        candidate_details, recorders[job_card["index"]]
+                    )
+                    for job_card in openings
+                ]
+                results = [future.result() for future in futures]
+        finally:
+            pool.shutdown()
+        wall_time = time.monotonic() - start_time
+
+        for job_card in openings:
+            recorders[job_card["index"]].replay()
+        self.report_results(department_name, results, wall_time=wall_time)
+        return results
+
+    @traced
+    def _apply_in_pooled_session(self, pool, department_name, job_card, candidate_details, recorder):
+        """Worker-thread body: borrow a session, apply to one opening, give the session back."""
+        start_time = time.monotonic()
+        session = result = None
+        try:
+            session = pool.acquire()
+            page = CareersPage(session.driver, deferred=recorder)
+            result = page.apply_to_opening(department_name, job_card, candidate_details)
+        except Exception as e:
+            self.logger.error(f"Error processing job card {job_card['index']} in a pooled session: {e}")
+            result = self._failed_result(department_name, job_card, start_time, e)
+            self._checkpoint(result)
+        finally:
+            if session is not None:
+                try:
+                    pool.release(session, failed=result is None or result.status == application_results.FAILED,
+                                 rss=resource_monitor.session_rss(session.driver))
+                except Exception as release_error:
+                    # The opening's result stands whatever happens to the session it ran in
+                    self.logger.warning(f"Could not release the session of job card {job_card['index']}: "
+                                        f"{release_error}")
+        return result
+
+    @traced
+    def apply_to_opening(self, department_name, job_card, candidate_details):
+        """Open one harvested opening by URL and fill its form and return an OpeningResult.
+        Errors are recorded in the result; only a browser window that can't be recovered is raised.
+        Openings already completed in a resumed run are skipped."""
+        if self._already_done(department_name, job_card):
+            return self._skipped_result(department_name, job_card)
+        result = self._open_and_fill(department_name, job_card, candidate_details)
+        self._checkpoint(result)
+        return result
+
+    def _open_and_fill(self, department_name, job_card, candidate_details):
+        i = job_card["index"]
+        card_url = job_card["href"]
+        start_time = time.monotonic()
+        try:
+            with self.step(f"Processing job card {i} with 'Apply now'"):
+                self.driver.get(job_card["url"] or card_url)
+                self.wait_for_page_load()
+                current_url = self.get_url()
+                self.logger.info(f"Current URL: {current_url}")
+                assert card_url in current_url, f"Expected URL: {card_url}, but got: {current_url}"
+
+                filled = self.position_page.fill_up_position_form(candidate_details, card_number=i, card_url=card_url)
+                status = application_results.APPLIED if filled else application_results.CLOSED
+                return OpeningResult(department_name, i, card_url, status, duration=time.monotonic() - start_time)
+        except Exception as e:
+            self.logger.error(f"Error processing job card {i}: {e}")
+            self.attach_screenshot(f"Error_Job_Card_{i}", artifacts.ERROR)
+            if isinstance(e, NoSuchWindowException):
+                # Keep going in the remaining window
+                try:
+                    self.driver.switch_to.window(self.driver.window_handles[0])
+                except Exception as window_error:
+                    self.logger.error(f"Could not recover from closed window: {window_error}")
+                    raise e
+            return self._failed_result(department_name, job_card, start_time, e)
+
+    def report_results(self, department_name, results, wall_time=None):
+        """Log the per-department summary and attach it to the Allure report."""
+        summary = application_results.format_summary(department_name, results, wall_time=wall_time)
+        self.logger.info(f"Application summary:\n{summary}")
+        allure.attach(summary, name=f"{department_name}_Application_Summary", attachment_type=allure.attachment_type.TEXT)
+
+    def job_table_generation(self, department_name):
+        """(token, generation) of the job table holding the department's cards, None when it isn't on the page."""
+        table_watch.record(checks=1)
+        return self.table_generation(*CareersPageLocators(param=department_name).RND_JOB_CARDS)
+
+    def _reresolve_job_cards(self, department_name, job_card, pending, seen, results):
+        """
+        Harvest the department's cards again after the table changed and bring job_card and pending up to
+        date, matched by href: cards new to the table are queued, cards gone from it are recorded (and checkpointed) as closed.
+        Returns the fresh job_card, or None when it is gone.
+        """
+        table_watch.record(reresolved=1)
+        fresh = {card["href"]: card for card in self.harvest(*CareersPageLocators(param=department_name).RND_JOB_CARDS)}
+        queued = [job_card] + pending
+        for card in queued:
+            if card["href"] not in fresh and card["text"] == "Apply now":
+                self.logger.warning(f"Job card {card['index']} ({card['href']}) is no longer in the table")
+                table_watch.record(gone=1)
+                self._finish(results, OpeningResult(department_name, card["index"], card["href"],
+                                                    application_results.CLOSED, error="no longer on the careers page"))
+        added = [card for href, card in fresh.items() if href not in seen]
+        seen.update(card["href"] for card in added)
+        pending[:] = [fresh[card["href"]] for card in pending if card["href"] in fresh] + added
+        self.logger.info(f"Job table changed: re-resolved {len(fresh)} cards, {len(added)} new")
+        return fresh.get(job_card["href"])
+
+    def _record_failure(self, results, department_name, job_card, start_time, error):
+        # An opening already recorded as applied stays applied if returning to the careers page fails
+        if results and results[-1].index == job_card["index"]:
+            return
+        self._finish(results, self._failed_result(department_name, job_card, start_time, error))
+
+    def _finish(self, results, result):
+        results.append(result)
+        self._checkpoint(result)
+
+    def _already_done(self, department_name, job_card):
+        store = checkpoint.active()
+        if store is not None and store.is_done(department_name, job_card["href"]):
+            self.logger.info(f"Skipping job card {job_card['index']}: completed earlier in run {store.run_id}")
+            return True
+        return False
+
+    @staticmethod
+    def _checkpoint(result):
+        # Every opening's result passes through here once, whichever way it was processed
+        resource_monitor.opening_processed()
+        store = checkpoint.active()
+        if store is not None and result.status != application_results.SKIPPED:
+            store.record(result)
+
+    @staticmethod
+    def _skipped_result(department_name, job_card):
+        return OpeningResult(department_name, job_card["index"], job_card["href"], application_results.SKIPPED)
+
+    @staticmethod
+    def _failed_result(department_name, job_card, start_time, error):
+        return OpeningResult(
+            department_name, job_card["index"], job_card["href"], application_results.FAILED,
+            duration=time.monotonic() - start_time, error=f"{error.__class__.__name__}: {error}"
+        )
+
+    @traced
     @allure.step("Select {department_name} department")
     def select_department(self, department_name):
         ELEMENT = CareersPageLocators(param=department_name)
@@ -173,7 +380,7 @@ class CareersPage(BasePage):
                 department_filter.click()
                 self.logger.info("Clicked on department filter dropdown")
                 # Short wait for dropdown to open
-                time.sleep(1)
+                self.settle("CareersPage.select_department:dropdown", legacy_sleep=1)
 
             # Step 2: Find and select the department option with enhanced methods
             with allure.step(f"Selecting {department_name} option"):
@@ -186,31 +393,15 @@ class CareersPage(BasePage):
                 self.logger.info(f"Selected {department_name} option from dropdown")
             
             # Wait for filter to be applied
-            time.sleep(2)
+            self.settle("CareersPage.select_department:filter", legacy_sleep=2)
             
             # Take screenshot after selecting the department
-            try:
-                screenshot = self.driver.get_screenshot_as_png()
-                allure.attach(
-                    screenshot,
-                    name=f"Selected_{department_name}_Department",
-                    attachment_type=allure.attachment_type.PNG
-                )
-                self.logger.info(f"Screenshot of {department_name} department selection attached to Allure report")
-            except Exception as screenshot_error:
-                self.logger.error(f"Error attaching screenshot to Allure report: {screenshot_error}")
+            if self.attach_screenshot(f"Selected_{department_name}_Department"):
+                self.logger.info(f"Screenshot of {department_name} department selection queued for the Allure report")
             
             return True
         except Exception as e:
             self.logger.error(f"Error in department selection: {e}")
             # Take screenshot for error debugging
-            try:
-                screenshot = self.driver.get_screenshot_as_png()
-                allure.attach(
-                    screenshot,
-                    name=f"Error_Selecting_{department_name}",
-                    attachment_type=allure.attachment_type.PNG
-                )
-            except Exception as screenshot_error:
-                self.logger.warning(f"Could not take error screenshot: {screenshot_error}")
+            self.attach_screenshot(f"Error_Selecting_{department_name}", artifacts.ERROR)
             raise e
\ No newline at end of file
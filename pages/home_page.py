@@ -1,16 +1,15 @@
-import time
 import allure
 import logging
-from utils.decorators import time_func
+from utils.decorators import retry, time_func
+from utils.deadline import DeadlineWait
+from utils.tracing import traced
 from selenium.webdriver.remote.remote_connection import LOGGER
-from utils.constants import Constant as CONST
-from retry import retry
+from utils import site
 from selenium.common.exceptions import NoSuchElementException
 
 # Third-party imports -----------------------------------------------
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.action_chains import ActionChains
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
 from utils.locators import CareersPageLocators, HomePageLocators
@@ -23,9 +22,9 @@ from utils.locators import HomePageLocators
 timeout = 60
 
 class HomePage(BasePage):
-    def __init__(self, driver):
+    def __init__(self, driver, deferred=None):
         self.locator = HomePageLocators
-        super().__init__(driver)  # Python3 version
+        super().__init__(driver, deferred=deferred)  # Python3 version
         self.logger = logging.getLogger(__name__)
         LOGGER = self.logger
 
@@ -34,20 +33,24 @@ class HomePage(BasePage):
     @retry(tries=2, delay=2, exceptions=TimeoutException)
     @allure.step("Checking home page is loaded")
     def check_homepage_page_loaded(self, timeout=10):
-        """Wait for the page to finish loading by checking the document ready state and the presence of an embedded part."""
-        try:
-            WebDriverWait(self.driver, timeout).until(
-                lambda d: d.execute_script('return document.readyState') == 'complete'
-            )
+        """Wait for the page to finish loading by checking the document ready state and the presence of an embedded part.
+        The ready-state wait is skipped when the page has not changed since it was last seen loaded."""
+        if self.page_settled("HomePage.check_homepage_page_loaded"):
             LOGGER.info("Home page has finished loading.")
-
-        except TimeoutException as e:
-            LOGGER.error("Timed out waiting for page to load or embedded part to be present.")
-            raise e
-        finally:
-            # Print the current document.readyState
-            ready_state = self.driver.execute_script('return document.readyState')
-            LOGGER.info(f"Current document.readyState: {ready_state}")
+        else:
+            try:
+                DeadlineWait(self.driver, timeout).until(
+                    lambda d: d.execute_script('return document.readyState') == 'complete'
+                )
+                LOGGER.info("Home page has finished loading.")
+
+            except TimeoutException as e:
+                LOGGER.error("Timed out waiting for page to load or embedded part to be present.")
+                raise e
+            finally:
+                # Print the current document.readyState
+                ready_state = self.driver.execute_script('return document.readyState')
+                LOGGER.info(f"Current document.readyState: {ready_state}")
         try:
             title = self.get_title()
             LOGGER.info(f"Checking page title: {title}")
@@ -60,19 +63,21 @@ class HomePage(BasePage):
 
 
 
+    @traced
     def scroll_to_footer(self):
         """Scroll down to the bottom of the page to make footer visible"""
         try:
             # Scroll down to the bottom of the page
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
             # Wait for scroll to complete
-            time.sleep(3)
+            self.settle("HomePage.scroll_to_footer", legacy_sleep=3)
             LOGGER.info("Scrolled to footer")
             return True
         except Exception as e:
             LOGGER.error(f"Error scrolling to footer: {e}")
             return False
 
+    @traced
     @retry(tries=3, delay=2, exceptions=NoSuchElementException)
     @allure.step("Clicking on the careers button")
     def click_careers_button(self):
@@ -83,7 +88,7 @@ class HomePage(BasePage):
         
         try:
             # Try to find the careers button
-            careers_button = WebDriverWait(self.driver, timeout).until(
+            careers_button = DeadlineWait(self.driver, timeout).until(
                 EC.element_to_be_clickable(ELEMENT.CAREERS_BUTTON)
             )
             
@@ -101,8 +106,8 @@ class HomePage(BasePage):
             # If the URL doesn't contain 'careers', try again
             if "careers" not in current_url:
                 LOGGER.info("First click didn't work, trying direct navigation...")
-                self.driver.get(CONST.CAREERS_PAGE)
-                time.sleep(2)
+                self.driver.get(site.careers_url())
+                self.settle("HomePage.click_careers_button", legacy_sleep=2)
                 current_url = self.get_url()
                 LOGGER.info(f"Current URL after direct navigation: {current_url}")
 
@@ -112,16 +117,8 @@ class HomePage(BasePage):
             # Check if the URL contains 'careers'
             assert "careers" in current_url, "Navigation to careers page failed"
 
-            try:
-                screenshot = self.driver.get_screenshot_as_png()
-                allure.attach(
-                    screenshot,
-                    name=f"Careers_Page_Before_Selection",
-                    attachment_type=allure.attachment_type.PNG
-                )
-                LOGGER.info(f"Screenshot of Careers_Page_Before_Selection attached to Allure report")
-            except Exception as screenshot_error:
-                LOGGER.error(f"Error attaching screenshot to Allure report: {screenshot_error}")
+            if self.attach_screenshot("Careers_Page_Before_Selection"):
+                LOGGER.info("Screenshot of Careers_Page_Before_Selection queued for the Allure report")
 
             return current_url
             
@@ -1,13 +1,9 @@
-import allure
 import time
 import os
 import platform
 import utils.helpers
 from utils.helpers import *
-from selenium.webdriver.common.by import By
 from utils.constants import Constant as CONST
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.remote.remote_connection import LOGGER
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.support import expected_conditions as EC
@@ -16,26 +12,38 @@ from selenium.common.exceptions import TimeoutException, NoSuchElementException
 # Our own imports ---------------------------------------------------
 from pages.base_page import BasePage
 from utils.locators import PositionPageLocators
+from utils.tracing import traced
+from utils.deadline import DeadlineWait
 
 wait_time = 60
+# Some open positions show the job search label too: a page showing it counts as closed only when no
+# form follows within this many seconds
+FORM_GRACE = 5
+# Outcomes of opening a position page, see check_page_loaded / fill_up_position_form
+FORM = "form"
+EMBEDDED = "embedded"
+CLOSED = "closed"
+ERROR = "error"
 
 class PositionPage(BasePage):
-    def __init__(self, driver):
+    def __init__(self, driver, deferred=None):
         self.locator = PositionPageLocators
-        super().__init__(driver)  # Python3 version
+        super().__init__(driver, deferred=deferred)  # Python3 version
         self.logger = logging.getLogger(__name__)
         LOGGER = self.logger
 
     # @allure.step("apply to all the openings in the selected department")
+    @traced
     def fill_up_position_form(self, candidate_details=None, card_number=None, card_url=None):
         ELEMENT = PositionPageLocators()
-        """Apply to all the openings in the selected department"""
+        """Apply to all the openings in the selected department
+        Returns True when the form was filled, False when the position is no longer available"""
 
         # Dynamically update the Allure step name
-        with allure.step(f"Applying to job card {card_number} with URL end with: {card_url.split('/')[-1]}"):
+        with self.step(f"Applying to job card {card_number} with URL end with: {card_url.split('/')[-1]}"):
 
-            # verify page finished loading
-            self.check_page_loaded()
+            # verify page finished loading; a closed or broken position is already known here
+            page_state = self.check_page_loaded()
             # get candidate details
             # first_name = candidate_details['first_name']
             # last_name = candidate_details['last_name']
@@ -43,9 +51,16 @@ class PositionPage(BasePage):
             # phone = candidate_details['phone']
 
             ELEMENT = PositionPageLocators()
+            outcome = self.form_outcome(page_state)
+            if outcome == CLOSED:
+                # handling the case when the position is no longer available
+                LOGGER.info("Position is no longer available")
+                return False
+            assert outcome != ERROR, f"Position page shows an error page: {self.get_url()}"
+
             try:
                 LOGGER.info("Trying to fill up the position form")
-                WebDriverWait(self.driver, wait_time).until(
+                DeadlineWait(self.driver, wait_time).until(
                     EC.frame_to_be_available_and_switch_to_it(ELEMENT.POSITION_FORM_IFRAME)
                 )
 
@@ -66,30 +81,45 @@ class PositionPage(BasePage):
                 cv_field = wait_until_css_visible(self.driver, wait_time, ELEMENT.POSITION_FORM_CV_INPUT)
                 cv_field.send_keys(cv_path)
                 LOGGER.info("Resume/CV uploaded successfully")
-                time.sleep(3)
+                self.settle("PositionPage.fill_up_position_form:cv_upload", legacy_sleep=3)
                 #TODO -  self.validate_cv_upload_in_the_ui()
                 #Taking screenshot of careers page before selection
-                screenshot = self.driver.get_screenshot_as_png()
-                allure.attach(
-                    screenshot,
-                    name="position_form filled up with candidate details",
-                    attachment_type=allure.attachment_type.PNG)
-            except TimeoutException as e:
-                # handling the case when the position is no longer available
-                if wait_until_css_visible(self.driver, wait_time, ELEMENT.POSITION_FORM_SEARCH):
-                    LOGGER.info("Position is no longer available")
-                else:
-                    raise e
-
+                self.attach_screenshot("position_form filled up with candidate details")
+                return True
             except Exception as e:
                 LOGGER.error(f"Error filling up position form {e}")
                 raise e
 
+    def form_outcome(self, page_state=None, timeout=wait_time):
+        """
+        FORM, CLOSED or ERROR for the open position page, given what check_page_loaded() returned.
+        The form wins over the closed-position search label; the label alone means CLOSED only once
+        FORM_GRACE seconds pass without a form.
+        """
+        ELEMENT = PositionPageLocators()
+        if page_state == ERROR:
+            return ERROR
+        if page_state != CLOSED:
+            # Form iframe, error page or closed-position search: whichever shows up first
+            page_state = self.wait_any({
+                FORM: ELEMENT.POSITION_FORM_IFRAME,
+                ERROR: ELEMENT.POSITION_ERROR_PAGE,
+                CLOSED: ELEMENT.POSITION_FORM_SEARCH,
+            }, timeout=timeout)
+        if page_state != CLOSED:
+            return page_state
+        give_up = time.monotonic() + FORM_GRACE
+        return self.wait_any({
+            FORM: ELEMENT.POSITION_FORM_IFRAME,
+            CLOSED: lambda driver: time.monotonic() >= give_up,
+        }, timeout=FORM_GRACE + 1)
+
+    @traced
     def validate_cv_upload_in_the_ui(self):
         """Validate if CV upload was successful in the ui"""
         ELEMENT = PositionPageLocators()
         try:
-            element = WebDriverWait(self.driver, wait_time).until(
+            element = DeadlineWait(self.driver, wait_time).until(
                 EC.visibility_of_element_located(ELEMENT.POSITION_FORM_CV_VALIDATION)
             )
             assert element.text == CONST.CV_FILE_NAME
@@ -97,20 +127,26 @@ class PositionPage(BasePage):
             print(f"Element with CSS selector '{ELEMENT.POSITION_FORM_CV_VALIDATION}' not found after {wait_time} seconds.")
             return None
 
+    @traced
     def check_page_loaded(self, timeout=10):
-        """Wait for the page to finish loading by checking the document ready state and the presence of an embedded part."""
+        """Wait for the page to finish loading by checking the document ready state and the presence of an embedded part.
+        Returns EMBEDDED, CLOSED or ERROR for whichever the page showed first, or None on timeout."""
+        ELEMENT = PositionPageLocators()
         try:
-            WebDriverWait(self.driver, timeout).until(
+            DeadlineWait(self.driver, timeout).until(
                 lambda d: d.execute_script('return document.readyState') == 'complete'
             )
             LOGGER.info("Page has finished loading.")
 
-            # Wait for the embedded part to be present
-            WebDriverWait(self.driver, timeout).until(
-                EC.presence_of_element_located((By.CLASS_NAME, "job__embedded-wrapper"))
-            )
+            # Wait for the embedded part, or for a sign that there won't be one
+            return self.wait_any({
+                EMBEDDED: ELEMENT.POSITION_EMBEDDED_WRAPPER,
+                ERROR: ELEMENT.POSITION_ERROR_PAGE,
+                CLOSED: ELEMENT.POSITION_FORM_SEARCH,
+            }, timeout=timeout)
         except TimeoutException:
             LOGGER.info("Timed out waiting for page to load or embedded part to be present.")
+            return None
         finally:
             # Print the current document.readyState
             ready_state = self.driver.execute_script('return document.readyState')
@@ -12,6 +12,9 @@ import logging
 import datetime
 from pathlib import Path
 
+from utils import autoscale, profile_manager
+from utils.checkpoint import latest_run_id, new_run_id
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -20,6 +23,15 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def parallel_count(value):
+    """--parallel value: a worker count, or 'auto'."""
+    if value == "auto":
+        return value
+    try:
+        return int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a number of workers or 'auto', got {value!r}")
+
 def parse_args():
     """Parse command line arguments."""
     parser = argparse.ArgumentParser(description="Run Selenium tests with parametrization")
@@ -32,16 +44,18 @@ def parse_args():
     
     parser.add_argument(
         "--parallel", 
-        type=int, 
+        type=parallel_count, 
         default=0,
-        help="Number of parallel processes (0 for sequential, default: 0)"
+        help="Number of parallel processes (0 for sequential, default: 0); 'auto' picks it from the "
+             "memory one browser session takes, free memory and cores, and adjusts it between batches"
     )
     
     parser.add_argument(
         "--dist-mode", 
-        choices=["each", "loadfile", "loadscope"], 
+        choices=["each", "load", "loadfile", "loadscope", "longest"], 
         default="loadfile",
-        help="Distribution mode for pytest-xdist (default: loadfile)"
+        help="Distribution mode for pytest-xdist; 'longest' is load with the slowest tests "
+             "dispatched first, from the recorded duration history (default: loadfile)"
     )
     
     parser.add_argument(
@@ -63,6 +77,21 @@ def parse_args():
         help="Skip cleanup of temporary browser profiles"
     )
     
+    parser.add_argument(
+        "--run-id",
+        default=None,
+        help="Checkpoint finished openings under this run ID (default: a new timestamped ID)"
+    )
+    
+    parser.add_argument(
+        "--resume",
+        nargs="?",
+        const="latest",
+        default=None,
+        metavar="RUN_ID",
+        help="Resume a previous run, skipping openings it already completed (default: the latest run)"
+    )
+    
     parser.add_argument(
         "--markers", 
         default="nondestructive",
@@ -76,39 +105,39 @@ def ensure_directory_exists(directory_path):
     Path(directory_path).mkdir(parents=True, exist_ok=True)
     logger.info(f"Ensured directory exists: {directory_path}")
 
-def run_tests(args):
-    """Run the tests with the specified configuration."""
-    # Create timestamp for report naming
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    
-    # Ensure report directory exists
-    ensure_directory_exists(args.report_dir)
-    
-    # Build the command
-    cmd = ["python3", "-m", "pytest", f"tests/{args.test}"]
+def build_command(args, workers, report_path, tests=None):
+    """pytest command line for the given worker count; tests (node IDs) replace the test file."""
+    cmd = ["python3", "-m", "pytest"] + (tests or [f"tests/{args.test}"])
     
     # Add parallelism if specified
-    if args.parallel > 0:
-        cmd.extend(["-n", str(args.parallel), f"--dist={args.dist_mode}"])
-    
-    # Add browser configuration
-    os.environ["BROWSER"] = args.browser
+    if workers > 0:
+        if args.dist_mode == "longest":
+            cmd.extend(["-n", str(workers), "--dist=load", "--longest-first"])
+        else:
+            cmd.extend(["-n", str(workers), f"--dist={args.dist_mode}"])
+    
+    # Add checkpointing so an interrupted run can be resumed
+    if args.resume:
+        cmd.append("--resume")
+        if args.resume != "latest":
+            cmd.extend(["--run-id", args.resume])
+    else:
+        cmd.extend(["--run-id", args.run_id])
     
     # Add markers
     if args.markers:
         cmd.extend(["-m", args.markers])
     
     # Add HTML report
-    report_path = f"{args.report_dir}/report_{timestamp}.html"
     cmd.extend(["--html", report_path, "--self-contained-html"])
     
     # Add verbose output
     cmd.append("-v")
-    
-    # Log the command
+    return cmd
+
+def run_command(cmd, report_path):
+    """Run one pytest command and return its exit code."""
     logger.info(f"Running command: {' '.join(cmd)}")
-    
-    # Run the command
     try:
         process = subprocess.run(cmd, check=True)
         logger.info(f"Tests completed with exit code: {process.returncode}")
@@ -117,32 +146,59 @@ def run_tests(args):
     except subprocess.CalledProcessError as e:
         logger.error(f"Tests failed with exit code: {e.returncode}")
         return e.returncode
+
+def run_tests(args):
+    """Run the tests with the specified configuration."""
+    # Create timestamp for report naming
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    
+    # Ensure report directory exists
+    ensure_directory_exists(args.report_dir)
+    
+    # Add browser configuration
+    os.environ["BROWSER"] = args.browser
+    
+    if not args.resume:
+        logger.info(f"Run ID: {args.run_id} (continue an interrupted run with --resume {args.run_id})")
+    try:
+        if args.parallel == "auto":
+            return run_autoscaled(args, timestamp)
+        report_path = f"{args.report_dir}/report_{timestamp}.html"
+        return run_command(build_command(args, args.parallel, report_path), report_path)
     finally:
         if not args.skip_cleanup:
             cleanup_temp_profiles()
 
+def run_autoscaled(args, timestamp):
+    """Run the tests in batches, choosing the worker count before each batch (see utils/autoscale.py)."""
+    if args.resume == "latest":
+        # Every batch must resume the same run, not the one the previous batch just wrote to
+        args.resume = latest_run_id() or args.run_id or new_run_id()
+    tests = autoscale.collect_tests([f"tests/{args.test}"] + (["-m", args.markers] if args.markers else []))
+    if not tests:
+        logger.error(f"No tests collected from tests/{args.test}")
+        return 5
+    autoscaler = autoscale.Autoscaler(autoscale.measure_session(args.browser))
+    exit_code = 0
+    for number, (workers, batch) in enumerate(autoscale.batches(tests, autoscaler), start=1):
+        logger.info(f"Batch {number}: {len(batch)} tests on {workers} workers")
+        report_path = f"{args.report_dir}/report_{timestamp}_batch{number}.html"
+        exit_code = run_command(build_command(args, workers, report_path, tests=batch), report_path) or exit_code
+    return exit_code
+
 def cleanup_temp_profiles():
     """Clean up temporary browser profiles."""
     logger.info("Cleaning up temporary browser profiles...")
-    
-    # Temporary directory patterns to clean
-    temp_patterns = [
-        "/tmp/chrome_profile_*",
-        "/tmp/firefox_profile_*",
-        "/tmp/edge_profile_*"
-    ]
-    
-    for pattern in temp_patterns:
-        try:
-            # Use subprocess to run the rm command
-            subprocess.run(["rm", "-rf", pattern], check=False)
-        except Exception as e:
-            logger.warning(f"Error cleaning up {pattern}: {e}")
-    
-    logger.info("Cleanup completed")
+    try:
+        removed = profile_manager.cleanup_stale()
+        logger.info(f"Cleanup completed, removed {removed} profiles")
+    except OSError as e:
+        logger.warning(f"Error cleaning up browser profiles: {e}")
 
 if __name__ == "__main__":
     args = parse_args()
+    if not args.resume and not args.run_id:
+        args.run_id = new_run_id()
     logger.info(f"Starting test run with arguments: {args}")
     
     # Print configuration summary
@@ -151,9 +207,10 @@ if __name__ == "__main__":
     print(f"  Test file:      tests/{args.test}")
     print(f"  Browser:        {args.browser}")
     print(f"  Parallel:       {'No' if args.parallel == 0 else f'Yes ({args.parallel} workers)'}")
-    if args.parallel > 0:
+    if args.parallel != 0:
         print(f"  Dist mode:      {args.dist_mode}")
     print(f"  Markers:        {args.markers}")
+    print(f"  Run ID:         {args.resume or args.run_id}{' (resumed)' if args.resume else ''}")
     print(f"  Report dir:     {args.report_dir}")
     print(f"  Skip cleanup:   {'Yes' if args.skip_cleanup else 'No'}")
     print("="*80 + "\n")
@@ -2,34 +2,43 @@
 """
 Script to run parameterized tests in parallel.
 This demonstrates how to efficiently run parametrized tests in parallel.
-Usage: python3 scripts/run_parallel_parameterized.py [num_workers]
+Usage: python3 scripts/run_parallel_parameterized.py [num_workers|auto]
+With 'auto' the worker count is picked from the memory one browser session takes, free memory
+and cores, and adjusted between batches of tests (see utils/autoscale.py).
 """
 import os
 import sys
 import subprocess
 import datetime
+import logging
+
+# Run from the project root or from scripts/, utils lives next to this directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import autoscale
 
 # Default number of workers if not specified
 DEFAULT_WORKERS = 4
+TEST_FILE = "tests/test_parameterized_parallel.py"
+# Autoscaled batches split the apply-CV parametrizations between workers
+AUTOSCALE_TEST_FILE = "tests/test_apply_cv_parametrized.py"
 
-def run_parallel_tests(num_workers=DEFAULT_WORKERS):
+def run_parallel_tests(num_workers=DEFAULT_WORKERS, tests=None, report_suffix="", dist="each"):
     """Run pytest in parallel mode with the specified number of workers."""
     # Create directory for reports if it doesn't exist
     os.makedirs('reports/html', exist_ok=True)
     
     # Generate timestamp for report name
     timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    report_name = f"reports/html/parallel_parameterized_report_{timestamp}.html"
+    report_name = f"reports/html/parallel_parameterized_report_{timestamp}{report_suffix}.html"
     
     # Command to run tests in parallel
     cmd = [
         "python3", "-m", "pytest", 
         f"-n={num_workers}", 
-        "--dist=each",  # Run each parametrized test in a separate worker
+        f"--dist={dist}",  # "each" runs each parametrized test in a separate worker
         "-v",
         f"--html={report_name}",
-        "tests/test_parameterized_parallel.py"
-    ]
+    ] + (tests or [TEST_FILE])
     
     print(f"Running parallel parameterized tests with {num_workers} workers...")
     print(f"Command: {' '.join(cmd)}")
@@ -50,7 +59,25 @@ def run_parallel_tests(num_workers=DEFAULT_WORKERS):
     
     return result.returncode
 
+def run_autoscaled_tests():
+    """Run the tests in batches, choosing the worker count before each batch."""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    tests = autoscale.collect_tests([AUTOSCALE_TEST_FILE])
+    if not tests:
+        print(f"No tests collected from {AUTOSCALE_TEST_FILE}")
+        return 5
+    autoscaler = autoscale.Autoscaler(autoscale.measure_session(os.environ.get("BROWSER", "chrome")))
+    exit_code = 0
+    for number, (workers, batch) in enumerate(autoscale.batches(tests, autoscaler), start=1):
+        exit_code = run_parallel_tests(
+            workers, tests=batch, report_suffix=f"_batch{number}", dist="load"
+        ) or exit_code
+    return exit_code
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "auto":
+        sys.exit(run_autoscaled_tests())
+
     # Get number of workers from command line argument
     num_workers = DEFAULT_WORKERS
     if len(sys.argv) > 1:
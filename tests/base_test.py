@@ -7,11 +7,8 @@ import pytest
 import HtmlTestRunner
 from decouple import config
 from selenium import webdriver
-from utils.constants import Constant as CONST
-
-from webdriver_manager.chrome import ChromeDriverManager
-from webdriver_manager.firefox import GeckoDriverManager
-from webdriver_manager.microsoft import EdgeChromiumDriverManager
+from utils import site, wait_engine
+from utils.driver_resolver import resolve_driver_path
 
 from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.firefox.service import Service as FirefoxService
@@ -22,7 +19,6 @@ from selenium.webdriver.firefox.options import Options as FirefoxOptions
 from selenium.webdriver.edge.options import Options as EdgeOptions
 
 
-BASE_URL = config('CONNECTEAM_URL', default=CONST.HOME_PAGE)
 BROWSER = config('BROWSER', default='chrome')
 
 
@@ -43,7 +39,7 @@ class BaseTest(unittest.TestCase):
             # chrome_options.add_argument("--start-fullscreen")
             edge_options.add_argument("--disable-gpu")
             self.driver = webdriver.Edge(
-                service=EdgeService(EdgeChromiumDriverManager().install()),
+                service=EdgeService(resolve_driver_path("edge")),
                 options=edge_options
             )
         elif self.browser == "firefox":
@@ -54,7 +50,7 @@ class BaseTest(unittest.TestCase):
             firefox_options.add_argument("--ignore-certificate-errors-spki-list")
             firefox_options.add_argument("--foreground")
             self.driver = webdriver.Firefox(
-                service=FirefoxService(GeckoDriverManager().install()),
+                service=FirefoxService(resolve_driver_path("firefox")),
                 options=firefox_options
             )
         else:
@@ -69,13 +65,13 @@ class BaseTest(unittest.TestCase):
             # chrome_options.add_argument("--start-fullscreen")
             chrome_options.add_argument('--disable-gpu')
             self.driver = webdriver.Chrome(
-                service=ChromeService(ChromeDriverManager().install()),
+                service=ChromeService(resolve_driver_path("chrome")),
                 options=chrome_options
             )
 
-        self.driver.implicitly_wait(10)
+        self.driver.implicitly_wait(wait_engine.implicit_wait(10))
         self.driver.maximize_window()
-        self.driver.get(BASE_URL)
+        self.driver.get(site.base_url())
 
     def tearDown(self):
         self.driver.quit()
@@ -1,35 +1,40 @@
 import datetime
 import logging
+import os
 import platform
+import sys
 import time
 from os import path
 from typing import Any, Callable, Optional
 
+import allure
 import pytest
 from _pytest.fixtures import SubRequest
 from decouple import config
 from pytest import fixture
-from selenium import webdriver
-from utils.constants import Constant as CONST
-from selenium.webdriver.chrome.options import Options as ChromeOptions
-from selenium.webdriver.chrome.service import Service as ChromeService
-from selenium.webdriver.edge.options import Options as EdgeOptions
-from selenium.webdriver.edge.service import Service as EdgeService
-from selenium.webdriver.firefox.options import Options as FirefoxOptions
-from selenium.webdriver.firefox.service import Service as FirefoxService
-from webdriver_manager.chrome import ChromeDriverManager
-from webdriver_manager.firefox import GeckoDriverManager
-from webdriver_manager.microsoft import EdgeChromiumDriverManager
 
 from pages.careers_page import CareersPage
 # Our own imports ---------------------------------------------------
 from pages.home_page import HomePage
+from utils import (
+    artifacts, checkpoint, deadline, duration_history, navigation, replay_proxy, resource_monitor, resource_policy,
+    run_report, site, tracing, wire_stats
+)
+from utils.driver_factory import create_driver
+from utils.driver_pool import DriverPool, DEFAULT_MAX_USES, DEFAULT_POOL_SIZE, REPORT_SECTION as POOL_SECTION
+from utils.job_catalogue import load_catalogue
 
 # -----------------------------------------------------------------------------
 # CONSTANTS
 # -----------------------------------------------------------------------------
 ALLURE_ENVIRONMENT_PROPERTIES_FILE = 'environment.properties'
 ALLUREDIR_OPTION = '--alluredir'
+RUN_REPORT_KEY = 'run_report'
+# Set by the xdist controller when it could not load the job catalogue; workers inherit it and don't retry
+CATALOGUE_ERROR_ENV = 'JOB_CATALOGUE_PREFETCH_ERROR'
+
+# Session timing for the planned vs actual makespan report
+_SCHEDULE = {"started": None, "expected": None, "scheduler": None, "controller": True}
 
 # -----------------------------------------------------------------------------
 # Configure logging
@@ -73,8 +78,87 @@ def add_allure_environment_property(request: SubRequest) -> Optional[Callable]:
         _f.write(data)
 
 @fixture(autouse=True)
-def create_env_prop(add_allure_environment_property: Callable, request, base_url, driver) -> None:
+def isolated_run_report(request):
+    """
+    Keep the counters of unit tests, which drive the framework with fakes, out of the terminal summary,
+    and the timings of the @time_func methods they call out of the duration history.
+    """
+    if request.node.get_closest_marker("e2e") is not None:
+        yield
+        return
+    with run_report.isolated(), duration_history.isolated():
+        yield
+
+@fixture(autouse=True)
+def trace_spans(request):
+    """With TRACE_SPANS=true, write the test's span trace and attach its slowest spans to the report.
+    Defined before the other autouse fixtures so browser launch is part of the trace."""
+    if tracing.start_test(request.node.nodeid) is None:
+        yield
+        return
+    yield
+    tracer = tracing.finish_test()
+    if tracer is None:
+        return
+    try:
+        trace_path = tracer.write()
+        logger.info(f"Span trace written to {trace_path}")
+        allure.attach(tracer.summary(), name="Slowest spans", attachment_type=allure.attachment_type.TEXT)
+        allure.attach.file(trace_path, name="Span trace (open in ui.perfetto.dev)",
+                           attachment_type=allure.attachment_type.JSON)
+    except Exception as e:
+        logger.warning(f"Could not write the span trace: {e}")
+
+@fixture(autouse=True)
+def wire_stats_per_test(request):
+    """With WIRE_STATS=true, write the WebDriver commands the test sent, per page-object method."""
+    if not wire_stats.enabled():
+        yield
+        return
+    wire_stats.start_test(request.node.nodeid)
+    yield
+    stats = wire_stats.finish_test()
+    try:
+        logger.info(f"WebDriver command stats written to {stats.write()}")
+    except OSError as e:
+        logger.warning(f"Could not write WebDriver command stats: {e}")
+
+@fixture(autouse=True)
+def screenshots():
+    """Attach the test's screenshots once the background writer has stored them (see utils/artifacts.py).
+    Defined before the driver is requested, so the failure screenshot taken at driver teardown is included."""
+    yield
+    artifacts.flush()
+
+@fixture(autouse=True)
+def test_budget(request):
+    """
+    Total time budget for the test, from @pytest.mark.budget(seconds) or TEST_BUDGET (0 = none).
+    Every wait and retry in the test shares it; see utils/deadline.py.
+    """
+    marker = request.node.get_closest_marker("budget")
+    seconds = marker.args[0] if marker else config('TEST_BUDGET', default=0, cast=float)
+    deadline.start_test(seconds, request.node.nodeid)
+    yield
+    deadline.finish_test()
+
+@fixture(autouse=True)
+def skipped_waits(request):
+    """Count the page-load waits the test skipped because the page was already loaded (see utils/navigation.py)."""
+    navigation.start_test()
+    yield
+    skipped = navigation.finish_test()
+    if skipped:
+        logger.info(f"Skipped {skipped} waits for pages that were already loaded")
+        request.node.user_properties.append(("skipped_waits", skipped))
+
+@fixture(autouse=True)
+def create_env_prop(add_allure_environment_property: Callable, request, base_url) -> None:
     """Add environment properties to Allure report from driver capabilities"""
+    # Tests that don't drive a browser (e.g. the job catalogue parser) must not launch one
+    if "driver" not in request.fixturenames:
+        return
+    driver = request.getfixturevalue("driver")
     try:
         add_allure_environment_property('Env', 'Testing')
         add_allure_environment_property('Host', base_url)
@@ -100,8 +184,8 @@ def add_timestamp_to_test_name(request):
 # -----------------------------------------------------------------------------
 @pytest.fixture(scope="session")
 def base_url():
-    """Return the base URL for tests."""
-    return config('CONNECTEAM_URL', default=CONST.HOME_PAGE)
+    """Return the base URL for tests (CONNECTEAM_URL=local serves the bundled stand-in site)."""
+    return site.base_url()
 
 @pytest.fixture(scope="session")
 def browser_type():
@@ -111,12 +195,35 @@ def browser_type():
 # -----------------------------------------------------------------------------
 # WebDriver fixtures
 # -----------------------------------------------------------------------------
+@pytest.fixture(scope="session")
+def driver_pool(browser_type):
+    """
+    Worker-scoped pool of live browser sessions, enabled with DRIVER_POOL=true.
+    Every xdist worker is its own process, so each one keeps its own pool.
+    Yields None when pooling is disabled.
+    """
+    if not config('DRIVER_POOL', default=False, cast=bool):
+        yield None
+        return
+
+    pool = DriverPool(
+        factory=lambda session_id: create_driver(browser_type, session_id),
+        size=config('DRIVER_POOL_SIZE', default=DEFAULT_POOL_SIZE, cast=int),
+        max_uses=config('DRIVER_POOL_MAX_USES', default=DEFAULT_MAX_USES, cast=int),
+        max_rss=resource_monitor.RECYCLE_BYTES,
+    )
+    logger.info(f"Driver pool enabled (size={pool.size}, max_uses={pool.max_uses}, max_rss={pool.max_rss})")
+    yield pool
+    pool.shutdown()
+
 @pytest.fixture(scope="function")
-def driver(browser_type, base_url, request):
+def driver(browser_type, base_url, driver_pool, request):
     """
     Create and configure WebDriver.
     Scope="function" means this runs for each test function.
     Enhanced to support parametrized tests with better parallel execution.
+    With DRIVER_POOL=true the session is borrowed from the worker's pool instead of launched.
+    With RESOURCE_MONITOR=true the browser's memory and CPU are sampled while the test runs.
     """
     logger.info(f"Setting up {browser_type} browser")
     
@@ -127,73 +234,44 @@ def driver(browser_type, base_url, request):
     session_id = f"{test_name}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
     logger.info(f"Starting test with session ID: {session_id}")
     
-    if browser_type == "edge":
-        # Edge configuration
-        options = EdgeOptions()
-        options.add_argument("--ignore-certificate-errors")
-        options.add_argument("--ignore-ssl-errors")
-        options.add_argument("--ignore-certificate-errors-spki-list")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-infobars")
-        options.add_argument("--disable-extensions")
-        options.add_argument("--disable-gpu")
-        # Add unique user data dir to prevent conflicts in parallel runs
-        options.add_argument(f"--user-data-dir=/tmp/edge_profile_{session_id}")
-        
-        driver = webdriver.Edge(
-            service=EdgeService(EdgeChromiumDriverManager().install()),
-            options=options
-        )
-    elif browser_type == "firefox":
-        # Firefox configuration
-        options = FirefoxOptions()
-        options.add_argument("--disable-extensions")
-        options.add_argument("--ignore-certificate-errors")
-        options.add_argument("--ignore-ssl-errors")
-        options.add_argument("--ignore-certificate-errors-spki-list")
-        options.add_argument("--foreground")
-        # Add unique profile path for Firefox
-        options.add_argument(f"-profile")
-        options.add_argument(f"/tmp/firefox_profile_{session_id}")
-        
-        driver = webdriver.Firefox(
-            service=FirefoxService(GeckoDriverManager().install()),
-            options=options
-        )
+    pooled_session = None
+    if driver_pool is not None:
+        with tracing.span("DriverPool.acquire", tracing.DRIVER):
+            pooled_session = driver_pool.acquire()
+        driver = pooled_session.driver
     else:
-        # Chrome configuration (default)
-        options = ChromeOptions()
-        options.add_argument("--ignore-certificate-errors")
-        options.add_argument("--ignore-ssl-errors")
-        options.add_argument("--ignore-certificate-errors-spki-list")
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-infobars')
-        options.add_argument("--disable-extensions")
-        options.add_argument('--disable-gpu')
-        # Add unique user data dir to prevent conflicts in parallel runs
-        options.add_argument(f"--user-data-dir=/tmp/chrome_profile_{session_id}")
-        
-        driver = webdriver.Chrome(
-            service=ChromeService(ChromeDriverManager().install()),
-            options=options
-        )
-
-    # Configure WebDriver with longer timeouts for better stability
-    driver.set_page_load_timeout(60)
-    driver.implicitly_wait(20)
-    driver.maximize_window()
+        start_time = time.monotonic()
+        with tracing.span("create_driver", tracing.DRIVER, browser=browser_type):
+            driver = create_driver(browser_type, session_id)
+        run_report.add(POOL_SECTION, "total", launches=1, launch_seconds=time.monotonic() - start_time)
+    sampler = resource_monitor.start_test(driver, request.node.nodeid)
     
     # Navigate to base URL
-    driver.get(base_url)
+    with tracing.span("driver.get(base_url)", tracing.DRIVER):
+        driver.get(base_url)
     logger.info(f"Navigated to {base_url}")
     
     # Store session info for debugging
     request.node.session_id = session_id
+    artifacts.watch(driver)
     
     # Yield driver to test
     yield driver
     
+    report = getattr(request.node, "rep_call", None)
+    if report is not None and report.failed:
+        artifacts.capture(driver, f"Failure_{test_name}", artifacts.FAILURE)
+
+    if resource_monitor.finish_test() is not None:
+        resource_monitor.record(sampler, request.node)
+
     # Cleanup after test
+    if pooled_session is not None:
+        failed = report is None or report.failed
+        logger.info(f"Returning WebDriver to the pool for session {session_id}")
+        driver_pool.release(pooled_session, failed=failed, rss=resource_monitor.session_rss(driver))
+        return
+
     logger.info(f"Tearing down WebDriver for session {session_id}")
     try:
         driver.quit()
@@ -220,5 +298,161 @@ def careers_page(driver, base_url):
     driver.get(f"{base_url}careers/")
     careers_page = CareersPage(driver)
     # Wait for page to be fully loaded
-    time.sleep(2)  # Give a moment for the page to stabilize
-    return careers_page
\ No newline at end of file
+    careers_page.settle("careers_page fixture", legacy_sleep=2)  # Give a moment for the page to stabilize
+    return careers_page
+
+# -----------------------------------------------------------------------------
+# Hooks
+# -----------------------------------------------------------------------------
+def pytest_addoption(parser):
+    group = parser.getgroup("checkpoint", "resumable application runs")
+    group.addoption(
+        "--run-id", default=None,
+        help="Record finished openings under this run ID (default: CHECKPOINT_RUN_ID)"
+    )
+    group.addoption(
+        "--resume", action="store_true", default=False,
+        help="Skip openings already completed in --run-id (default: the latest run)"
+    )
+    group = parser.getgroup("schedule", "duration-history scheduling")
+    group.addoption(
+        "--longest-first", action="store_true", default=False,
+        help="With --dist=load, dispatch tests longest-first using the recorded duration history"
+    )
+
+def pytest_configure(config):
+    """Set up the site under test, the HTTP cache, the checkpoint store and span tracing, and warm the job
+    catalogue once on the controller so every xdist worker collects the same openings."""
+    is_worker = hasattr(config, "workerinput")
+    _SCHEDULE["controller"] = not is_worker
+    tracing.configure()
+    # Start the local stand-in site (CONNECTEAM_URL=local) before xdist spawns workers, so they inherit its URL
+    site.base_url()
+    # Same for the HTTP cache proxy (HTTP_CACHE=record/replay)
+    replay_proxy.address()
+    store = checkpoint.configure(run_id=config.getoption("run_id"), resume=config.getoption("resume"))
+    if store is not None and not is_worker:
+        # The controller resolves "latest" once; xdist hands its options on to the workers
+        config.option.run_id = store.run_id
+        config.option.resume = store.resume
+        logger.info(f"Checkpointing finished openings to {store.path} (resume={store.resume})")
+
+    if is_worker or not config.getoption("numprocesses", default=None):
+        return
+    os.environ.pop(CATALOGUE_ERROR_ENV, None)
+    try:
+        load_catalogue()
+    except Exception as e:
+        logger.warning(f"Could not load the job catalogue: {e}")
+        # Workers start after this hook, so they see the failure instead of each fetching the page again
+        os.environ[CATALOGUE_ERROR_ENV] = f"{e.__class__.__name__}: {e}"
+
+def pytest_generate_tests(metafunc):
+    """
+    Generate one test item per open position for tests that take an `opening` argument.
+    Departments come from the test's @pytest.mark.departments(...) marker; IDs are
+    '<department>-<job id>', so they stay stable across runs for --lf and xdist balancing.
+    """
+    if "opening" not in metafunc.fixturenames:
+        return
+    marker = metafunc.definition.get_closest_marker("departments")
+    departments = marker.args if marker else ()
+    # Workers must see exactly what the controller saw, however old the cache is by now
+    is_worker = hasattr(metafunc.config, "workerinput")
+    ttl = sys.maxsize if is_worker else None
+    controller_error = os.environ.get(CATALOGUE_ERROR_ENV) if is_worker else None
+    if controller_error:
+        logger.warning(f"The controller could not load the job catalogue, no openings generated: {controller_error}")
+        catalogue = {}
+    else:
+        try:
+            catalogue = load_catalogue(ttl=ttl)
+        except Exception as e:
+            logger.warning(f"Could not load the job catalogue, no openings generated: {e}")
+            catalogue = {}
+
+    openings = [
+        record
+        for department in departments
+        for record in catalogue.get(department, [])
+        if record.can_apply
+    ]
+    metafunc.parametrize(
+        "opening", openings, ids=[f"{record.department}-{record.job_id}" for record in openings]
+    )
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_xdist_make_scheduler(config, log):
+    """Use the longest-first scheduler when --longest-first is given."""
+    if not config.getoption("longest_first"):
+        return None
+    from utils.scheduling import LongestFirstScheduling
+    _SCHEDULE["scheduler"] = LongestFirstScheduling(config, log)
+    return _SCHEDULE["scheduler"]
+
+def pytest_sessionstart(session):
+    _SCHEDULE["started"] = time.monotonic()
+
+def pytest_collection_modifyitems(config, items):
+    """
+    Without xdist every test runs back to back, so the expected makespan is their sum.
+    Only reported when some of the tests have a duration history to expect anything from.
+    """
+    if config.getoption("numprocesses", default=None) or not _SCHEDULE["controller"]:
+        return
+    nodeids = [item.nodeid for item in items]
+    data = duration_history.load()
+    if duration_history.has_history(nodeids, data):
+        _SCHEDULE["expected"] = sum(duration_history.expected_durations(nodeids, data).values())
+
+def pytest_runtest_logreport(report):
+    """
+    Record test durations where every report ends up: the controller (or the only process).
+    Only e2e tests, the ones the longest-first scheduler has to spread over workers.
+    """
+    if _SCHEDULE["controller"] and "e2e" in report.keywords:
+        duration_history.record_test(report.nodeid, report.duration)
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """Expose each phase's report on the item (item.rep_setup / rep_call / rep_teardown) for fixtures."""
+    outcome = yield
+    report = outcome.get_result()
+    setattr(item, f"rep_{report.when}", report)
+
+def pytest_sessionfinish(session):
+    """Save the duration history; on an xdist worker, hand the run counters to the controller."""
+    artifacts.shutdown()
+    try:
+        duration_history.save()
+    except OSError as e:
+        logger.warning(f"Could not save the duration history: {e}")
+
+    workeroutput = getattr(session.config, "workeroutput", None)
+    if workeroutput is not None:
+        workeroutput[RUN_REPORT_KEY] = run_report.snapshot()
+        return
+
+    if not session.config.option.collectonly:
+        try:
+            resource_policy.save()
+        except OSError as e:
+            logger.warning(f"Could not save the page weights: {e}")
+
+    scheduler = _SCHEDULE["scheduler"]
+    expected = scheduler.expected_makespan if scheduler is not None else _SCHEDULE["expected"]
+    if expected is not None and _SCHEDULE["started"] is not None and not session.config.option.collectonly:
+        workers = scheduler.workers if scheduler is not None else 1
+        duration_history.report_makespan(expected, time.monotonic() - _SCHEDULE["started"], workers)
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    """On the xdist controller, merge the counters collected by a finished worker."""
+    run_report.merge(getattr(node, "workeroutput", {}).get(RUN_REPORT_KEY))
+
+def pytest_terminal_summary(terminalreporter):
+    """Print the run-wide framework counters."""
+    for title, lines in run_report.summary():
+        terminalreporter.write_sep("-", title)
+        for line in lines:
+            terminalreporter.write_line(line)
@@ -0,0 +1,37 @@
+import logging
+
+import allure
+import pytest
+from pages.careers_page import CareersPage
+from utils import application_results
+from utils.constants import Constant as CONST
+
+LOGGER = logging.getLogger(__name__)
+
+candidate_details = {'first_name': CONST.TEST_FIRST_NAME, 'last_name': CONST.TEST_LAST_NAME, 'email': CONST.TEST_EMAIL, 'phone': CONST.TEST_PHONE}
+
+
+@allure.epic("Careers Page Testing")
+@allure.feature("Job Application Process")
+class TestPerOpeningApplications:
+    """Apply to every opening as its own test item, so xdist can spread openings across workers
+    and --lf reruns only the openings that failed. Openings come from the job catalogue at collection time."""
+
+    @allure.severity(allure.severity_level.CRITICAL)
+    @pytest.mark.e2e
+    @pytest.mark.nondestructive
+    @pytest.mark.departments("R&D", "G&A")
+    def test_apply_cv_to_opening(self, driver, opening):
+        """
+        Test applying to a single opening discovered by the job catalogue:
+        1. Open the position page directly
+        2. Fill up the application form"""
+        allure.dynamic.title(f"Apply to {opening.department} opening: {opening.title or opening.job_id}")
+
+        LOGGER.info(f"\n=== Applying to {opening.department} opening {opening.url} ===")
+        careers_page = CareersPage(driver)
+        result = careers_page.apply_to_opening(opening.department, opening.to_dict(), candidate_details)
+        if result.status == application_results.SKIPPED:
+            pytest.skip("Already completed in the run being resumed")
+
+        assert result.status != application_results.FAILED, result.error
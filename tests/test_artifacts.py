@@ -0,0 +1,102 @@
+import base64
+
+import allure
+import pytest
+
+from utils import artifacts
+from utils.artifacts import Artifact, ArtifactWriter
+from utils.deferred_allure import DeferredAllure
+
+
+def frame(colour):
+    return base64.b64encode(b"\x89PNG fake frame " + colour.encode()).decode()
+
+
+class ScreenshotDriver:
+    def __init__(self, *colours):
+        self.frames = [frame(colour) for colour in colours]
+
+    def get_screenshot_as_base64(self):
+        return self.frames.pop(0)
+
+
+class BrokenImage:
+    """Stands in for Pillow failing to decode a frame."""
+    @staticmethod
+    def open(stream):
+        raise OSError("cannot identify image file")
+
+
+@pytest.fixture
+def writer(tmp_path, monkeypatch):
+    # The frames are not real PNGs; store them as captured whether or not Pillow is installed
+    monkeypatch.setattr(artifacts, "Image", None)
+    artifact_writer = ArtifactWriter(directory=str(tmp_path), image_format="png")
+    monkeypatch.setitem(artifacts._ACTIVE, "writer", artifact_writer)
+    yield artifact_writer
+    artifact_writer.close()
+
+
+@pytest.mark.nondestructive
+class TestArtifacts:
+    """Screenshot pipeline without a browser."""
+
+    def test_identical_frames_are_stored_once(self, writer, tmp_path):
+        queued = [Artifact(name, artifacts.STEP, frame(colour))
+                  for name, colour in (("first", "red"), ("again", "red"), ("other", "blue"))]
+        for artifact in queued:
+            writer.submit(artifact)
+
+        assert all(artifact.wait() for artifact in queued)
+        assert [artifact.duplicate for artifact in queued] == [False, True, False]
+        assert queued[0].path == queued[1].path
+        assert len(list(tmp_path.iterdir())) == 2
+
+    def test_undecodable_frame_is_stored_as_captured(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(artifacts, "Image", BrokenImage)
+        jpeg_writer = ArtifactWriter(directory=str(tmp_path), image_format="jpeg")
+        artifact = Artifact("broken", artifacts.STEP, frame("red"))
+        jpeg_writer.submit(artifact)
+        jpeg_writer.close()
+
+        assert artifact.wait() and artifact.path.endswith(".png")
+        with open(artifact.path, "rb") as _f:
+            assert _f.read() == base64.b64decode(frame("red"))
+
+    def test_screenshots_are_attached_in_their_step(self, writer, monkeypatch):
+        attached = []
+        monkeypatch.setattr(artifacts.allure.attach, "file",
+                            lambda path, name, attachment_type: attached.append((name, list(open_steps))))
+        open_steps = []
+        driver = ScreenshotDriver("red", "blue", "red")
+        artifacts.watch(driver)
+        with allure.step("Fill the form"):
+            open_steps.append("Fill the form")
+            artifacts.capture(driver, "form filled")
+            artifacts.capture(driver, "form submitted")
+        open_steps.pop()
+        artifacts.capture(driver, "same frame again")
+        artifacts.flush()
+
+        # Attached before the step closed; the repeated frame only once
+        assert attached == [("form filled", ["Fill the form"]), ("form submitted", ["Fill the form"])]
+
+    def test_policy_decides_what_is_captured(self):
+        assert artifacts.wants(artifacts.STEP, artifacts.ON_STEP)
+        assert not artifacts.wants(artifacts.STEP, artifacts.ON_FAILURE_ONLY)
+        assert artifacts.wants(artifacts.ERROR, artifacts.ON_FAILURE_ONLY)
+        assert artifacts.wants(artifacts.FAILURE, artifacts.ON_FAILURE_ONLY)
+
+    def test_deferred_screenshots_are_replayed_in_place(self, writer):
+        driver = ScreenshotDriver("red", "blue")
+        recorder = DeferredAllure()
+        with recorder.step("Processing job card 1"):
+            artifacts.capture(driver, "form filled", recorder=recorder)
+        artifacts.capture(driver, "not deferred")
+
+        step = recorder._root[0]
+        assert step["children"][0]["artifact"].name == "form filled"
+        assert [artifact.name for artifact in artifacts._ACTIVE["pending"]] == ["not deferred"]
+        recorder.replay()
+        artifacts.flush()
+        assert artifacts._ACTIVE["pending"] == []
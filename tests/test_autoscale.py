@@ -0,0 +1,40 @@
+import pytest
+
+from utils import autoscale
+from utils.autoscale import Autoscaler, SystemState
+
+GIB = 2 ** 30
+
+
+def state(available_gib=16, cores=8, load=0.0, swap_gib=0):
+    return SystemState(available_gib * GIB, cores, load, swap_gib * GIB)
+
+
+@pytest.fixture
+def autoscaler(monkeypatch):
+    monkeypatch.setattr(autoscale, "RESERVE_MB", 1024)
+    monkeypatch.setattr(autoscale, "WORKER_MB", 0)
+    # 1 GiB per worker
+    return Autoscaler(GIB, max_workers=0)
+
+
+@pytest.mark.nondestructive
+class TestAutoscale:
+    """Worker count decisions from synthetic machine states."""
+
+    def test_memory_cores_and_tests_left_bound_the_count(self, autoscaler):
+        assert autoscaler.decide(100, state(available_gib=5, cores=8)) == 4
+        assert Autoscaler(GIB).decide(100, state(available_gib=64, cores=6)) == 6
+        assert Autoscaler(GIB).decide(3, state(available_gib=64, cores=6)) == 3
+        assert Autoscaler(GIB).decide(100, state(available_gib=1, cores=6)) == 1
+
+    def test_load_and_swap_shrink_the_next_batch(self, autoscaler):
+        assert autoscaler.decide(100, state()) == 8
+        assert autoscaler.decide(100, state(load=12.0)) == 7
+        assert autoscaler.decide(100, state(swap_gib=1)) == 3
+
+    def test_grows_one_worker_per_batch(self, autoscaler, monkeypatch):
+        assert autoscaler.decide(100, state(available_gib=3)) == 2
+        assert autoscaler.decide(100, state(available_gib=32)) == 3
+        monkeypatch.setattr(autoscale, "system_state", lambda: state(available_gib=32))
+        assert [workers for workers, batch in autoscale.batches(range(10), autoscaler, rounds=1)] == [4, 5, 1]
@@ -0,0 +1,25 @@
+import pytest
+
+from benchmarks import gate
+
+
+@pytest.mark.nondestructive
+class TestBenchmarkGate:
+    """Percentiles and regression detection used by benchmarks/run_benchmarks.py."""
+
+    def test_percentiles(self):
+        summary = gate.summarize([0.5, 0.1, 0.4, 0.2, 0.3] * 4)
+        assert summary == {"p50": 0.3, "p95": 0.5, "n": 20}
+
+    def test_regressions_past_threshold_fail(self):
+        baseline = {"100/select_department": {"p50": 1.0, "p95": 2.0, "n": 5},
+                    "100/harvest_job_cards": {"p50": 0.010, "p95": 0.020, "n": 5}}
+        results = {"100/select_department": {"p50": 1.1, "p95": 2.6, "n": 5},
+                   # doubled, but only by a few milliseconds
+                   "100/harvest_job_cards": {"p50": 0.020, "p95": 0.040, "n": 5},
+                   "1000/select_department": {"p50": 9.0, "p95": 9.0, "n": 5}}
+
+        regressions = gate.compare(results, baseline, threshold=0.2, min_delta=0.05)
+
+        assert len(regressions) == 1
+        assert regressions[0].startswith("100/select_department p95")
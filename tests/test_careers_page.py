@@ -0,0 +1,158 @@
+import contextlib
+import threading
+
+import pytest
+from selenium.common.exceptions import NoSuchWindowException
+
+from pages import base_page
+from pages.base_page import BasePage
+from pages.careers_page import CareersPage
+from pages.position_page import PositionPage
+from utils import application_results, deferred_allure
+
+FAILING_JOB = 2
+
+
+def opening(index):
+    return {"index": index, "text": "Apply now", "href": f"/careers/{index}/",
+            "url": f"https://connecteam.com/careers/{index}/", "department": "R&D", "row_index": index,
+            "visible": True}
+
+
+class FakeSession:
+    """
+    A browser session that opens every URL except the failing job's, which closes a window:
+    its only one unless spare_window, in which case the session can carry on in the other.
+    """
+    def __init__(self, launched, spare_window=False, cards=()):
+        self.current_url = "about:blank"
+        self.windows = ["main", "spare"] if spare_window else ["main"]
+        self.cards = list(cards)
+        self.visited = []
+        self.switch_to = self
+        self.quit_called = False
+        launched.append(self)
+
+    def get(self, url):
+        self.visited.append(url)
+        if f"/careers/{FAILING_JOB}/" in url:
+            self.windows.pop(0)
+            raise NoSuchWindowException("window closed")
+        self.current_url = url
+
+    @property
+    def window_handles(self):
+        return list(self.windows)
+
+    def window(self, handle):
+        pass
+
+    def default_content(self):
+        pass
+
+    def execute_script(self, script, *args):
+        if script == base_page.HARVEST_SCRIPT:
+            return list(self.cards)
+
+    def delete_all_cookies(self):
+        pass
+
+    def quit(self):
+        self.quit_called = True
+
+
+class FakeAllure:
+    """Collects what DeferredAllure replays, as (kind, name) in report order."""
+    def __init__(self):
+        self.emitted = []
+
+    @contextlib.contextmanager
+    def step(self, title):
+        self.emitted.append(("step", title))
+        yield
+
+    def attach(self, body, name, attachment_type):
+        self.emitted.append(("attach", name))
+
+
+@pytest.fixture
+def fake_forms(monkeypatch):
+    """
+    Forms that fill at once. When a test sets forms["together"] to a barrier, the first two openings
+    meet there before filling, so they must run side by side.
+    """
+    forms = {"together": None}
+
+    def fill(page, candidate_details=None, card_number=None, card_url=None):
+        if forms["together"] is not None and card_number < 2:
+            forms["together"].wait()
+        with page.step(f"Filling form {card_number}"):
+            page.attach(card_url, f"form_{card_number}", None)
+        return True
+
+    monkeypatch.setattr(PositionPage, "fill_up_position_form", fill)
+    monkeypatch.setattr(BasePage, "wait_for_page_load", lambda page, timeout=None: True)
+    return forms
+
+
+@pytest.mark.nondestructive
+class TestCareersPage:
+    """Applying to harvested openings, against fake sessions."""
+
+    def test_direct_urls_record_a_failing_opening_and_go_on(self, fake_forms):
+        cards = [opening(index) for index in range(5)]
+        cards[1]["text"] = "Closed"
+        browser = FakeSession([], spare_window=True, cards=cards)
+        page = CareersPage(browser)
+
+        results = page.apply_to_all_the_openings_per_department("R&D", {}, direct_urls=True, pool_size=1)
+
+        assert [(result.index, result.status) for result in results] == [
+            (0, application_results.APPLIED), (2, application_results.FAILED),
+            (3, application_results.APPLIED), (4, application_results.APPLIED),
+        ]
+        assert "NoSuchWindowException" in results[1].error
+        # Each opening is visited by its URL, the ones after the failure included
+        assert browser.visited == [cards[index]["url"] for index in (0, 2, 3, 4)]
+
+    def test_concurrent_openings_fan_out_and_replay_in_order(self, fake_forms, monkeypatch):
+        fake_forms["together"] = threading.Barrier(2, timeout=5)
+        replayed = FakeAllure()
+        monkeypatch.setattr(deferred_allure, "allure", replayed)
+        launched = []
+        page = CareersPage(object(), driver_factory=lambda session_id: FakeSession(launched))
+        openings = [opening(index) for index in range(5)]
+
+        results = page.apply_to_openings_concurrently("R&D", openings, {}, pool_size=2)
+
+        assert [result.index for result in results] == [0, 1, 2, 3, 4]
+        assert [result.status for result in results] == [application_results.APPLIED] * 2 + \
+            [application_results.FAILED] + [application_results.APPLIED] * 2
+        assert "NoSuchWindowException" in results[FAILING_JOB].error
+        # Two sessions to start with, one more after the failing opening's session was recycled
+        assert 2 <= len(launched) <= 3
+        assert all(session.quit_called for session in launched)
+
+        expected = []
+        for index in range(5):
+            expected.append(("step", f"Processing job card {index} with 'Apply now'"))
+            if index != FAILING_JOB:
+                expected += [("step", f"Filling form {index}"), ("attach", f"form_{index}")]
+        # Each opening's steps come out in one piece, in opening order, whichever thread finished first
+        assert replayed.emitted == expected
+
+    def test_session_release_errors_do_not_replace_the_result(self, fake_forms):
+        class BrokenPool:
+            def acquire(self):
+                return FakePooledSession()
+
+            def release(self, session, failed=False, rss=None):
+                raise RuntimeError("reset failed")
+
+        class FakePooledSession:
+            driver = FakeSession([])
+
+        page = CareersPage(object())
+        result = page._apply_in_pooled_session(BrokenPool(), "R&D", opening(3), {}, deferred_allure.DeferredAllure())
+
+        assert (result.index, result.status) == (3, application_results.APPLIED)
@@ -0,0 +1,75 @@
+import multiprocessing
+import threading
+
+import pytest
+
+from utils import application_results
+from utils.application_results import OpeningResult
+from utils.checkpoint import CheckpointStore
+
+RUN_ID = "run_test"
+RECORDS_PER_WRITER = 50
+
+
+def opening(index, status, department="R&D"):
+    return OpeningResult(department, index, f"https://connecteam.com/careers/{index}/", status, duration=0.1)
+
+
+def write_openings(directory, first):
+    """One xdist worker recording its openings from a thread pool of its own."""
+    store = CheckpointStore(RUN_ID, directory=directory)
+    threads = [threading.Thread(target=store.record, args=(opening(index, application_results.APPLIED),))
+               for index in range(first, first + RECORDS_PER_WRITER)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+@pytest.mark.nondestructive
+class TestCheckpoint:
+    """Checkpoint store shared by workers, without a browser."""
+
+    def test_resume_skips_only_finished_openings(self, tmp_path):
+        store = CheckpointStore(RUN_ID, directory=str(tmp_path))
+        store.record(opening(0, application_results.APPLIED))
+        store.record(opening(1, application_results.CLOSED))
+        store.record(opening(2, application_results.FAILED))
+
+        resumed = CheckpointStore(RUN_ID, resume=True, directory=str(tmp_path))
+        assert resumed.is_done("R&D", opening(0, "").url)
+        assert resumed.is_done("R&D", opening(1, "").url)
+        assert not resumed.is_done("R&D", opening(2, "").url)
+        assert not resumed.is_done("G&A", opening(0, "").url)
+        # A fresh run with the same ID tries everything
+        assert not CheckpointStore(RUN_ID, directory=str(tmp_path)).is_done("R&D", opening(0, "").url)
+
+        # Openings finished after resuming count as done too
+        resumed.record(opening(2, application_results.APPLIED))
+        assert resumed.is_done("R&D", opening(2, "").url)
+
+    def test_torn_last_line_is_ignored(self, tmp_path):
+        store = CheckpointStore(RUN_ID, directory=str(tmp_path))
+        store.record(opening(0, application_results.APPLIED))
+        with open(store.path, "a", encoding="utf-8") as _f:
+            _f.write('{"run_id": "run_test", "depart')
+
+        assert [entry["url"] for entry in store.entries()] == [opening(0, "").url]
+        assert CheckpointStore(RUN_ID, resume=True, directory=str(tmp_path)).is_done("R&D", opening(0, "").url)
+
+    def test_concurrent_writers_share_one_run(self, tmp_path):
+        writers = [multiprocessing.Process(target=write_openings, args=(str(tmp_path), first))
+                   for first in (0, RECORDS_PER_WRITER)]
+        for writer in writers:
+            writer.start()
+        for writer in writers:
+            writer.join(30)
+            assert writer.exitcode == 0
+
+        entries = CheckpointStore(RUN_ID, directory=str(tmp_path)).entries()
+        # Every line is whole: none interleaved or lost
+        assert len(entries) == 2 * RECORDS_PER_WRITER
+        assert {entry["url"] for entry in entries} == {opening(index, "").url
+                                                       for index in range(2 * RECORDS_PER_WRITER)}
+        resumed = CheckpointStore(RUN_ID, resume=True, directory=str(tmp_path))
+        assert all(resumed.is_done("R&D", opening(index, "").url) for index in range(2 * RECORDS_PER_WRITER))
@@ -0,0 +1,46 @@
+import time
+
+import pytest
+from selenium.common.exceptions import TimeoutException
+
+from utils import deadline
+from utils.deadline import DeadlineExceeded, DeadlineWait
+from utils.decorators import retry
+
+
+class FlakyPage:
+    def __init__(self):
+        self.calls = 0
+
+    @retry(TimeoutException, tries=50, delay=0.1)
+    def wait_forever(self):
+        self.calls += 1
+        DeadlineWait(None, 0.3, poll_frequency=0.05).until(lambda _: False)
+
+
+@pytest.mark.nondestructive
+class TestDeadline:
+    """Budgets shared by nested waits and retries, without a browser."""
+
+    def test_retry_stops_when_budget_runs_out(self):
+        page = FlakyPage()
+        start_time = time.monotonic()
+        with pytest.raises(DeadlineExceeded) as error:
+            with deadline.budget(1, "flaky step"):
+                page.wait_forever()
+
+        assert time.monotonic() - start_time < 1.5
+        assert 1 < page.calls < 50
+        assert "flaky step" in str(error.value)
+        assert "FlakyPage.wait_forever" in str(error.value)
+
+    def test_wait_without_budget_times_out_as_usual(self):
+        with pytest.raises(TimeoutException):
+            DeadlineWait(None, 0.1, poll_frequency=0.05).until(lambda _: False)
+
+    def test_innermost_budget_clamps_timeouts(self):
+        with deadline.budget(60, "outer"):
+            with deadline.budget(0.5, "inner"):
+                assert deadline.clamp(30, "wait") <= 0.5
+            assert deadline.clamp(30, "wait") == 30
+        assert deadline.clamp(30, "wait") == 30
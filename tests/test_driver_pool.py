@@ -0,0 +1,123 @@
+import threading
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from utils.driver_pool import DriverPool
+
+
+class FakeSwitchTo:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def window(self, handle):
+        self.driver.current = handle
+
+    def default_content(self):
+        pass
+
+
+class FakeDriver:
+    """Records what the pool does to a session; close() drops the current window."""
+    def __init__(self, session_id, windows=1):
+        self.session_id = session_id
+        self.window_handles = [f"window{index}" for index in range(windows)]
+        self.current = self.window_handles[0]
+        self.switch_to = FakeSwitchTo(self)
+        self.url = "https://connecteam.com/careers/"
+        self.cookies_cleared = 0
+        self.quit_calls = 0
+        self.fail_reset = False
+
+    def close(self):
+        self.window_handles.remove(self.current)
+
+    def execute_script(self, script, *args):
+        if self.fail_reset:
+            raise WebDriverException("session is gone")
+
+    def delete_all_cookies(self):
+        self.cookies_cleared += 1
+
+    def get(self, url):
+        self.url = url
+
+    def quit(self):
+        self.quit_calls += 1
+
+
+class Factory:
+    def __init__(self):
+        self.drivers = []
+        self._lock = threading.Lock()
+
+    def __call__(self, session_id):
+        driver = FakeDriver(session_id)
+        with self._lock:
+            self.drivers.append(driver)
+        return driver
+
+
+@pytest.mark.nondestructive
+class TestDriverPool:
+    """Session reuse, reset and recycling with fake drivers."""
+
+    def test_released_session_is_reset_and_reused(self):
+        factory = Factory()
+        pool = DriverPool(factory)
+        session = pool.acquire()
+        session.driver.window_handles.append("popup")
+        pool.release(session)
+
+        driver = session.driver
+        assert driver.window_handles == ["window0"]
+        assert driver.cookies_cleared == 1 and driver.url == "about:blank"
+        assert pool.acquire() is session
+        assert (pool.launches, pool.reuses, len(factory.drivers)) == (1, 1, 1)
+
+    def test_session_is_retired_after_max_uses(self):
+        factory = Factory()
+        pool = DriverPool(factory, max_uses=2)
+        for _ in range(2):
+            pool.release(pool.acquire())
+
+        assert factory.drivers[0].quit_calls == 1
+        pool.acquire()
+        assert (pool.launches, pool.reuses, pool.recycles) == (2, 1, 1)
+
+    def test_failed_test_or_failed_reset_recycles(self):
+        factory = Factory()
+        pool = DriverPool(factory)
+        pool.release(pool.acquire(), failed=True)
+        session = pool.acquire()
+        session.driver.fail_reset = True
+        pool.release(session)
+
+        assert [driver.quit_calls for driver in factory.drivers] == [1, 1]
+        assert pool.recycles == 2
+        assert pool.acquire().driver is not session.driver
+
+    def test_pool_keeps_at_most_size_idle_sessions(self):
+        factory = Factory()
+        pool = DriverPool(factory, size=2)
+        sessions = [pool.acquire() for _ in range(3)]
+        for session in sessions:
+            pool.release(session)
+
+        assert [driver.quit_calls for driver in factory.drivers] == [0, 0, 1]
+        pool.shutdown()
+        assert [driver.quit_calls for driver in factory.drivers] == [1, 1, 1]
+
+    def test_counts_are_exact_across_threads(self):
+        pool = DriverPool(Factory(), size=4, max_uses=1000)
+
+        def use_sessions():
+            for _ in range(50):
+                pool.release(pool.acquire())
+
+        threads = [threading.Thread(target=use_sessions) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert pool.launches + pool.reuses == 200
@@ -0,0 +1,154 @@
+import contextlib
+import multiprocessing
+import os
+import sys
+import time
+
+import pytest
+
+from utils import driver_resolver
+
+
+def fake_install(driver_path, installs_log):
+    """_install stand-in that takes a while and logs each call, like a webdriver_manager download."""
+    def install(browser_type):
+        with open(installs_log, "a") as _f:
+            _f.write(f"{browser_type}\n")
+        time.sleep(0.2)
+        return driver_path, "webdriver_manager"
+    return install
+
+
+def resolve_in_worker(lockfile, driver_path, installs_log, results_log):
+    """One xdist worker resolving chrome with an empty process cache."""
+    os.environ["DRIVER_LOCKFILE"] = lockfile
+    driver_resolver.browser_version = lambda browser_type: "124.0.1"
+    driver_resolver._install = fake_install(driver_path, installs_log)
+    path = driver_resolver.resolve_driver_path("chrome")
+    with open(results_log, "a") as _f:
+        _f.write(f"{path}\n")
+
+
+class FakeWinreg:
+    """winreg with the given {key: version} values under every root key."""
+    HKEY_CURRENT_USER = "HKCU"
+    HKEY_LOCAL_MACHINE = "HKLM"
+
+    def __init__(self, versions):
+        self.versions = versions
+
+    @contextlib.contextmanager
+    def OpenKey(self, root_key, key):
+        if key not in self.versions:
+            raise FileNotFoundError(key)
+        yield key
+
+    def QueryValueEx(self, handle, value):
+        return self.versions[handle], 1
+
+
+@pytest.fixture
+def resolver(tmp_path, monkeypatch):
+    driver_path = tmp_path / "chromedriver"
+    driver_path.write_text("")
+    monkeypatch.setenv("DRIVER_LOCKFILE", str(tmp_path / "drivers.lock.json"))
+    monkeypatch.setattr(driver_resolver, "_RESOLVED", {})
+    monkeypatch.setattr(driver_resolver, "browser_version", lambda browser_type: "124.0.1")
+    monkeypatch.setattr(driver_resolver, "_install", fake_install(str(driver_path), str(tmp_path / "installs")))
+    return tmp_path
+
+
+def installs(tmp_path):
+    path = tmp_path / "installs"
+    return path.read_text().split() if path.exists() else []
+
+
+@pytest.mark.nondestructive
+class TestDriverResolver:
+    """Driver path caching in memory and in the shared lockfile, without downloading anything."""
+
+    def test_second_lookup_is_served_from_memory(self, resolver, monkeypatch):
+        path = driver_resolver.resolve_driver_path("chrome")
+        monkeypatch.setattr(driver_resolver, "_read_lockfile", lambda lockfile: pytest.fail("lockfile read"))
+
+        assert driver_resolver.resolve_driver_path("chrome") == path == str(resolver / "chromedriver")
+        assert installs(resolver) == ["chrome"]
+
+    def test_new_process_is_served_from_the_lockfile(self, resolver, monkeypatch):
+        driver_resolver.resolve_driver_path("chrome")
+        monkeypatch.setattr(driver_resolver, "_RESOLVED", {})
+
+        assert driver_resolver.resolve_driver_path("chrome") == str(resolver / "chromedriver")
+        assert installs(resolver) == ["chrome"]
+
+    def test_new_browser_version_or_missing_driver_resolves_again(self, resolver, monkeypatch):
+        driver_resolver.resolve_driver_path("chrome")
+        monkeypatch.setattr(driver_resolver, "_RESOLVED", {})
+        monkeypatch.setattr(driver_resolver, "browser_version", lambda browser_type: "125.0.1")
+        driver_resolver.resolve_driver_path("chrome")
+        assert installs(resolver) == ["chrome", "chrome"]
+
+        monkeypatch.setattr(driver_resolver, "_RESOLVED", {})
+        (resolver / "chromedriver").unlink()
+        driver_resolver.resolve_driver_path("chrome")
+        assert installs(resolver) == ["chrome", "chrome", "chrome"]
+
+    def test_unknown_browser_version_never_uses_the_lockfile(self, resolver, monkeypatch):
+        monkeypatch.setattr(driver_resolver, "browser_version", lambda browser_type: driver_resolver.UNKNOWN_VERSION)
+        driver_resolver.resolve_driver_path("chrome")
+        monkeypatch.setattr(driver_resolver, "_RESOLVED", {})
+        driver_resolver.resolve_driver_path("chrome")
+
+        assert installs(resolver) == ["chrome", "chrome"]
+        assert not (resolver / "drivers.lock.json").exists()
+
+    def test_selenium_manager_fallback_is_remembered(self, resolver, monkeypatch):
+        calls = []
+        monkeypatch.setattr(driver_resolver, "_install",
+                            lambda browser_type: calls.append(browser_type) or (None, "selenium_manager"))
+        assert driver_resolver.resolve_driver_path("firefox") is None
+        monkeypatch.setattr(driver_resolver, "_RESOLVED", {})
+        assert driver_resolver.resolve_driver_path("firefox") is None
+        assert calls == ["firefox"]
+
+        # ... but only for DRIVER_NEGATIVE_TTL hours
+        monkeypatch.setattr(driver_resolver, "_RESOLVED", {})
+        monkeypatch.setattr(driver_resolver, "NEGATIVE_TTL_HOURS", 0)
+        driver_resolver.resolve_driver_path("firefox")
+        assert calls == ["firefox", "firefox"]
+
+    def test_forget_drops_the_entry(self, resolver):
+        driver_resolver.resolve_driver_path("chrome")
+        driver_resolver.forget("chrome")
+        driver_resolver.resolve_driver_path("chrome")
+        assert installs(resolver) == ["chrome", "chrome"]
+
+    def test_version_from_install_location_or_registry(self, tmp_path, monkeypatch):
+        browser = tmp_path / "Google Chrome"
+        browser.write_text("#!/bin/sh\necho 'Google Chrome 124.0.6367.91'\n")
+        browser.chmod(0o755)
+        monkeypatch.setitem(driver_resolver.BROWSER_BINARIES, "chrome", [])
+        monkeypatch.setitem(driver_resolver.INSTALL_PATHS, "chrome", [str(browser)])
+        if os.name != "nt":
+            assert driver_resolver.browser_version("chrome") == "124.0.6367.91"
+
+        monkeypatch.setitem(driver_resolver.INSTALL_PATHS, "chrome", [])
+        monkeypatch.setitem(sys.modules, "winreg", FakeWinreg({r"Software\Google\Chrome\BLBeacon": "125.0.1"}))
+        assert driver_resolver.browser_version("chrome") == "125.0.1"
+        monkeypatch.setitem(sys.modules, "winreg", FakeWinreg({}))
+        assert driver_resolver.browser_version("chrome") == driver_resolver.UNKNOWN_VERSION
+
+    def test_concurrent_workers_install_once(self, tmp_path):
+        driver_path = tmp_path / "chromedriver"
+        driver_path.write_text("")
+        args = (str(tmp_path / "drivers.lock.json"), str(driver_path), str(tmp_path / "installs"),
+                str(tmp_path / "results"))
+        workers = [multiprocessing.Process(target=resolve_in_worker, args=args) for _ in range(3)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(30)
+            assert worker.exitcode == 0
+
+        assert installs(tmp_path) == ["chrome"]
+        assert (tmp_path / "results").read_text().split() == [str(driver_path)] * 3
@@ -0,0 +1,68 @@
+import json
+import os
+import time
+
+import pytest
+
+from utils import job_catalogue
+from utils.job_catalogue import JobRecord
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "careers_page.html")
+BASE_URL = "https://connecteam.com/careers/"
+
+
+def read_fixture_in_chunks(size):
+    """Yield the fixture in small chunks to exercise the streaming parser."""
+    with open(FIXTURE, encoding="utf-8") as _f:
+        html = _f.read()
+    for start in range(0, len(html), size):
+        yield html[start:start + size]
+
+
+@pytest.mark.nondestructive
+class TestJobCatalogue:
+    """Parse and cache the careers page job table without a browser."""
+
+    @pytest.mark.parametrize("chunk_size", [7, 64, 100000])
+    def test_parse_rows_per_department(self, chunk_size):
+        catalogue = job_catalogue.parse_catalogue(read_fixture_in_chunks(chunk_size), BASE_URL)
+
+        assert sorted(catalogue) == ["G&A", "R&D"]
+        rnd = catalogue["R&D"]
+        assert [record.index for record in rnd] == [0, 1, 2]
+        assert rnd[0].title == "Senior Backend Engineer"
+        assert rnd[0].url == "https://connecteam.com/careers/5417654004/"
+        assert rnd[0].job_id == "5417654004"
+        assert rnd[1].title == "Frontend Team Lead"
+        assert rnd[1].href == "https://connecteam.com/careers/5417654005/"
+        assert [record.can_apply for record in rnd] == [True, True, False]
+        assert catalogue["G&A"][0].link_text == "Apply now"
+
+    def test_cache_respects_ttl(self, tmp_path, monkeypatch):
+        cache_file = str(tmp_path / "catalogue.json")
+        fetches = []
+
+        def fake_fetch(url):
+            fetches.append(url)
+            return job_catalogue.parse_catalogue(read_fixture_in_chunks(1024), url)
+
+        monkeypatch.setattr(job_catalogue, "fetch_catalogue", fake_fetch)
+        monkeypatch.setattr(job_catalogue, "_MEMORY_CACHE", {})
+
+        first = job_catalogue.load_catalogue(BASE_URL, ttl=60, cache_file=cache_file)
+        # A fresh process only has the disk cache
+        monkeypatch.setattr(job_catalogue, "_MEMORY_CACHE", {})
+        second = job_catalogue.load_catalogue(BASE_URL, ttl=60, cache_file=cache_file)
+        assert len(fetches) == 1
+        assert second == first
+        assert isinstance(second["R&D"][0], JobRecord)
+
+        # Expire the disk entry
+        with open(cache_file) as _f:
+            entries = json.load(_f)
+        entries[BASE_URL]["fetched_at"] = time.time() - 120
+        with open(cache_file, "w") as _f:
+            json.dump(entries, _f)
+        monkeypatch.setattr(job_catalogue, "_MEMORY_CACHE", {})
+        job_catalogue.load_catalogue(BASE_URL, ttl=60, cache_file=cache_file)
+        assert len(fetches) == 2
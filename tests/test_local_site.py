@@ -0,0 +1,52 @@
+import time
+import urllib.request
+
+import pytest
+
+from utils import job_catalogue
+from utils.local_site import LocalCareersSite
+
+
+def fetch(url):
+    with urllib.request.urlopen(url, timeout=10) as response:
+        return response.read().decode("utf-8")
+
+
+@pytest.fixture
+def local_site():
+    site = LocalCareersSite(departments=3, openings=4, latency_ms=0, closed_every=4, withdrawn_every=3)
+    site.start()
+    yield site
+    site.stop()
+
+
+@pytest.mark.nondestructive
+class TestLocalSite:
+    """The stand-in site keeps the DOM contract the page objects rely on."""
+
+    def test_catalogue_scale(self, local_site):
+        catalogue = job_catalogue.fetch_catalogue(f"{local_site.url}careers/")
+
+        assert sorted(catalogue) == ["G&A", "Marketing", "R&D"]
+        rnd = catalogue["R&D"]
+        assert len(rnd) == 4
+        assert [record.can_apply for record in rnd] == [True, True, True, False]
+        assert rnd[0].url == f"{local_site.url}careers/{rnd[0].job_id}/"
+
+    def test_position_pages(self, local_site):
+        rnd = job_catalogue.fetch_catalogue(f"{local_site.url}careers/")["R&D"]
+
+        position = fetch(rnd[0].url)
+        assert "job__embedded-wrapper" in position and "grnhse_iframe" in position
+        form = fetch(f"{local_site.url}embed/job_app/{rnd[0].job_id}/")
+        for field in ("first_name", "last_name", "email", "phone", "resume"):
+            assert f'id="{field}"' in form
+        # Listed as "Apply now" but withdrawn: the job board search is shown instead of the form
+        assert 'id="keyword-filter-label"' in fetch(rnd[2].url)
+        assert 'href="/careers/"' in fetch(local_site.url)
+
+    def test_latency_injection(self, local_site):
+        local_site.latency_ms = 200
+        start_time = time.monotonic()
+        fetch(local_site.url)
+        assert time.monotonic() - start_time >= 0.2
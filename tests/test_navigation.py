@@ -0,0 +1,83 @@
+import pytest
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.command import Command
+
+from pages.base_page import BasePage
+from utils import navigation
+
+
+class FakeExecutor:
+    def __init__(self):
+        self.commands = []
+
+    def execute(self, command, params=None):
+        self.commands.append(command)
+        return {"value": None}
+
+
+class FakeBrowser:
+    """Stands in for a session on a page that is loaded and quiet; get() opens a new document."""
+    def __init__(self):
+        self.command_executor = FakeExecutor()
+        self.document = 1
+        self.settles = 0
+
+    def execute_script(self, script, *args):
+        self.command_executor.execute(Command.W3C_EXECUTE_SCRIPT, {"script": script, "args": list(args)})
+        if script == navigation.PROBE_SCRIPT:
+            return {"token": f"doc{self.document}", "soft": 0, "leaving": False, "readyState": "complete",
+                    "url": f"https://example.com/{self.document}", "pending": 0, "quietMs": 1000}
+        return []
+
+    def execute_async_script(self, script, *args):
+        self.command_executor.execute(Command.W3C_EXECUTE_SCRIPT_ASYNC, {"script": script, "args": list(args)})
+        self.settles += 1
+        return {"settled": True}
+
+    def get(self, url):
+        self.command_executor.execute(Command.GET, {"url": url})
+        self.document += 1
+
+    def click(self):
+        self.command_executor.execute(Command.CLICK_ELEMENT, {"id": "button"})
+
+
+@pytest.fixture
+def browser(monkeypatch):
+    monkeypatch.setattr(navigation, "ENABLED", True)
+    return navigation.instrument(FakeBrowser())
+
+
+@pytest.mark.nondestructive
+class TestNavigation:
+    """Readiness tracking of BasePage against a fake session."""
+
+    def test_second_wait_on_a_loaded_page_is_skipped(self, browser):
+        page = BasePage(browser, base_url="https://example.com/")
+        navigation.finish_test()
+        assert page.wait_for_page_load()
+        # Reading the page keeps it ready
+        page.harvest(By.CSS_SELECTOR, "a")
+        assert page.wait_for_page_load()
+
+        assert browser.settles == 1
+        assert navigation.finish_test() == 1
+        assert page.navigation.generation == 1 and page.navigation.url == "https://example.com/1"
+
+    def test_commands_that_change_the_page_clear_readiness(self, browser):
+        page = BasePage(browser, base_url="https://example.com/")
+        page.wait_for_page_load()
+        browser.click()
+        page.wait_for_page_load()
+        browser.get("https://example.com/2")
+        page.wait_for_page_load()
+
+        assert browser.settles == 3
+        assert page.navigation.generation == 2
+
+    def test_unwatched_sessions_always_wait(self):
+        browser = FakeBrowser()
+        page = BasePage(browser, base_url="https://example.com/")
+        page.wait_for_page_load()
+        page.wait_for_page_load()
+        assert browser.settles == 2
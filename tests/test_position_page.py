@@ -0,0 +1,45 @@
+import pytest
+
+from pages import base_page, position_page
+from pages.position_page import PositionPage
+
+
+class FakeBrowser:
+    """A loaded position page showing the elements whose selectors contain one of `shown`."""
+    def __init__(self, *shown):
+        self.shown = list(shown)
+
+    def execute_script(self, script, *args):
+        if script == "return document.readyState":
+            return "complete"
+        if script == base_page.ELEMENT_STATE_SCRIPT:
+            for index, (kind, selector, state) in enumerate(args[0]):
+                if any(element in selector for element in self.shown):
+                    return [index, object()]
+            return None
+        raise AssertionError("unexpected script")
+
+
+@pytest.mark.nondestructive
+class TestPositionPage:
+    """Which outcome a position page resolves to, against a fake session."""
+
+    def test_open_position_showing_the_job_search_is_not_closed(self):
+        page = PositionPage(FakeBrowser("keyword-filter-label", "job__embedded-wrapper", "grnhse_iframe"))
+        page_state = page.check_page_loaded()
+        assert page_state == position_page.EMBEDDED
+        assert page.form_outcome(page_state) == position_page.FORM
+
+    def test_job_search_before_the_form_waits_for_it(self, monkeypatch):
+        monkeypatch.setattr(position_page, "FORM_GRACE", 0.3)
+        browser = FakeBrowser("keyword-filter-label")
+        page = PositionPage(browser)
+        assert page.check_page_loaded() == position_page.CLOSED
+
+        browser.shown.append("grnhse_iframe")
+        assert page.form_outcome(position_page.CLOSED) == position_page.FORM
+
+    def test_job_search_without_a_form_is_closed(self, monkeypatch):
+        monkeypatch.setattr(position_page, "FORM_GRACE", 0.3)
+        page = PositionPage(FakeBrowser("keyword-filter-label"))
+        assert page.form_outcome() == position_page.CLOSED
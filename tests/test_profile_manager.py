@@ -0,0 +1,80 @@
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from utils import profile_manager
+
+
+class FakeDriver:
+    def __init__(self):
+        self.quit_calls = 0
+
+    def quit(self):
+        self.quit_calls += 1
+
+
+def warm(directory):
+    """Stands in for a browser filling its profile on first start."""
+    os.makedirs(os.path.join(directory, "Default"))
+    with open(os.path.join(directory, "Default", "Preferences"), "w") as _f:
+        _f.write("{}")
+    with open(os.path.join(directory, "SingletonLock"), "w") as _f:
+        _f.write("held by the browser")
+
+
+@pytest.fixture
+def profile_root(tmp_path, monkeypatch):
+    monkeypatch.setenv("PROFILE_ROOT", str(tmp_path))
+    monkeypatch.setattr(profile_manager, "USE_TEMPLATE", True)
+    return tmp_path
+
+
+@pytest.mark.nondestructive
+class TestProfileManager:
+    """Template cloning and cleanup of browser profiles, without a browser."""
+
+    def test_sessions_get_a_clone_of_the_template(self, profile_root):
+        warmed = []
+        first = profile_manager.acquire("chrome", "a", warm=lambda directory: warmed.append(warm(directory)))
+        second = profile_manager.acquire("chrome", "b", warm=lambda directory: warmed.append(warm(directory)))
+
+        assert len(warmed) == 1
+        for path in (first, second):
+            assert os.path.exists(os.path.join(path, "Default", "Preferences"))
+            assert not os.path.exists(os.path.join(path, "SingletonLock"))
+
+    def test_profile_is_removed_when_the_session_quits(self, profile_root):
+        path = profile_manager.acquire("chrome", "c", warm=warm)
+        driver = profile_manager.attach(FakeDriver(), path)
+
+        driver.quit()
+        assert not os.path.exists(path)
+        assert os.path.exists(profile_manager.template_path("chrome"))
+
+    def test_cleanup_stale_removes_abandoned_profiles_only(self, tmp_path):
+        finished = subprocess.Popen([sys.executable, "-c", "pass"])
+        finished.wait()
+        owners = {"chrome_profile_finished": finished.pid, "chrome_profile_running": os.getpid()}
+        for name in ("chrome_profile_finished", "chrome_profile_running", "firefox_profile_old",
+                     "firefox_profile_new", "unrelated"):
+            os.makedirs(tmp_path / name / "nested")
+            if name in owners:
+                (tmp_path / name / profile_manager.OWNER_FILE).write_text(str(owners[name]))
+        two_days_ago = time.time() - 48 * 3600
+        for name in ("chrome_profile_running", "firefox_profile_old", "unrelated"):
+            os.utime(tmp_path / name, (two_days_ago, two_days_ago))
+
+        assert profile_manager.cleanup_stale([str(tmp_path)]) == 2
+        # Another run's live profile stays however old; an unowned one only once past the age limit
+        assert sorted(os.listdir(tmp_path)) == ["chrome_profile_running", "firefox_profile_new", "unrelated"]
+
+    def test_acquired_profile_records_its_owner(self, profile_root, monkeypatch):
+        monkeypatch.setattr(profile_manager, "USE_TEMPLATE", False)
+        path = profile_manager.acquire("firefox", "d")
+
+        assert not profile_manager.is_stale(path)
+        assert profile_manager.cleanup_stale([str(profile_root)]) == 0
+        profile_manager.remove(path)
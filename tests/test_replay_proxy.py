@@ -0,0 +1,52 @@
+import urllib.error
+import urllib.request
+
+import pytest
+
+from utils import replay_proxy
+from utils.local_site import LocalCareersSite
+from utils.replay_proxy import ReplayProxy
+
+
+def fetch(proxy, url):
+    opener = urllib.request.build_opener(urllib.request.ProxyHandler({"http": f"http://{proxy.address}"}))
+    with opener.open(url, timeout=10) as response:
+        return response.read()
+
+
+@pytest.fixture
+def recorded(tmp_path):
+    """Careers page of a local site recorded through the proxy, with the site stopped afterwards."""
+    site = LocalCareersSite(departments=1, openings=3)
+    site.start()
+    proxy = ReplayProxy(replay_proxy.RECORD, directory=str(tmp_path), ignore_params=["_"])
+    proxy.start()
+    body = fetch(proxy, f"{site.url}careers/?_=1")
+    proxy.stop()
+    site.stop()
+    return site.url, body
+
+
+@pytest.mark.nondestructive
+class TestReplayProxy:
+    """Record/replay against the local stand-in site."""
+
+    def test_replay_serves_from_disk_without_the_site(self, recorded, tmp_path):
+        url, body = recorded
+        proxy = ReplayProxy(replay_proxy.REPLAY, directory=str(tmp_path), ignore_params=["_"])
+        proxy.start()
+        try:
+            # The cache-busting parameter is not part of the key
+            assert fetch(proxy, f"{url}careers/?_=2") == body
+            with pytest.raises(urllib.error.HTTPError) as error:
+                fetch(proxy, f"{url}careers/1/")
+            assert error.value.code == 504
+        finally:
+            proxy.stop()
+
+    def test_key_includes_method_and_body(self, tmp_path):
+        proxy = ReplayProxy(replay_proxy.REPLAY, directory=str(tmp_path), ignore_params=["_"])
+        url = "https://example.com/api?b=1&_=5"
+        assert proxy.key("GET", url) == proxy.key("GET", "https://EXAMPLE.com/api?b=1")
+        assert proxy.key("GET", url) != proxy.key("POST", url)
+        assert proxy.key("POST", url, b"a") != proxy.key("POST", url, b"b")
@@ -0,0 +1,81 @@
+import csv
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from utils import resource_monitor
+from utils.driver_pool import DriverPool
+
+# Holds ~50 MiB until stdin closes
+ALLOCATE = "import sys; block = bytearray(50 * 2 ** 20); block[::4096] = b'x' * len(block[::4096]); sys.stdin.read()"
+
+
+class FakeService:
+    def __init__(self, process):
+        self.process = process
+
+
+class FakeDriver:
+    def __init__(self, process):
+        self.service = FakeService(process)
+        self.quit_calls = 0
+
+    def quit(self):
+        self.quit_calls += 1
+
+
+@pytest.fixture
+def browser():
+    """A 'driver service' process with a child holding 50 MiB, standing in for chromedriver and Chrome."""
+    if not resource_monitor.available():
+        pytest.skip("needs /proc")
+    process = subprocess.Popen(
+        [sys.executable, "-c", f"import subprocess, sys; subprocess.run([sys.executable, '-c', {ALLOCATE!r}])"],
+        stdin=subprocess.PIPE,
+    )
+    # Wait until the child has allocated its block
+    give_up = time.monotonic() + 10
+    while resource_monitor.usage([process.pid])[0] < 50 * 2 ** 20 and time.monotonic() < give_up:
+        time.sleep(0.01)
+    yield FakeDriver(process)
+    process.stdin.close()
+    process.wait(timeout=10)
+
+
+@pytest.mark.nondestructive
+class TestResourceMonitor:
+    """Sampling of a stand-in process tree through /proc, and memory-based recycling."""
+
+    def test_samples_cover_the_whole_tree(self, browser, tmp_path, monkeypatch):
+        monkeypatch.setenv("RESOURCE_MONITOR", "true")
+        monkeypatch.setenv("RESOURCE_MONITOR_DIR", str(tmp_path))
+        monkeypatch.setattr(resource_monitor, "SAMPLE_INTERVAL", 0.01)
+        assert len(resource_monitor.process_tree([browser.service.process.pid])) == 2
+
+        sampler = resource_monitor.start_test(browser, "tests/test_x.py::test_y")
+        resource_monitor.opening_processed()
+        resource_monitor.opening_processed()
+        assert resource_monitor.finish_test() is sampler
+
+        summary = sampler.summary()
+        assert summary["peak_rss_mb"] >= summary["mean_rss_mb"] >= 50
+        assert summary["peak_processes"] == 2 and summary["openings"] == 2
+
+        path = sampler.write()
+        with open(path) as _f:
+            rows = list(csv.DictReader(_f))
+        assert rows[-1]["openings"] == "2"
+        with open(os.path.join(str(tmp_path), resource_monitor.TESTS_FILE)) as _f:
+            assert [row["test"] for row in csv.DictReader(_f)] == ["tests/test_x.py::test_y"]
+
+    def test_pool_recycles_a_session_over_the_memory_limit(self, browser, monkeypatch):
+        monkeypatch.setenv("RESOURCE_MONITOR", "true")
+        pool = DriverPool(lambda session_id: browser, max_rss=10 * 2 ** 20)
+
+        session = pool.acquire()
+        pool.release(session, rss=resource_monitor.session_rss(browser))
+        assert browser.quit_calls == 1
+        assert pool.recycles == 1
@@ -0,0 +1,49 @@
+import urllib.parse
+
+import pytest
+from selenium.webdriver.chrome.options import Options as ChromeOptions
+from selenium.webdriver.firefox.options import Options as FirefoxOptions
+
+from utils import resource_policy
+
+
+@pytest.fixture
+def trimmed(monkeypatch):
+    monkeypatch.setattr(resource_policy, "BLOCK_RESOURCES", True)
+    monkeypatch.setattr(resource_policy, "BLOCKED_URLS", ["*chat.example.com*"])
+    monkeypatch.setattr(resource_policy, "BLOCK_IMAGES", True)
+    monkeypatch.setattr(resource_policy, "HEADLESS", True)
+
+
+@pytest.mark.nondestructive
+class TestResourcePolicy:
+    """Browser options and page-weight report of the resource policy, without a browser."""
+
+    def test_chrome_options(self, trimmed):
+        options = resource_policy.apply_options("chrome", ChromeOptions())
+        assert "--headless=new" in options.arguments
+        assert options.experimental_options["prefs"] == {"profile.managed_default_content_settings.images": 2}
+        assert "*chat.example.com*" in resource_policy.blocked_urls()
+        assert resource_policy.mode() == resource_policy.TRIMMED
+
+    def test_firefox_blocks_through_a_pac_script(self, trimmed):
+        options = resource_policy.apply_options("firefox", FirefoxOptions())
+        assert "-headless" in options.arguments
+        assert options.preferences["permissions.default.image"] == 2
+        pac = urllib.parse.unquote(options.preferences["network.proxy.autoconfig_url"])
+        assert "*chat.example.com*" in pac and resource_policy.BLACKHOLE_PROXY in pac
+
+    def test_report_shows_savings_against_the_full_run(self, trimmed, tmp_path, monkeypatch):
+        monkeypatch.setenv("PAGE_WEIGHT_FILE", str(tmp_path / "page_weight.json"))
+        full_run = {"example.com/careers/": {"loads": 2, "requests": 240, "bytes": 4096000, "load_ms": 6000}}
+        monkeypatch.setattr(resource_policy, "BLOCK_RESOURCES", False)
+        monkeypatch.setattr(resource_policy, "BLOCKED_URLS", [])
+        monkeypatch.setattr(resource_policy, "BLOCK_IMAGES", False)
+        resource_policy.save(full_run)
+
+        monkeypatch.setattr(resource_policy, "BLOCK_RESOURCES", True)
+        lines = resource_policy.format_report(
+            {"example.com/careers/": {"loads": 1, "requests": 40, "bytes": 1024000, "load_ms": 1000}}
+        )
+        assert lines[0].startswith("policy: trimmed")
+        assert "trimmed saves 80 requests, 1000 KiB, 2000 ms per load" in lines[1]
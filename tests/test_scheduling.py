@@ -0,0 +1,116 @@
+import heapq
+import json
+
+import pytest
+
+from utils import duration_history
+from utils.scheduling import LongestFirstScheduling
+
+# Seconds each test took in recorded runs; test_new has no history
+HISTORY = {
+    "tests/test_x.py::test_a": [2.0, 3.0, 100.0],
+    "tests/test_x.py::test_b": [10.0],
+    "tests/test_x.py::test_c": [6.0],
+    "tests/test_x.py::test_d": [5.0],
+    "tests/test_x.py::test_e": [1.0],
+}
+COLLECTION = ["tests/test_x.py::test_a", "tests/test_x.py::test_new", "tests/test_x.py::test_b",
+              "tests/test_x.py::test_c", "tests/test_x.py::test_d", "tests/test_x.py::test_e"]
+
+
+class FakeConfig:
+    def __init__(self, workers):
+        self.workers = workers
+
+    def getvalue(self, name):
+        return [f"{self.workers}*popen"]
+
+    def getoption(self, name):
+        return None
+
+
+class FakeGateway:
+    def __init__(self, name):
+        self.id = name
+
+
+class FakeNode:
+    """A worker that records the tests it is sent."""
+    def __init__(self, name):
+        self.name = name
+        self.gateway = FakeGateway(name)
+        self.queue = []
+        self.shutting_down = False
+
+    def send_runtest_some(self, indices):
+        self.queue.extend(indices)
+
+    def shutdown(self):
+        self.shutting_down = True
+
+
+def run(scheduler, nodes, durations):
+    """Play the schedule out in simulated time; returns (makespan, {node name: tests run in order})."""
+    ran = {node.name: [] for node in nodes}
+    # (time the node finishes its current test, node index)
+    busy = [(0.0, index) for index in range(len(nodes))]
+    finished = 0.0
+    while busy:
+        now, index = heapq.heappop(busy)
+        node = nodes[index]
+        finished = max(finished, now)
+        if ran[node.name]:
+            scheduler.mark_test_complete(node, ran[node.name][-1])
+        if not node.queue:
+            continue
+        test = node.queue.pop(0)
+        ran[node.name].append(test)
+        heapq.heappush(busy, (now + durations[scheduler.collection[test]], index))
+    return finished, ran
+
+
+@pytest.fixture
+def history(tmp_path, monkeypatch):
+    path = tmp_path / "durations.json"
+    path.write_text(json.dumps({"tests": HISTORY, "functions": {}}))
+    monkeypatch.setenv("DURATION_HISTORY_FILE", str(path))
+    return path
+
+
+@pytest.mark.nondestructive
+class TestScheduling:
+    """Longest-first dispatch and makespan planning, without xdist workers."""
+
+    def test_expected_durations_use_the_median_and_the_mean_for_new_tests(self, history):
+        expected = duration_history.expected_durations(COLLECTION)
+
+        assert expected["tests/test_x.py::test_a"] == 3.0
+        assert expected["tests/test_x.py::test_new"] == pytest.approx((3 + 10 + 6 + 5 + 1) / 5)
+        assert duration_history.has_history(COLLECTION)
+        assert not duration_history.has_history(["tests/test_x.py::test_new"])
+
+    def test_plan_makespan_is_longest_first_on_the_least_busy_worker(self):
+        assert duration_history.plan_makespan([3, 3, 2, 2, 2], 2) == 7
+        assert duration_history.plan_makespan([5, 1, 1], 4) == 5
+        assert duration_history.plan_makespan([2, 2], 1) == 4
+
+    def test_longest_tests_are_dispatched_first(self, history):
+        nodes = [FakeNode("gw0"), FakeNode("gw1")]
+        scheduler = LongestFirstScheduling(FakeConfig(len(nodes)))
+        for node in nodes:
+            scheduler.add_node(node)
+            scheduler.add_node_collection(node, COLLECTION)
+        scheduler.schedule()
+
+        queued = [[scheduler.collection[index].split("::")[1] for index in node.queue] for node in nodes]
+        # Dealt round-robin from the longest end, so each worker starts with one of the two longest
+        assert queued == [["test_b", "test_new"], ["test_c", "test_d"]]
+
+        durations = duration_history.expected_durations(COLLECTION)
+        makespan, ran = run(scheduler, nodes, durations)
+        assert sorted(index for tests in ran.values() for index in tests) == list(range(len(COLLECTION)))
+        assert all(node.shutting_down for node in nodes)
+        assert scheduler.expected_makespan == duration_history.plan_makespan(durations.values(), 2) == 15
+        # Workers ask for their next test one test early, so the last short test can land on the
+        # worker that asked first rather than on the one that frees up first
+        assert scheduler.expected_makespan <= makespan <= scheduler.expected_makespan + min(durations.values())
@@ -0,0 +1,99 @@
+import pytest
+
+from pages import base_page
+from pages.careers_page import CareersPage
+from utils import application_results, checkpoint
+from utils.checkpoint import CheckpointStore
+from utils.locators import CareersPageLocators
+
+
+def card(index, job_id, text="Apply now"):
+    return {"index": index, "text": text, "href": f"/careers/{job_id}/", "url": None, "department": "R&D",
+            "row_index": index, "visible": True}
+
+
+class FakeBrowser:
+    """Answers the harvest, click and table-watch scripts from a list of job cards."""
+    def __init__(self, cards):
+        self.cards = cards
+        self.generation = ["watch1", 0]
+        self.scripts = []
+        self.clicked = []
+
+    def execute_script(self, script, *args):
+        self.scripts.append((script, args))
+        if script == base_page.TABLE_WATCH_SCRIPT:
+            return list(self.generation) if self.cards else None
+        if script == base_page.HARVEST_SCRIPT:
+            return list(self.cards)
+        if script == base_page.CLICK_MATCH_SCRIPT:
+            kind, selector, index, expected_href = args
+            # Same fallback as the script: the card at index, unless it lost the expected href
+            target = self.cards[index] if index < len(self.cards) else None
+            if expected_href is not None and (target is None or target["href"] != expected_href):
+                target = next((c for c in self.cards if c["href"] == expected_href), None)
+            if target is None:
+                return False
+            self.clicked.append(target["href"])
+            return True
+        raise AssertionError("unexpected script")
+
+
+@pytest.mark.nondestructive
+class TestTableWatch:
+    """Job-card re-resolution driven by the job table generation, against a fake session."""
+
+    def test_harvest_takes_every_card_in_one_round_trip(self):
+        cards = [card(0, 1), card(1, 2, text="Closed")]
+        browser = FakeBrowser(list(cards))
+        page = CareersPage(browser)
+
+        assert page.harvest(*CareersPageLocators(param="R&D").RND_JOB_CARDS) == cards
+        assert browser.scripts == [(base_page.HARVEST_SCRIPT, (
+            "css", '[role="row"][data-department="R&D"] td[class="link"] a'
+        ))]
+
+    def test_click_harvested_follows_the_href_when_the_cards_moved(self):
+        browser = FakeBrowser([card(0, 1), card(1, 2), card(2, 3)])
+        page = CareersPage(browser)
+        locator = CareersPageLocators(param="R&D").RND_JOB_CARDS
+
+        assert page.click_harvested(*locator, index=1, expected_href="/careers/2/")
+        # A card was inserted above: index 1 now holds another opening, so the href decides
+        browser.cards.insert(0, card(0, 4))
+        assert page.click_harvested(*locator, index=1, expected_href="/careers/2/")
+        assert page.click_harvested(*locator, index=0)
+        assert not page.click_harvested(*locator, index=1, expected_href="/careers/9/")
+        assert browser.clicked == ["/careers/2/", "/careers/2/", "/careers/4/"]
+        assert len(browser.scripts) == 4
+
+    def test_generation_changes_with_the_table(self):
+        browser = FakeBrowser([card(0, 1)])
+        page = CareersPage(browser)
+        first = page.job_table_generation("R&D")
+        assert page.job_table_generation("R&D") == first == ("watch1", 0)
+
+        browser.generation[1] = 3
+        assert page.job_table_generation("R&D") != first
+        browser.cards = []
+        assert page.job_table_generation("R&D") is None
+
+    def test_reresolve_matches_cards_by_href(self, tmp_path, monkeypatch):
+        store = CheckpointStore("run_test", directory=str(tmp_path))
+        monkeypatch.setitem(checkpoint._ACTIVE, "store", store)
+        monkeypatch.setitem(checkpoint._ACTIVE, "configured", True)
+        browser = FakeBrowser([card(0, 1), card(1, 3), card(2, 4), card(3, 5, text="Closed")])
+        page = CareersPage(browser)
+        pending = [card(2, 2), card(3, 3)]
+        seen = {"/careers/1/", "/careers/2/", "/careers/3/"}
+        results = []
+
+        job_card = page._reresolve_job_cards("R&D", card(0, 1), pending, seen, results)
+
+        assert job_card == card(0, 1)
+        # 3 moved up a row, 4 and 5 are new, 2 is gone and reported rather than silently dropped
+        assert [(c["href"], c["index"]) for c in pending] == [("/careers/3/", 1), ("/careers/4/", 2),
+                                                              ("/careers/5/", 3)]
+        assert [(r.url, r.status) for r in results] == [("/careers/2/", application_results.CLOSED)]
+        # ... and checkpointed, so a resumed run doesn't look for it again
+        assert CheckpointStore("run_test", resume=True, directory=str(tmp_path)).is_done("R&D", "/careers/2/")
@@ -0,0 +1,60 @@
+import json
+import threading
+
+import allure
+import pytest
+
+from utils import tracing
+from utils.tracing import traced
+
+
+class Page:
+    @traced
+    def outer(self):
+        with tracing.span("inner wait", tracing.WAIT):
+            with allure.step("Allure step"):
+                pass
+        return "done"
+
+
+@pytest.fixture
+def tracer():
+    was_enabled = tracing.enabled()
+    tracing.enable()
+    yield tracing.start_test("tests/test_tracing.py::example")
+    tracing.finish_test()
+    if not was_enabled:
+        tracing.disable()
+
+
+@pytest.mark.nondestructive
+class TestTracing:
+    """Span nesting and trace-event output, without a browser."""
+
+    def test_nested_spans_and_allure_steps(self, tracer, tmp_path):
+        assert Page().outer() == "done"
+
+        spans = {span["name"]: span for span in tracer.spans}
+        assert [spans[name]["depth"] for name in ("Page.outer", "inner wait", "Allure step")] == [0, 1, 2]
+        assert spans["Allure step"]["cat"] == tracing.STEP
+        assert spans["Page.outer"]["dur_ns"] >= spans["inner wait"]["dur_ns"] >= spans["Allure step"]["dur_ns"]
+
+        with open(tracer.write(str(tmp_path))) as _f:
+            events = json.load(_f)["traceEvents"]
+        complete = [event for event in events if event["ph"] == "X"]
+        assert [event["name"] for event in complete] == ["Page.outer", "inner wait", "Allure step"]
+        assert "Page.outer" in tracer.summary(top_n=2)
+
+    def test_worker_threads_get_their_own_track(self, tracer):
+        thread = threading.Thread(target=Page().outer, name="opening_0")
+        thread.start()
+        thread.join()
+        Page().outer()
+
+        assert len({span["tid"] for span in tracer.spans}) == 2
+        assert "opening_0" in tracer.threads.values()
+
+    def test_nothing_recorded_without_a_test(self):
+        tracing.finish_test()
+        assert tracing.span("anything") is tracing.span("anything else")
+        assert Page().outer() == "done"
@@ -0,0 +1,58 @@
+import itertools
+import time
+
+import pytest
+from selenium.common.exceptions import JavascriptException, TimeoutException
+from selenium.webdriver.common.by import By
+
+from pages.base_page import BasePage
+from utils import wait_engine
+
+
+class SlowPage:
+    """Stands in for a driver whose condition becomes true on the n-th poll."""
+    def __init__(self, ready_on):
+        self.polls = 0
+        self.ready_on = ready_on
+
+    def __call__(self, driver):
+        self.polls += 1
+        if self.polls == 1:
+            raise JavascriptException("document unloaded while waiting for result")
+        return "element" if self.polls >= self.ready_on else None
+
+
+@pytest.mark.nondestructive
+class TestWaitEngine:
+    """Polling and backoff of the explicit-wait engine, without a browser."""
+
+    def test_intervals_back_off_to_the_cap(self):
+        delays = list(itertools.islice(wait_engine.intervals(0.05, 0.5, 2), 6))
+        assert delays == [0.05, 0.1, 0.2, 0.4, 0.5, 0.5]
+
+    def test_poll_returns_the_value_and_ignores_transient_errors(self):
+        condition = SlowPage(ready_on=3)
+        assert wait_engine.poll(None, condition, 5, "SlowPage.wait") == "element"
+        assert condition.polls == 3
+
+    def test_poll_times_out_on_time(self):
+        start_time = time.monotonic()
+        with pytest.raises(TimeoutException):
+            wait_engine.poll(None, SlowPage(ready_on=1000), 0.3, "SlowPage.wait")
+        assert 0.3 <= time.monotonic() - start_time < 0.6
+
+    def test_script_errors_after_the_first_poll_are_raised(self):
+        def invalid_selector(driver):
+            raise JavascriptException("'#1' is not a valid selector")
+
+        start_time = time.monotonic()
+        with pytest.raises(JavascriptException):
+            wait_engine.poll(None, invalid_selector, 5, "SlowPage.wait")
+        assert time.monotonic() - start_time < 1
+
+    def test_script_selectors_quote_locator_values(self):
+        assert BasePage._script_selector(By.ID, 'say "hi"') == ("css", r'[id="say \"hi\""]')
+        assert BasePage._script_selector(By.NAME, "a\\b") == ("css", r'[name="a\\b"]')
+        assert BasePage._script_selector(By.LINK_TEXT, 'say "hi"') == ("xpath", """//a[normalize-space(.)='say "hi"']""")
+        assert BasePage._script_selector(By.PARTIAL_LINK_TEXT, 'it\'s "hi"') == \
+            ("xpath", """//a[contains(., concat("it's ", '"', "hi", '"', ""))]""")
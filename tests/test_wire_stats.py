@@ -0,0 +1,103 @@
+import time
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.errorhandler import ErrorHandler
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from pages.base_page import BasePage
+from pages.careers_page import CareersPage
+from utils import navigation, profile_manager, run_report, wire_stats
+
+# Seconds the fake driver takes per command
+LATENCY = {Command.W3C_EXECUTE_SCRIPT: 0.05, Command.GET_TITLE: 0.01}
+
+
+class FakeExecutor:
+    """Answers every command after its LATENCY; a GET fails like a dead session."""
+    def execute(self, command, params=None):
+        time.sleep(LATENCY.get(command, 0))
+        if command == Command.GET:
+            raise WebDriverException("session is gone")
+        if command == Command.GET_TITLE:
+            return {"value": "Careers"}
+        return {"value": [{"index": 0, "text": "Apply now"}]}
+
+    def close(self):
+        pass
+
+
+def fake_session():
+    """A real WebDriver, so commands go through Selenium's frames, talking to FakeExecutor."""
+    driver = WebDriver.__new__(WebDriver)
+    driver.command_executor = FakeExecutor()
+    driver.session_id = "fake"
+    driver.error_handler = ErrorHandler()
+    driver._websocket_connection = None
+    driver._request = None
+    return wire_stats.instrument(driver)
+
+
+@pytest.mark.nondestructive
+class TestWireStatsAttribution:
+    """Per-method attribution of WebDriver commands, against a fake driver."""
+
+    def test_commands_are_attributed_to_the_issuing_method(self):
+        driver = fake_session()
+        stats = wire_stats.start_test("test_attribution")
+        CareersPage(driver).job_table_generation("R&D")
+        BasePage(driver, base_url="https://example.com/").harvest(By.CSS_SELECTOR, "a")
+        assert driver.title == "Careers"
+        with pytest.raises(WebDriverException):
+            driver.get("https://example.com/")
+        assert wire_stats.finish_test() is stats
+
+        methods = stats.to_dict()["methods"]
+        test_method = "TestWireStatsAttribution.test_commands_are_attributed_to_the_issuing_method"
+        assert sorted(methods) == ["BasePage.harvest", "CareersPage.job_table_generation", test_method]
+        assert list(methods["CareersPage.job_table_generation"]["commands"]) == [Command.W3C_EXECUTE_SCRIPT]
+        # Failed commands are counted too
+        assert methods[test_method]["commands"][Command.GET]["count"] == 1
+        assert methods[test_method]["count"] == 2
+
+    def test_wire_time_and_sizes_are_attributed_per_command(self):
+        driver = fake_session()
+        stats = wire_stats.start_test("test_timing")
+        page = BasePage(driver, base_url="https://example.com/")
+        for _ in range(3):
+            page.harvest(By.CSS_SELECTOR, "a")
+        driver.title
+        wire_stats.finish_test()
+
+        harvest = stats.to_dict()["methods"]["BasePage.harvest"]["commands"][Command.W3C_EXECUTE_SCRIPT]
+        assert harvest["count"] == 3
+        assert 0.15 <= harvest["seconds"] < 0.15 + 0.1
+        assert harvest["bytes_sent"] > 0 and harvest["bytes_received"] > 0
+        test_method = "TestWireStatsAttribution.test_wire_time_and_sizes_are_attributed_per_command"
+        assert 0.01 <= stats.to_dict()["methods"][test_method]["seconds"] < harvest["seconds"]
+
+        # The same commands reach the run-wide counters
+        assert run_report.section(wire_stats.REPORT_SECTION)["BasePage.harvest"]["commands"] == 3
+
+    def test_session_wrappers_are_not_attributed(self, tmp_path):
+        # Wrapped in the order utils.driver_factory.create_driver wraps a session
+        driver = profile_manager.attach(navigation.instrument(fake_session()), str(tmp_path / "profile"))
+        stats = wire_stats.start_test("test_wrappers")
+        assert driver.title == "Careers"
+        CareersPage(driver).job_table_generation("R&D")
+        driver.quit()
+        wire_stats.finish_test()
+
+        test_method = "TestWireStatsAttribution.test_session_wrappers_are_not_attributed"
+        methods = stats.to_dict()["methods"]
+        assert sorted(methods) == ["CareersPage.job_table_generation", test_method]
+        assert sorted(methods[test_method]["commands"]) == sorted([Command.GET_TITLE, Command.QUIT])
+
+    def test_instrumenting_twice_records_once(self):
+        driver = wire_stats.instrument(fake_session())
+        stats = wire_stats.start_test("test_twice")
+        driver.title
+        wire_stats.finish_test()
+        assert stats.to_dict()["count"] == 1
@@ -0,0 +1,43 @@
+# utils/application_results.py
+from dataclasses import dataclass, asdict
+
+# -----------------------------------------------------------------------------
+# CONSTANTS
+# -----------------------------------------------------------------------------
+APPLIED = "applied"
+CLOSED = "closed"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+
+@dataclass
+class OpeningResult:
+    """Outcome of applying to one opening."""
+    department: str
+    index: int
+    url: str
+    status: str
+    duration: float = 0.0
+    error: str = ""
+
+    def to_dict(self):
+        return asdict(self)
+
+
+def format_summary(department_name, results, wall_time=None):
+    """Human-readable per-department summary, one line per opening.
+    wall_time (for concurrent runs) adds how much faster than back-to-back the openings finished."""
+    counts = {}
+    for result in results:
+        counts[result.status] = counts.get(result.status, 0) + 1
+    totals = ", ".join(f"{status}: {count}" for status, count in sorted(counts.items()))
+    lines = [f"{department_name}: {len(results)} openings ({totals or 'none'})"]
+    if wall_time:
+        busy_time = sum(result.duration for result in results)
+        lines.append(f"  wall time {wall_time:.1f}s for {busy_time:.1f}s of work ({busy_time / wall_time:.1f}x)")
+    for result in sorted(results, key=lambda r: r.index):
+        line = f"  [{result.index}] {result.status:<8} {result.duration:6.1f}s  {result.url}"
+        if result.error:
+            line += f"  -- {result.error}"
+        lines.append(line)
+    return "\n".join(lines)
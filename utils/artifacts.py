@@ -0,0 +1,326 @@
+# utils/artifacts.py
+"""
+Screenshot pipeline: capture on the calling thread, write off it.
+
+Only the capture round trip stays on the test thread. The base64 screenshot is handed to a
+background writer thread, which decodes it, hashes it, optionally recompresses it with Pillow and
+stores it once per content hash in `reports/artifacts/`. The queue is bounded, so a test thread
+only waits when the writer falls behind.
+
+Allure ties attachments to the thread running the test, so they are made there:
+  * screenshots taken on the test thread inside an Allure step are attached when that step ends,
+    the others when the test ends (flush()); each identical frame only once per test;
+  * screenshots taken by a deferred page object go into its DeferredAllure recorder and are
+    attached in place when it is replayed.
+
+SCREENSHOT_POLICY decides which screenshots are taken:
+  * on-step (default): every screenshot the page objects take, progress and error alike;
+  * always: the same, plus one when each Allure step of the test ends;
+  * on-failure-only: only error screenshots and one of the page a failed test ended on.
+"""
+import base64
+import contextlib
+import hashlib
+import io
+import logging
+import os
+import queue
+import threading
+import time
+
+import allure
+import allure_commons
+from decouple import config
+
+from utils import run_report, tracing
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+LOGGER = logging.getLogger(__name__)
+
+# -----------------------------------------------------------------------------
+# CONSTANTS
+# -----------------------------------------------------------------------------
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_ARTIFACT_DIR = os.path.join(PROJECT_ROOT, "reports", "artifacts")
+REPORT_SECTION = "artifacts"
+
+ALWAYS = "always"
+ON_STEP = "on-step"
+ON_FAILURE_ONLY = "on-failure-only"
+POLICIES = (ALWAYS, ON_STEP, ON_FAILURE_ONLY)
+
+# Screenshot kinds
+STEP = "step"
+ERROR = "error"
+FAILURE = "failure"
+
+POLICY = config('SCREENSHOT_POLICY', default=ON_STEP)
+# png (stored as captured), or jpeg when Pillow is installed
+IMAGE_FORMAT = config('SCREENSHOT_FORMAT', default='png')
+JPEG_QUALITY = config('SCREENSHOT_QUALITY', default=70, cast=int)
+QUEUE_SIZE = config('SCREENSHOT_QUEUE_SIZE', default=16, cast=int)
+FLUSH_TIMEOUT = 30
+
+
+class Artifact(object):
+    """One screenshot on its way through the writer; wait() returns once it is on disk."""
+    def __init__(self, name, kind, encoded):
+        self.name = name
+        self.kind = kind
+        self.encoded = encoded
+        self.path = None
+        self.digest = None
+        self.duplicate = False
+        self.error = None
+        self._done = threading.Event()
+
+    @property
+    def attachment_type(self):
+        return allure.attachment_type.JPG if self.path and self.path.endswith(".jpg") else allure.attachment_type.PNG
+
+    def wait(self, timeout=FLUSH_TIMEOUT):
+        return self._done.wait(timeout) and self.path is not None
+
+    def finish(self, path=None, error=None):
+        self.path = path
+        self.error = error
+        # The writer is done with the base64 text
+        self.encoded = None
+        self._done.set()
+
+
+class ArtifactWriter(object):
+    """Background thread writing screenshots into a content-addressed directory."""
+    def __init__(self, directory=None, queue_size=QUEUE_SIZE, image_format=IMAGE_FORMAT, quality=JPEG_QUALITY):
+        self.directory = directory or config('ARTIFACT_DIR', default=DEFAULT_ARTIFACT_DIR)
+        self.image_format = image_format if Image is not None else "png"
+        self.quality = quality
+        self._queue = queue.Queue(maxsize=max(1, queue_size))
+        self._stored = {}
+        self._thread = threading.Thread(target=self._run, name="artifact-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, artifact):
+        """Queue an artifact; blocks only while the queue is full."""
+        start_time = time.monotonic()
+        self._queue.put(artifact)
+        run_report.add(REPORT_SECTION, "total", queue_wait=time.monotonic() - start_time)
+
+    def close(self, timeout=FLUSH_TIMEOUT):
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            artifact = self._queue.get()
+            if artifact is None:
+                return
+            start_time = time.monotonic()
+            try:
+                artifact.finish(self._write(artifact))
+            except Exception as e:
+                LOGGER.warning(f"Could not write screenshot {artifact.name}: {e}")
+                artifact.finish(error=e)
+            run_report.add(REPORT_SECTION, "total", write_seconds=time.monotonic() - start_time)
+
+    def _write(self, artifact):
+        png = base64.b64decode(artifact.encoded)
+        artifact.digest = hashlib.sha256(png).hexdigest()
+        if artifact.digest in self._stored:
+            artifact.duplicate = True
+            run_report.add(REPORT_SECTION, "total", duplicates=1)
+            return self._stored[artifact.digest]
+
+        body, extension = self._compress(png)
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{artifact.digest[:16]}.{extension}")
+        with open(path, "wb") as _f:
+            _f.write(body)
+        self._stored[artifact.digest] = path
+        run_report.add(REPORT_SECTION, "total", stored=1, bytes_captured=len(png), bytes_stored=len(body))
+        return path
+
+    def _compress(self, png):
+        if Image is None or self.image_format != "jpeg":
+            return png, "png"
+        output = io.BytesIO()
+        try:
+            Image.open(io.BytesIO(png)).convert("RGB").save(output, format="JPEG", quality=self.quality,
+                                                            optimize=True)
+        except Exception as e:
+            # Keep the screenshot as captured rather than lose it
+            LOGGER.debug(f"Could not recompress a screenshot, storing it as PNG: {e}")
+            return png, "png"
+        return output.getvalue(), "jpg"
+
+
+class _StepScreenshots(object):
+    """
+    Allure plugin attaching the screenshots taken inside each step of the watched test when the step
+    ends, so they stay in it; with policy 'always' it first takes one of the page the step left.
+    """
+    @allure_commons.hookimpl
+    def start_step(self, uuid, title, params):
+        if _watching():
+            with _LOCK:
+                _ACTIVE["steps"].append((uuid, title, []))
+
+    # Before Allure's own listener closes the step
+    @allure_commons.hookimpl(tryfirst=True)
+    def stop_step(self, uuid, exc_type, exc_val, exc_tb):
+        if not _watching() or not _ACTIVE["steps"] or _ACTIVE["steps"][-1][0] != uuid:
+            return
+        title = _ACTIVE["steps"][-1][1]
+        if POLICY == ALWAYS:
+            capture(_ACTIVE["driver"], f"After step: {title}", STEP)
+        with _LOCK:
+            _, _, pending = _ACTIVE["steps"].pop()
+        _attach_pending(pending)
+
+
+class _State(threading.local):
+    def __init__(self):
+        self.paused = False
+
+
+_THREAD = _State()
+_LOCK = threading.Lock()
+# pending: test-level screenshots; steps: (uuid, title, screenshots) of the watched test's open steps
+_ACTIVE = {"writer": None, "driver": None, "thread": None, "pending": [], "steps": [], "attached": set(),
+           "listener": None}
+
+
+def wants(kind, policy=None):
+    """Whether the screenshot policy takes screenshots of this kind."""
+    policy = policy or POLICY
+    if policy == ON_FAILURE_ONLY:
+        return kind in (ERROR, FAILURE)
+    return True
+
+
+def writer():
+    """The process-wide writer, started on first use."""
+    with _LOCK:
+        if _ACTIVE["writer"] is None:
+            _ACTIVE["writer"] = ArtifactWriter()
+        return _ACTIVE["writer"]
+
+
+def capture(driver, name, kind=STEP, recorder=None):
+    """
+    Take a screenshot now and queue it for writing. It is attached to recorder (a DeferredAllure) when
+    given, else to the watched test's current step when that ends, else to the test on flush().
+    Returns the Artifact, or None when the policy skips it or the capture failed.
+    """
+    if not wants(kind):
+        run_report.add(REPORT_SECTION, "total", skipped=1)
+        return None
+    start_time = time.monotonic()
+    try:
+        with tracing.span(f"screenshot {name}", tracing.SCREENSHOT):
+            encoded = driver.get_screenshot_as_base64()
+    except Exception as e:
+        LOGGER.warning(f"Could not take screenshot {name}: {e}")
+        return None
+    run_report.add(REPORT_SECTION, "total", captured=1, capture_seconds=time.monotonic() - start_time)
+
+    artifact = Artifact(name, kind, encoded)
+    writer().submit(artifact)
+    if recorder is not None:
+        recorder.attach_artifact(artifact)
+    else:
+        in_step = _watching()
+        with _LOCK:
+            (_ACTIVE["steps"][-1][2] if in_step and _ACTIVE["steps"] else _ACTIVE["pending"]).append(artifact)
+    return artifact
+
+
+def attach(artifact):
+    """Attach a written artifact to the current Allure test or step. Call on the test thread."""
+    if not artifact.wait():
+        LOGGER.warning(f"Screenshot {artifact.name} was not written: {artifact.error or 'timed out'}")
+        return False
+    allure.attach.file(artifact.path, name=artifact.name, attachment_type=artifact.attachment_type)
+    return True
+
+
+def watch(driver):
+    """
+    Make driver the session of the current test: its screenshots are attached in the steps that took
+    them, and step screenshots (policy 'always') come from it.
+    """
+    _ACTIVE["driver"] = driver
+    _ACTIVE["thread"] = threading.current_thread()
+    if _ACTIVE["listener"] is None:
+        _ACTIVE["listener"] = _StepScreenshots()
+        allure_commons.plugin_manager.register(_ACTIVE["listener"])
+
+
+def flush():
+    """Wait for the test's screenshots and attach them, each distinct frame once. Call on the test thread."""
+    with _LOCK:
+        pending, _ACTIVE["pending"] = _ACTIVE["pending"], []
+        # Steps still open here were left by an exception; their screenshots go to the test
+        for _, _, step_pending in _ACTIVE["steps"]:
+            pending.extend(step_pending)
+        _ACTIVE["steps"] = []
+    _ACTIVE["driver"] = None
+    _attach_pending(pending)
+    _ACTIVE["attached"] = set()
+
+
+def _attach_pending(pending):
+    """Attach written screenshots to the current Allure step or test, skipping frames the test already has."""
+    for artifact in pending:
+        if not artifact.wait():
+            LOGGER.warning(f"Screenshot {artifact.name} was not written: {artifact.error or 'timed out'}")
+            continue
+        if artifact.digest in _ACTIVE["attached"]:
+            LOGGER.debug(f"Screenshot {artifact.name} is identical to an earlier one of this test")
+            continue
+        _ACTIVE["attached"].add(artifact.digest)
+        allure.attach.file(artifact.path, name=artifact.name, attachment_type=artifact.attachment_type)
+
+
+def shutdown():
+    with _LOCK:
+        artifact_writer, _ACTIVE["writer"] = _ACTIVE["writer"], None
+    if artifact_writer is not None:
+        artifact_writer.close()
+
+
+@contextlib.contextmanager
+def paused():
+    """No step screenshots on this thread, e.g. while DeferredAllure replays steps of another session."""
+    previous, _THREAD.paused = _THREAD.paused, True
+    try:
+        yield
+    finally:
+        _THREAD.paused = previous
+
+
+def _watching():
+    return (_ACTIVE["driver"] is not None and not _THREAD.paused
+            and threading.current_thread() is _ACTIVE["thread"])
+
+
+def format_report(rows):
+    """Terminal summary lines: screenshots taken, time on the test thread, and storage saved."""
+    row = rows.get("total", {})
+    captured = int(row.get("captured", 0))
+    bytes_captured = row.get("bytes_captured", 0)
+    bytes_stored = row.get("bytes_stored", 0)
+    return [
+        f"policy: {POLICY}, screenshots taken: {captured}, skipped by policy: {int(row.get('skipped', 0))}",
+        f"test thread: {row.get('capture_seconds', 0.0):.1f}s capturing, "
+        f"{row.get('queue_wait', 0.0):.1f}s waiting for the queue",
+        f"writer: {int(row.get('stored', 0))} stored, {int(row.get('duplicates', 0))} duplicates, "
+        f"{bytes_captured / 1024:.0f} KiB -> {bytes_stored / 1024:.0f} KiB in {row.get('write_seconds', 0.0):.1f}s",
+    ]
+
+
+run_report.register(REPORT_SECTION, "screenshots", format_report)
@@ -0,0 +1,179 @@
+# utils/autoscale.py
+"""
+Pick the number of xdist workers from what the machine can hold, instead of a fixed count.
+
+Every worker drives a full browser, so memory runs out long before cores do. At startup one browser
+session is launched, the careers page opened and the memory of its process tree measured; that,
+plus a Python worker, is the cost of one worker. The worker count is then the smallest of:
+
+* (available memory - AUTOSCALE_RESERVE_MB) / cost of one worker,
+* the cores this process may run on,
+* AUTOSCALE_MAX_WORKERS (0 = no limit) and the number of tests left.
+
+The runners split the tests into batches of `workers * AUTOSCALE_BATCH_ROUNDS` and decide again
+before each batch: if the 1-minute load average per core went above AUTOSCALE_LOAD_LIMIT during the
+last batch they drop a worker, if swap grew by more than AUTOSCALE_SWAP_RISE_MB they halve the count,
+and otherwise they grow by at most one worker per batch. Every decision is logged with its reasons.
+"""
+import logging
+import os
+import subprocess
+import sys
+import time
+
+from decouple import config
+
+LOGGER = logging.getLogger(__name__)
+
+# -----------------------------------------------------------------------------
+# CONSTANTS
+# -----------------------------------------------------------------------------
+MEMINFO = "/proc/meminfo"
+MIB = 2 ** 20
+# Used when the probe session can't be launched
+DEFAULT_SESSION_MB = 800
+PROBE_SAMPLES = 5
+PROBE_INTERVAL = 0.5
+
+SESSION_MB = config('AUTOSCALE_SESSION_MB', default=0, cast=float)
+WORKER_MB = config('AUTOSCALE_WORKER_MB', default=150, cast=float)
+# Pages under test use more than the careers page the probe opens
+SESSION_HEADROOM = config('AUTOSCALE_HEADROOM', default=1.5, cast=float)
+RESERVE_MB = config('AUTOSCALE_RESERVE_MB', default=1024, cast=float)
+MAX_WORKERS = config('AUTOSCALE_MAX_WORKERS', default=0, cast=int)
+LOAD_LIMIT = config('AUTOSCALE_LOAD_LIMIT', default=1.0, cast=float)
+SWAP_RISE_MB = config('AUTOSCALE_SWAP_RISE_MB', default=256, cast=float)
+BATCH_ROUNDS = config('AUTOSCALE_BATCH_ROUNDS', default=2, cast=int)
+
+
+class SystemState(object):
+    """Memory, cores, load and swap of the machine at one point in time (sizes in bytes)."""
+    def __init__(self, available, cores, load, swap_used):
+        # None where /proc/meminfo doesn't exist
+        self.available = available
+        self.cores = cores
+        self.load = load
+        self.swap_used = swap_used
+
+
+class Autoscaler(object):
+    """Decides the worker count for each batch; see the module docstring."""
+    def __init__(self, session_bytes, max_workers=MAX_WORKERS):
+        self.session_bytes = session_bytes
+        self.worker_bytes = session_bytes + WORKER_MB * MIB
+        self.max_workers = max_workers
+        self.workers = None
+        self._swap_used = None
+
+    def decide(self, remaining, state=None):
+        """Worker count for the next batch of `remaining` tests; logs why."""
+        state = state or system_state()
+        limits = [(state.cores, f"{state.cores} cores")]
+        if state.available is not None:
+            by_memory = int(max(0, state.available - RESERVE_MB * MIB) // self.worker_bytes)
+            limits.append((by_memory, f"{state.available / MIB:.0f} MiB available - {RESERVE_MB:.0f} MiB reserve "
+                                      f"fits {by_memory} x {self.worker_bytes / MIB:.0f} MiB per worker"))
+        if self.max_workers:
+            limits.append((self.max_workers, f"AUTOSCALE_MAX_WORKERS={self.max_workers}"))
+        limits.append((remaining, f"{remaining} tests left"))
+        workers, reason = min(limits, key=lambda limit: limit[0])
+        reasons = [f"limited by {reason}"]
+
+        if self.workers is not None:
+            load_per_core = state.load / max(1, state.cores)
+            swap_rise = (state.swap_used - self._swap_used) / MIB
+            if swap_rise > SWAP_RISE_MB:
+                workers = min(workers, self.workers // 2)
+                reasons.append(f"swap grew {swap_rise:.0f} MiB in the last batch: halved from {self.workers}")
+            elif load_per_core > LOAD_LIMIT:
+                workers = min(workers, self.workers - 1)
+                reasons.append(f"load {state.load:.1f} on {state.cores} cores is above {LOAD_LIMIT} per core: "
+                               f"one fewer than {self.workers}")
+            elif workers > self.workers + 1:
+                workers = self.workers + 1
+                reasons.append(f"growing by one from {self.workers}")
+        if workers < 1:
+            reasons.append("at least one worker")
+            workers = 1
+
+        LOGGER.info(f"Autoscale: {workers} workers ({'; '.join(reasons)})")
+        self.workers = workers
+        self._swap_used = state.swap_used
+        return workers
+
+
+def system_state():
+    """Current SystemState of this machine."""
+    available = None
+    swap_used = 0
+    try:
+        with open(MEMINFO) as _f:
+            meminfo = {line.split(":")[0]: int(line.split()[1]) * 1024 for line in _f if line.strip()}
+        available = meminfo.get("MemAvailable")
+        swap_used = meminfo.get("SwapTotal", 0) - meminfo.get("SwapFree", 0)
+    except (OSError, IndexError, ValueError):
+        pass
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:  # not Linux
+        cores = os.cpu_count() or 1
+    try:
+        load = os.getloadavg()[0]
+    except (AttributeError, OSError):  # Windows
+        load = 0.0
+    return SystemState(available, cores, load, swap_used)
+
+
+def measure_session(browser_type):
+    """
+    Peak memory in bytes of one browser session with the careers page open, times AUTOSCALE_HEADROOM.
+    AUTOSCALE_SESSION_MB skips the measurement; DEFAULT_SESSION_MB is used when it fails.
+    """
+    if SESSION_MB:
+        LOGGER.info(f"Autoscale: browser session cost {SESSION_MB:.0f} MiB from AUTOSCALE_SESSION_MB")
+        return int(SESSION_MB * MIB)
+    # Imported here so the runners only load selenium when autoscaling
+    from utils import resource_monitor, site
+    from utils.driver_factory import create_driver
+
+    driver = None
+    try:
+        driver = create_driver(browser_type, f"autoscale_probe_{os.getpid()}")
+        driver.get(site.careers_url())
+        pid = resource_monitor.driver_pid(driver)
+        if pid is None or not resource_monitor.available():
+            raise RuntimeError("the browser's processes can't be sampled here")
+        peak = 0
+        for _ in range(PROBE_SAMPLES):
+            peak = max(peak, resource_monitor.usage([pid])[0])
+            time.sleep(PROBE_INTERVAL)
+    except Exception as e:
+        LOGGER.warning(f"Autoscale: could not measure a {browser_type} session ({e}); "
+                       f"assuming {DEFAULT_SESSION_MB} MiB")
+        return DEFAULT_SESSION_MB * MIB
+    finally:
+        if driver is not None:
+            driver.quit()
+    LOGGER.info(f"Autoscale: one {browser_type} session peaked at {peak / MIB:.0f} MiB, "
+                f"counting {peak * SESSION_HEADROOM / MIB:.0f} MiB (x{SESSION_HEADROOM})")
+    return int(peak * SESSION_HEADROOM)
+
+
+def collect_tests(pytest_args):
+    """Node IDs pytest would run with pytest_args."""
+    result = subprocess.run(
+        [sys.executable, "-m", "pytest", "--collect-only", "-q", "-p", "no:cacheprovider", *pytest_args],
+        capture_output=True, text=True
+    )
+    # Summary sections may mention node IDs too, but never at the start of a line
+    return [line for line in result.stdout.splitlines() if line.split("::")[0].endswith(".py")]
+
+
+def batches(tests, autoscaler, rounds=BATCH_ROUNDS):
+    """Yield (workers, node IDs) batches, deciding the worker count again before each one."""
+    remaining = list(tests)
+    while remaining:
+        workers = autoscaler.decide(len(remaining))
+        size = workers * max(1, rounds)
+        yield workers, remaining[:size]
+        remaining = remaining[size:]
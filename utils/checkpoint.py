@@ -0,0 +1,129 @@
+# utils/checkpoint.py
+"""
+Append-only record of finished applications, so an interrupted run can resume where it stopped.
+
+Every finished opening is appended as one JSON line to `.cache/checkpoints/<run_id>.jsonl`, keyed by
+run ID, department and opening URL. Writes take a file lock, so several pytest-xdist workers can
+share one run. When resuming, openings already recorded as applied or closed are skipped; failed
+ones are tried again.
+
+The store is configured from the pytest `--run-id` / `--resume` options (see conftest.py), or from
+the CHECKPOINT_RUN_ID / CHECKPOINT_RESUME variables that run_parametrized_tests.py sets.
+"""
+import datetime
+import glob
+import json
+import logging
+import os
+
+from decouple import config
+
+from utils import application_results
+from utils.file_lock import locked
+
+LOGGER = logging.getLogger(__name__)
+
+# -----------------------------------------------------------------------------
+# CONSTANTS
+# -----------------------------------------------------------------------------
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DIRECTORY = os.path.join(PROJECT_ROOT, ".cache", "checkpoints")
+DONE_STATUSES = (application_results.APPLIED, application_results.CLOSED)
+
+_ACTIVE = {"store": None, "configured": False}
+
+
+class CheckpointStore(object):
+    def __init__(self, run_id, resume=False, directory=None):
+        self.run_id = run_id
+        self.resume = resume
+        self.path = os.path.join(directory or checkpoint_directory(), f"{run_id}.jsonl")
+        self._done = None
+
+    def is_done(self, department, url):
+        """True when resuming and the opening was already applied to (or found closed)."""
+        if not self.resume:
+            return False
+        return (department, url) in self._completed()
+
+    def record(self, result):
+        """Append one finished OpeningResult."""
+        entry = {
+            "run_id": self.run_id,
+            "department": result.department,
+            "url": result.url,
+            "status": result.status,
+            "duration": round(result.duration, 3),
+            "worker": os.environ.get("PYTEST_XDIST_WORKER", "main"),
+            "finished_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        }
+        line = json.dumps(entry) + "\n"
+        with locked(self.path):
+            with open(self.path, "a", encoding="utf-8") as _f:
+                _f.write(line)
+        if result.status in DONE_STATUSES and self._done is not None:
+            self._done.add((result.department, result.url))
+
+    def entries(self):
+        """Every recorded line of this run, skipping a torn last line from a crash."""
+        try:
+            with open(self.path, encoding="utf-8") as _f:
+                lines = _f.readlines()
+        except OSError:
+            return []
+        entries = []
+        for line in lines:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                LOGGER.warning(f"Ignoring unreadable checkpoint line in {self.path}")
+        return entries
+
+    def _completed(self):
+        if self._done is None:
+            self._done = {
+                (entry["department"], entry["url"])
+                for entry in self.entries()
+                if entry.get("status") in DONE_STATUSES
+            }
+            LOGGER.info(f"Resuming run {self.run_id}: {len(self._done)} openings already done")
+        return self._done
+
+
+def checkpoint_directory():
+    return config('CHECKPOINT_DIR', default=DEFAULT_DIRECTORY)
+
+
+def latest_run_id(directory=None):
+    """Run ID of the most recently written checkpoint file, or None."""
+    paths = glob.glob(os.path.join(directory or checkpoint_directory(), "*.jsonl"))
+    if not paths:
+        return None
+    return os.path.splitext(os.path.basename(max(paths, key=os.path.getmtime)))[0]
+
+
+def new_run_id():
+    return datetime.datetime.now().strftime("run_%Y%m%d_%H%M%S")
+
+
+def configure(run_id=None, resume=False):
+    """
+    Set the process-wide store, falling back to CHECKPOINT_RUN_ID / CHECKPOINT_RESUME.
+    resume without a run_id picks the latest run. Returns the store, or None when disabled.
+    """
+    run_id = run_id or config('CHECKPOINT_RUN_ID', default=None)
+    resume = resume or config('CHECKPOINT_RESUME', default=False, cast=bool)
+    if resume and not run_id:
+        run_id = latest_run_id()
+        if not run_id:
+            LOGGER.warning("--resume given but no previous checkpoint was found; starting fresh")
+    _ACTIVE["store"] = CheckpointStore(run_id, resume=resume) if run_id else None
+    _ACTIVE["configured"] = True
+    return _ACTIVE["store"]
+
+
+def active():
+    """The process-wide store, configured from the environment on first use outside pytest. None when disabled."""
+    if not _ACTIVE["configured"]:
+        configure()
+    return _ACTIVE["store"]
@@ -0,0 +1,199 @@
+# utils/deadline.py
+"""
+Time budgets that nested waits, retry loops and @retry share instead of multiplying.
+
+A test (TEST_BUDGET, or @pytest.mark.budget(seconds)) or any block (`with deadline.budget(30, "...")`)
+gets a total budget. Every page-object wait (DeadlineWait in place of WebDriverWait), retry sleep and
+utils.decorators.retry attempt clamps its own timeout to what is left of the tightest active budget
+and charges the time it took to the calling method.
+When a budget runs out, DeadlineExceeded is raised once, with a breakdown of where the time went.
+
+DeadlineExceeded is deliberately not a WebDriverException, so the retry and fallback handlers that
+catch Selenium errors let it through instead of retrying on an empty budget.
+"""
+import contextlib
+import sys
+import threading
+import time
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.wait import POLL_FREQUENCY, WebDriverWait
+
+from utils import tracing
+
+# -----------------------------------------------------------------------------
+# CONSTANTS
+# -----------------------------------------------------------------------------
+# Smallest timeout handed to a wait, so a nearly spent budget still gets one real poll
+MIN_WAIT = 0.05
+BREAKDOWN_ROWS = 8
+
+
+class DeadlineExceeded(Exception):
+    """A test or step used up its time budget."""
+    def __init__(self, deadline, where):
+        self.deadline = deadline
+        self.where = where
+        super().__init__(deadline.report(where))
+
+
+class Deadline(object):
+    def __init__(self, seconds, name):
+        self.seconds = seconds
+        self.name = name
+        self.started = time.monotonic()
+        self.expires = self.started + seconds
+        # label -> [calls, seconds]
+        self.spent = {}
+        self._lock = threading.Lock()
+
+    def remaining(self):
+        return self.expires - time.monotonic()
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def charge(self, label, seconds):
+        with self._lock:
+            row = self.spent.setdefault(label, [0, 0.0])
+            row[0] += 1
+            row[1] += seconds
+
+    def report(self, where):
+        """One message: which budget ran out, where, and the labels that used most of it."""
+        elapsed = time.monotonic() - self.started
+        with self._lock:
+            rows = sorted(self.spent.items(), key=lambda item: -item[1][1])
+        accounted = sum(seconds for _, (_, seconds) in rows)
+        breakdown = ", ".join(
+            f"{label} {seconds:.1f}s ({calls}x)" for label, (calls, seconds) in rows[:BREAKDOWN_ROWS]
+        )
+        return (
+            f"Time budget of {self.seconds:g}s for {self.name} exhausted after {elapsed:.1f}s in {where}. "
+            f"Time went to: {breakdown or 'nothing tracked'}; untracked {max(elapsed - accounted, 0):.1f}s"
+        )
+
+
+class _Stack(threading.local):
+    def __init__(self):
+        self.deadlines = []
+
+
+_THREAD = _Stack()
+# The test budget is process-wide so worker threads applying to openings share it
+_TEST = {"deadline": None}
+
+
+def active():
+    """Every budget in force on this thread, the test budget first."""
+    deadlines = list(_THREAD.deadlines)
+    if _TEST["deadline"] is not None:
+        deadlines.insert(0, _TEST["deadline"])
+    return deadlines
+
+
+def tightest():
+    """The active budget that runs out first, or None."""
+    deadlines = active()
+    return min(deadlines, key=lambda deadline: deadline.expires) if deadlines else None
+
+
+def start_test(seconds, name):
+    """Give the current test a total budget (None or 0 disables it)."""
+    _TEST["deadline"] = Deadline(seconds, name) if seconds else None
+    return _TEST["deadline"]
+
+
+def finish_test():
+    deadline, _TEST["deadline"] = _TEST["deadline"], None
+    return deadline
+
+
+@contextlib.contextmanager
+def budget(seconds, name):
+    """`with budget(30, "select department"):` caps everything inside, on top of any outer budget."""
+    deadline = Deadline(seconds, name)
+    _THREAD.deadlines.append(deadline)
+    try:
+        yield deadline
+    finally:
+        _THREAD.deadlines.remove(deadline)
+
+
+def clamp(timeout, where):
+    """timeout cut down to what is left of the tightest budget; raises DeadlineExceeded when nothing is."""
+    deadline = tightest()
+    if deadline is None:
+        return timeout
+    remaining = deadline.remaining()
+    if remaining <= 0:
+        raise DeadlineExceeded(deadline, where)
+    if timeout is None:
+        return max(remaining, MIN_WAIT)
+    return max(min(timeout, remaining), MIN_WAIT)
+
+
+def charge(label, seconds):
+    for deadline in active():
+        deadline.charge(label, seconds)
+
+
+@contextlib.contextmanager
+def waiting(label, timeout):
+    """
+    `with waiting("BasePage.wait_element", timeout) as timeout:` clamps the wait and charges its
+    duration. A TimeoutException caused by an expired budget is turned into DeadlineExceeded.
+    """
+    clamped = clamp(timeout, label)
+    start_time = time.monotonic()
+    try:
+        yield clamped
+    except TimeoutException:
+        # Charged before raising so the breakdown includes this wait
+        charge(label, time.monotonic() - start_time)
+        deadline = tightest()
+        if deadline is not None and deadline.expired():
+            raise DeadlineExceeded(deadline, label)
+        raise
+    except BaseException:
+        charge(label, time.monotonic() - start_time)
+        raise
+    else:
+        charge(label, time.monotonic() - start_time)
+
+
+def sleep(seconds, label="sleep"):
+    """time.sleep that never outlasts the budget; raises DeadlineExceeded when it is spent."""
+    if not seconds:
+        return
+    seconds = clamp(seconds, label)
+    start_time = time.monotonic()
+    tracing.sleep(seconds)
+    charge(label, time.monotonic() - start_time)
+
+
+class DeadlineWait(WebDriverWait):
+    """
+    WebDriverWait whose timeout is clamped to the active budgets when until() runs, and whose time
+    is charged to the calling method (or `label`). Without a budget it behaves like WebDriverWait.
+    """
+    def __init__(self, driver, timeout, poll_frequency=POLL_FREQUENCY, ignored_exceptions=None, label=None):
+        super().__init__(driver, timeout, poll_frequency=poll_frequency, ignored_exceptions=ignored_exceptions)
+        self._requested_timeout = timeout
+        self._label = label or _caller(sys._getframe(1))
+
+    def until(self, method, message=""):
+        with waiting(self._label, self._requested_timeout) as timeout:
+            self._timeout = timeout
+            return super().until(method, message)
+
+    def until_not(self, method, message=""):
+        with waiting(self._label, self._requested_timeout) as timeout:
+            self._timeout = timeout
+            return super().until_not(method, message)
+
+
+def _caller(frame):
+    # Lambdas and comprehensions are named after the method they are written in
+    code = frame.f_code
+    return getattr(code, "co_qualname", code.co_name).split(".<")[0]
@@ -1,15 +1,49 @@
 # utils/decorators.py
+import functools
 import time
 import logging
 
+from utils import deadline, duration_history, tracing
+
 LOGGER = logging.getLogger(__name__)
 
 def time_func(func):
+    @functools.wraps(func)
     def wrapper(*args, **kwargs):
         start_time = time.time()
-        result = func(*args, **kwargs)
+        with tracing.span(func.__qualname__, tracing.PAGE):
+            result = func(*args, **kwargs)
         end_time = time.time()
         duration = end_time - start_time
         LOGGER.info(f"Function {func.__name__} took {duration:.4f} seconds")
+        # Feeds the duration history that the longest-first scheduler reports on
+        duration_history.record_function(func.__qualname__, duration)
         return result
-    return wrapper
\ No newline at end of file
+    return wrapper
+
+def retry(exceptions=Exception, tries=-1, delay=0, backoff=1):
+    """
+    Retry the decorated function on `exceptions`, like retry.retry, but within the active
+    utils.deadline budgets: sleeps between attempts are clamped to what is left, and an
+    exhausted budget raises DeadlineExceeded instead of starting another attempt.
+    """
+    def decorator(func):
+        label = f"retry {func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            remaining_tries, current_delay = tries, delay
+            while True:
+                try:
+                    return func(*args, **kwargs)
+                except deadline.DeadlineExceeded:
+                    raise
+                except exceptions as e:
+                    remaining_tries -= 1
+                    if not remaining_tries:
+                        raise
+                    LOGGER.warning(f"{func.__qualname__}: {e}, retrying in {current_delay} seconds...")
+                    deadline.sleep(current_delay, label)
+                    current_delay *= backoff
+        return wrapper
+    return decorator
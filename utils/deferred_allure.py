@@ -0,0 +1,76 @@
+# utils/deferred_allure.py
+"""
+Record Allure steps and attachments made off the test thread, and replay them later on it.
+
+Allure ties steps and attachments to the thread running the test, so page objects driven from
+a worker thread record into a DeferredAllure instead. The test thread then calls replay() to
+recreate the same step tree, attachments and failures in the report.
+"""
+import contextlib
+import threading
+
+import allure
+
+from utils import artifacts, tracing
+
+
+class _ReplayedFailure(Exception):
+    """Raised inside a replayed step so Allure marks it failed the way the original step was."""
+
+
+class DeferredAllure(object):
+    def __init__(self):
+        self._root = []
+        self._stack = [self._root]
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def step(self, title):
+        """Drop-in replacement for `with allure.step(title):`."""
+        node = {"kind": "step", "title": title, "children": [], "error": None}
+        with self._lock:
+            self._stack[-1].append(node)
+            self._stack.append(node["children"])
+        try:
+            with tracing.span(title, tracing.STEP):
+                yield
+        except Exception as e:
+            node["error"] = f"{e.__class__.__name__}: {e}"
+            raise
+        finally:
+            with self._lock:
+                self._stack.pop()
+
+    def attach(self, body, name, attachment_type):
+        """Drop-in replacement for allure.attach()."""
+        with self._lock:
+            self._stack[-1].append(
+                {"kind": "attachment", "body": body, "name": name, "attachment_type": attachment_type}
+            )
+
+    def attach_artifact(self, artifact):
+        """Attach a screenshot from utils.artifacts once its writer is done with it."""
+        with self._lock:
+            self._stack[-1].append({"kind": "artifact", "artifact": artifact})
+
+    def replay(self):
+        """Re-emit everything recorded, in order, into the current Allure test. Call on the test thread."""
+        # The steps were already traced when they ran; don't trace their replay or screenshot it
+        with tracing.paused(), artifacts.paused():
+            self._replay(self._root)
+
+    def _replay(self, nodes):
+        for node in nodes:
+            if node["kind"] == "attachment":
+                allure.attach(node["body"], name=node["name"], attachment_type=node["attachment_type"])
+                continue
+            if node["kind"] == "artifact":
+                artifacts.attach(node["artifact"])
+                continue
+            try:
+                with allure.step(node["title"]):
+                    self._replay(node["children"])
+                    if node["error"]:
+                        raise _ReplayedFailure(node["error"])
+            except _ReplayedFailure:
+                pass
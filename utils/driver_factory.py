@@ -0,0 +1,139 @@
+# utils/driver_factory.py
+import logging
+import time
+
+from selenium import webdriver
+from selenium.common.exceptions import SessionNotCreatedException
+from selenium.webdriver.chrome.options import Options as ChromeOptions
+from selenium.webdriver.chrome.service import Service as ChromeService
+from selenium.webdriver.edge.options import Options as EdgeOptions
+from selenium.webdriver.edge.service import Service as EdgeService
+from selenium.webdriver.firefox.options import Options as FirefoxOptions
+from selenium.webdriver.firefox.service import Service as FirefoxService
+
+from utils import (
+    navigation, profile_manager, replay_proxy, resource_monitor, resource_policy, site, wait_engine, wire_stats
+)
+from utils import driver_resolver
+from utils.driver_resolver import resolve_driver_path
+
+LOGGER = logging.getLogger(__name__)
+
+# -----------------------------------------------------------------------------
+# CONSTANTS
+# -----------------------------------------------------------------------------
+PAGE_LOAD_TIMEOUT = 60
+
+
+def create_driver(browser_type, session_id):
+    """
+    Launch a new browser session configured for the test suite.
+    session_id keeps the browser profile directory unique so parallel runs don't collide;
+    the directory is removed again when the session quits.
+    """
+    LOGGER.info(f"Launching {browser_type} browser for session {session_id}")
+    profile = profile_manager.acquire(browser_type, session_id, warm=lambda directory: _warm(browser_type, directory))
+    start_time = time.monotonic()
+    try:
+        driver = _launch(browser_type, profile)
+    except SessionNotCreatedException:
+        profile_manager.remove(profile)
+        # Most likely a driver that no longer matches the browser; resolve it again next time
+        driver_resolver.forget(browser_type)
+        raise
+    except Exception:
+        profile_manager.remove(profile)
+        raise
+    profile_manager.record_launch(time.monotonic() - start_time, profile_manager.USE_TEMPLATE)
+    profile_manager.attach(driver, profile)
+
+    if wire_stats.enabled():
+        wire_stats.instrument(driver)
+    # Lets page objects skip waiting for a page that hasn't changed since it loaded
+    navigation.instrument(driver)
+    resource_policy.apply_session(driver)
+    # Sessions launched while a test runs count towards its memory samples
+    resource_monitor.track(driver)
+
+    # Configure WebDriver with longer timeouts for better stability
+    driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+    # 0 with WAIT_MODE=explicit, see utils/wait_engine.py
+    driver.implicitly_wait(wait_engine.implicit_wait())
+    if not resource_policy.HEADLESS:
+        # Headless sessions get their window size at launch
+        driver.maximize_window()
+    return driver
+
+
+def _warm(browser_type, directory):
+    """Start the browser once on an empty profile directory and open the site, to fill it as a template."""
+    start_time = time.monotonic()
+    driver = _launch(browser_type, directory)
+    profile_manager.record_launch(time.monotonic() - start_time, from_template=False)
+    try:
+        driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+        driver.get(site.base_url())
+    finally:
+        driver.quit()
+
+
+def _launch(browser_type, profile):
+    """Start the browser with the suite's options on the given profile directory."""
+    if browser_type == "edge":
+        # Edge configuration
+        options = EdgeOptions()
+        options.add_argument("--ignore-certificate-errors")
+        options.add_argument("--ignore-ssl-errors")
+        options.add_argument("--ignore-certificate-errors-spki-list")
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-infobars")
+        options.add_argument("--disable-extensions")
+        options.add_argument("--disable-gpu")
+        # Add unique user data dir to prevent conflicts in parallel runs
+        options.add_argument(f"--user-data-dir={profile}")
+        resource_policy.apply_options(browser_type, options)
+        replay_proxy.apply_options(browser_type, options)
+
+        driver = webdriver.Edge(
+            service=EdgeService(resolve_driver_path("edge")),
+            options=options
+        )
+    elif browser_type == "firefox":
+        # Firefox configuration
+        options = FirefoxOptions()
+        options.add_argument("--disable-extensions")
+        options.add_argument("--ignore-certificate-errors")
+        options.add_argument("--ignore-ssl-errors")
+        options.add_argument("--ignore-certificate-errors-spki-list")
+        options.add_argument("--foreground")
+        # Add unique profile path for Firefox
+        options.add_argument(f"-profile")
+        options.add_argument(profile)
+        resource_policy.apply_options(browser_type, options)
+        replay_proxy.apply_options(browser_type, options)
+
+        driver = webdriver.Firefox(
+            service=FirefoxService(resolve_driver_path("firefox")),
+            options=options
+        )
+    else:
+        # Chrome configuration (default)
+        options = ChromeOptions()
+        options.add_argument("--ignore-certificate-errors")
+        options.add_argument("--ignore-ssl-errors")
+        options.add_argument("--ignore-certificate-errors-spki-list")
+        options.add_argument('--no-sandbox')
+        options.add_argument('--disable-infobars')
+        options.add_argument("--disable-extensions")
+        options.add_argument('--disable-gpu')
+        # Add unique user data dir to prevent conflicts in parallel runs
+        options.add_argument(f"--user-data-dir={profile}")
+        resource_policy.apply_options(browser_type, options)
+        replay_proxy.apply_options(browser_type, options)
+
+        driver = webdriver.Chrome(
+            service=ChromeService(resolve_driver_path("chrome")),
+            options=options
+        )
+
+    return driver
@@ -0,0 +1,168 @@
+# utils/driver_pool.py
+"""
+Worker-scoped pool of live WebDriver sessions.
+
+Instead of a cold browser start per test, a session is handed out, reset to a blank state
+when the test is done and handed to the next test. Sessions are recycled (quit and
+relaunched on next demand) after `max_uses` tests, after a failed test, or when the browser
+ends a test using more than `max_rss` bytes of memory.
+"""
+import datetime
+import logging
+import os
+import threading
+import time
+
+from selenium.common.exceptions import WebDriverException
+
+from utils import run_report
+
+LOGGER = logging.getLogger(__name__)
+
+# -----------------------------------------------------------------------------
+# CONSTANTS
+# -----------------------------------------------------------------------------
+DEFAULT_POOL_SIZE = 1
+DEFAULT_MAX_USES = 20
+REPORT_SECTION = "driver_pool"
+
+CLEAR_STORAGE_SCRIPT = """
+try { window.localStorage && window.localStorage.clear(); } catch (e) {}
+try { window.sessionStorage && window.sessionStorage.clear(); } catch (e) {}
+"""
+
+
+class PooledSession(object):
+    """A live browser session owned by the pool."""
+    def __init__(self, driver, launch_seconds):
+        self.driver = driver
+        self.launch_seconds = launch_seconds
+        self.uses = 0
+
+
+class DriverPool(object):
+    """
+    Keep up to `size` idle browser sessions alive for reuse within one process
+    (one pytest-xdist worker).
+    """
+    def __init__(self, factory, size=DEFAULT_POOL_SIZE, max_uses=DEFAULT_MAX_USES, max_rss=0):
+        self.factory = factory
+        self.size = max(1, size)
+        self.max_uses = max(1, max_uses)
+        # 0 = no memory limit
+        self.max_rss = max_rss
+        self._idle = []
+        self._lock = threading.Lock()
+        self.launches = 0
+        self.reuses = 0
+        self.recycles = 0
+        self.launch_seconds = 0.0
+
+    def acquire(self):
+        """Return an idle session, launching a new browser only if none is available."""
+        with self._lock:
+            session = self._idle.pop() if self._idle else None
+            if session is not None:
+                self.reuses += 1
+        if session is not None:
+            run_report.add(REPORT_SECTION, "total", reuses=1)
+        else:
+            session = self._launch()
+        session.uses += 1
+        return session
+
+    def release(self, session, failed=False, rss=None):
+        """
+        Reset the session for the next test, or quit it when it is due for recycling.
+        rss is the browser's memory at the end of the test, in bytes, when it was measured.
+        """
+        if self.max_rss and rss is not None and rss > self.max_rss:
+            run_report.add(REPORT_SECTION, "total", memory_recycles=1)
+            self._recycle(session, f"{rss / 2 ** 20:.0f} MiB RSS (limit {self.max_rss / 2 ** 20:.0f} MiB)")
+            return
+        if failed or session.uses >= self.max_uses:
+            reason = "test failure" if failed else f"{session.uses} uses"
+            self._recycle(session, reason)
+            return
+        try:
+            self.reset(session.driver)
+        except WebDriverException as e:
+            self._recycle(session, f"reset failed: {e}")
+            return
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append(session)
+                return
+        self._quit(session)
+
+    def reset(self, driver):
+        """Bring a used session back to a blank state: one window, no cookies or storage."""
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        driver.switch_to.default_content()
+        # Storage is per origin, so it has to be cleared before leaving the page under test
+        driver.execute_script(CLEAR_STORAGE_SCRIPT)
+        if hasattr(driver, "execute_cdp_cmd"):
+            # Chromium clears cookies of every domain, not just the current one
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        else:
+            driver.delete_all_cookies()
+        driver.get("about:blank")
+
+    def shutdown(self):
+        """Quit every idle session and log what pooling saved."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for session in idle:
+            self._quit(session)
+        LOGGER.info(
+            f"Driver pool: {self.launches} launches ({self.launch_seconds:.1f}s), "
+            f"{self.reuses} reuses, {self.recycles} recycles"
+        )
+
+    def _launch(self):
+        worker = os.environ.get("PYTEST_XDIST_WORKER", "main")
+        session_id = f"pool_{worker}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+        start_time = time.monotonic()
+        driver = self.factory(session_id)
+        duration = time.monotonic() - start_time
+        with self._lock:
+            self.launches += 1
+            self.launch_seconds += duration
+        run_report.add(REPORT_SECTION, "total", launches=1, launch_seconds=duration)
+        LOGGER.info(f"Launched pooled browser session {session_id} in {duration:.2f}s")
+        return PooledSession(driver, duration)
+
+    def _recycle(self, session, reason):
+        LOGGER.info(f"Recycling pooled browser session after {reason}")
+        with self._lock:
+            self.recycles += 1
+        run_report.add(REPORT_SECTION, "total", recycles=1)
+        self._quit(session)
+
+    @staticmethod
+    def _quit(session):
+        try:
+            session.driver.quit()
+        except Exception as e:
+            LOGGER.warning(f"Error during pooled driver cleanup: {e}")
+
+
+def format_report(rows):
+    """Terminal summary lines for the driver pool section."""
+    row = rows.get("total", {})
+    launches = int(row.get("launches", 0))
+    reuses = int(row.get("reuses", 0))
+    launch_seconds = row.get("launch_seconds", 0.0)
+    mean_launch = launch_seconds / launches if launches else 0.0
+    return [
+        f"browser launches: {launches} ({launch_seconds:.1f}s, {mean_launch:.2f}s each)",
+        f"sessions reused: {reuses} -> launches saved: {reuses}, ~{reuses * mean_launch:.1f}s saved",
+        f"sessions recycled: {int(row.get('recycles', 0))} ({int(row.get('memory_recycles', 0))} over the memory limit)",
+    ]
+
+
+run_report.register(REPORT_SECTION, "driver pool", format_report)
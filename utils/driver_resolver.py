@@ -0,0 +1,231 @@
+# utils/driver_resolver.py
+"""
+Resolve the WebDriver binary once per browser version instead of once per session.
+
+Resolved paths are stored in a lockfile keyed by browser and browser version, shared by all
+pytest-xdist workers through an OS file lock. Once the lockfile holds an entry for the installed
+browser no network access is needed. When webdriver_manager can't resolve a driver (offline,
+rate limited) the driver on PATH is used, and failing that Selenium Manager is left to find one;
+that outcome is kept in the lockfile too, for DRIVER_NEGATIVE_TTL hours, so other workers don't
+try the network again.
+
+The browser version is read from the browser on PATH, at its standard install location (macOS) or
+from the registry (Windows). When it can't be read, nothing is stored or served from the lockfile:
+an entry for an unknown version would outlive the next browser upgrade. An entry whose driver then
+fails to start a session is dropped with forget().
+"""
+import datetime
+import json
+import logging
+import os
+import re
+import shutil
+import subprocess
+import time
+
+from decouple import config
+
+from utils import run_report
+from utils.file_lock import locked
+
+LOGGER = logging.getLogger(__name__)
+
+# -----------------------------------------------------------------------------
+# CONSTANTS
+# -----------------------------------------------------------------------------
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_LOCKFILE = os.path.join(PROJECT_ROOT, ".driver_cache", "drivers.lock.json")
+REPORT_SECTION = "driver_resolution"
+
+BROWSER_BINARIES = {
+    "chrome": ["google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome"],
+    "firefox": ["firefox"],
+    "edge": ["microsoft-edge", "microsoft-edge-stable", "msedge"],
+}
+DRIVER_BINARIES = {
+    "chrome": "chromedriver",
+    "firefox": "geckodriver",
+    "edge": "msedgedriver",
+}
+# Where browsers live when they are not on PATH
+INSTALL_PATHS = {
+    "chrome": ["/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+               "/Applications/Chromium.app/Contents/MacOS/Chromium"],
+    "firefox": ["/Applications/Firefox.app/Contents/MacOS/firefox"],
+    "edge": ["/Applications/Microsoft Edge.app/Contents/MacOS/Microsoft Edge"],
+}
+# Windows: (root key, key, value) where each browser's installer or updater records its version
+REGISTRY_VERSIONS = {
+    "chrome": [("HKEY_CURRENT_USER", r"Software\Google\Chrome\BLBeacon", "version"),
+               ("HKEY_LOCAL_MACHINE", r"SOFTWARE\Google\Chrome\BLBeacon", "version")],
+    "firefox": [("HKEY_LOCAL_MACHINE", r"SOFTWARE\Mozilla\Mozilla Firefox", "CurrentVersion"),
+                ("HKEY_CURRENT_USER", r"SOFTWARE\Mozilla\Mozilla Firefox", "CurrentVersion")],
+    "edge": [("HKEY_CURRENT_USER", r"Software\Microsoft\Edge\BLBeacon", "version")],
+}
+VERSION_PATTERN = re.compile(r"(\d+(?:\.\d+)+)")
+UNKNOWN_VERSION = "unknown"
+NEGATIVE_TTL_HOURS = config('DRIVER_NEGATIVE_TTL', default=1, cast=float)
+
+# Resolved paths for this process, so the lockfile is read at most once per browser
+_RESOLVED = {}
+
+
+def resolve_driver_path(browser_type):
+    """
+    Return the driver executable path for browser_type, or None to let Selenium Manager decide.
+    The first call per process does the work; later calls are served from memory.
+    """
+    if browser_type in _RESOLVED:
+        run_report.add(REPORT_SECTION, browser_type, calls=1, memory_hits=1)
+        return _RESOLVED[browser_type]
+
+    start_time = time.monotonic()
+    version = browser_version(browser_type)
+    key = f"{browser_type}:{version}"
+    lockfile = config('DRIVER_LOCKFILE', default=DEFAULT_LOCKFILE)
+
+    if version == UNKNOWN_VERSION:
+        path, source = _install(browser_type)
+    else:
+        with locked(lockfile):
+            entries = _read_lockfile(lockfile)
+            path, source = _cached(entries.get(key))
+            if source is None:
+                path, source = _install(browser_type)
+                entries[key] = {
+                    "path": path,
+                    "source": source,
+                    "resolved_at": datetime.datetime.now().isoformat(timespec="seconds"),
+                }
+                _write_lockfile(lockfile, entries)
+
+    duration = time.monotonic() - start_time
+    _RESOLVED[browser_type] = path
+    run_report.add(REPORT_SECTION, browser_type, calls=1, seconds=duration, **{f"from_{source}": 1})
+    LOGGER.info(f"Resolved {key} driver from {source} in {duration:.2f}s: {path or 'Selenium Manager'}")
+    return path
+
+
+def forget(browser_type):
+    """Drop the resolved driver of browser_type, here and in the lockfile, e.g. after it failed to start a session."""
+    path = _RESOLVED.pop(browser_type, None)
+    version = browser_version(browser_type)
+    if version == UNKNOWN_VERSION:
+        return
+    lockfile = config('DRIVER_LOCKFILE', default=DEFAULT_LOCKFILE)
+    with locked(lockfile):
+        entries = _read_lockfile(lockfile)
+        if entries.pop(f"{browser_type}:{version}", None) is not None:
+            _write_lockfile(lockfile, entries)
+            LOGGER.warning(f"Dropped the {browser_type}:{version} driver ({path}) from {lockfile}")
+
+
+def browser_version(browser_type):
+    """Return the installed browser's version (e.g. '124.0.6367.91'), or 'unknown'."""
+    executables = [shutil.which(binary) for binary in BROWSER_BINARIES.get(browser_type, [])]
+    executables += [path for path in INSTALL_PATHS.get(browser_type, []) if os.path.exists(path)]
+    for executable in executables:
+        if not executable:
+            continue
+        try:
+            output = subprocess.run(
+                [executable, "--version"], capture_output=True, text=True, timeout=10
+            ).stdout
+        except (OSError, subprocess.SubprocessError) as e:
+            LOGGER.debug(f"Could not read version of {executable}: {e}")
+            continue
+        match = VERSION_PATTERN.search(output)
+        if match:
+            return match.group(1)
+    return _registry_version(browser_type) or UNKNOWN_VERSION
+
+
+def _registry_version(browser_type):
+    try:
+        import winreg
+    except ImportError:  # not Windows
+        return None
+    for root_key, key, value in REGISTRY_VERSIONS.get(browser_type, []):
+        try:
+            with winreg.OpenKey(getattr(winreg, root_key), key) as handle:
+                match = VERSION_PATTERN.search(str(winreg.QueryValueEx(handle, value)[0]))
+        except OSError:
+            continue
+        if match:
+            return match.group(1)
+    return None
+
+
+def _cached(entry):
+    """(path, 'lockfile') for a usable lockfile entry, else (None, None)."""
+    if not entry:
+        return None, None
+    if entry.get("path"):
+        return (entry["path"], "lockfile") if os.path.exists(entry["path"]) else (None, None)
+    # Nothing could be resolved last time; don't ask the network again for a while
+    try:
+        age = datetime.datetime.now() - datetime.datetime.fromisoformat(entry.get("resolved_at", ""))
+    except ValueError:
+        return None, None
+    return (None, "lockfile") if age.total_seconds() < NEGATIVE_TTL_HOURS * 3600 else (None, None)
+
+
+def _install(browser_type):
+    """Resolve a driver the slow way. Returns (path, source); path is None for Selenium Manager."""
+    if not config('DRIVER_OFFLINE', default=False, cast=bool):
+        try:
+            return _manager(browser_type).install(), "webdriver_manager"
+        except Exception as e:
+            LOGGER.warning(f"webdriver_manager could not resolve a {browser_type} driver: {e}")
+
+    path = shutil.which(DRIVER_BINARIES.get(browser_type, ""))
+    if path:
+        return path, "path"
+    return None, "selenium_manager"
+
+
+def _manager(browser_type):
+    # Imported lazily so an offline run with a warm lockfile never touches webdriver_manager
+    if browser_type == "edge":
+        from webdriver_manager.microsoft import EdgeChromiumDriverManager
+        return EdgeChromiumDriverManager()
+    if browser_type == "firefox":
+        from webdriver_manager.firefox import GeckoDriverManager
+        return GeckoDriverManager()
+    from webdriver_manager.chrome import ChromeDriverManager
+    return ChromeDriverManager()
+
+
+def _read_lockfile(lockfile):
+    try:
+        with open(lockfile) as _f:
+            return json.load(_f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_lockfile(lockfile, entries):
+    # Write-then-rename so a reader never sees a half-written file
+    tmp_path = f"{lockfile}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as _f:
+        json.dump(entries, _f, indent=2, sort_keys=True)
+    os.replace(tmp_path, lockfile)
+
+
+def format_report(rows):
+    """Terminal summary lines for the driver resolution section."""
+    lines = []
+    for browser_type, row in sorted(rows.items()):
+        sources = ", ".join(
+            f"{metric[len('from_'):]}={int(value)}"
+            for metric, value in sorted(row.items()) if metric.startswith("from_")
+        )
+        lines.append(
+            f"{browser_type}: {int(row.get('calls', 0))} lookups, "
+            f"{int(row.get('memory_hits', 0))} served from memory, "
+            f"{row.get('seconds', 0.0):.2f}s resolving ({sources})"
+        )
+    return lines
+
+
+run_report.register(REPORT_SECTION, "driver resolution", format_report)
@@ -0,0 +1,144 @@
+# utils/duration_history.py
+"""
+Per-test and per-function duration history, used to schedule the longest tests first.
+
+Test durations (setup + call + teardown) are collected from pytest's report hooks on the xdist
+controller; function durations come from utils.decorators.time_func in every process. Both are
+merged into `.cache/durations.json` at the end of the session, keeping the last HISTORY_LENGTH
+recordings per key (a test's total, or a function's mean call duration per process). Test keys are
+node IDs.
+"""
+import contextlib
+import heapq
+import json
+import logging
+import os
+import statistics
+import threading
+
+from decouple import config
+
+from utils import run_report
+from utils.file_lock import locked
+
+LOGGER = logging.getLogger(__name__)
+
+# -----------------------------------------------------------------------------
+# CONSTANTS
+# -----------------------------------------------------------------------------
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_HISTORY_FILE = os.path.join(PROJECT_ROOT, ".cache", "durations.json")
+HISTORY_LENGTH = 5
+REPORT_SECTION = "schedule"
+
+_LOCK = threading.Lock()
+_TESTS = {}
+_FUNCTIONS = {}
+
+
+def record_test(nodeid, seconds):
+    """Add one phase (setup/call/teardown) of a test to this run's durations."""
+    with _LOCK:
+        _TESTS[nodeid] = _TESTS.get(nodeid, 0.0) + seconds
+
+
+def record_function(name, seconds):
+    """Add one call of a timed function to this run's durations."""
+    with _LOCK:
+        _FUNCTIONS.setdefault(name, []).append(seconds)
+
+
+@contextlib.contextmanager
+def isolated():
+    """Record into scratch durations that are dropped on exit, e.g. while a unit test drives fakes."""
+    global _TESTS, _FUNCTIONS
+    with _LOCK:
+        saved, (_TESTS, _FUNCTIONS) = (_TESTS, _FUNCTIONS), ({}, {})
+    try:
+        yield
+    finally:
+        with _LOCK:
+            _TESTS, _FUNCTIONS = saved
+
+
+def history_file():
+    return config('DURATION_HISTORY_FILE', default=DEFAULT_HISTORY_FILE)
+
+
+def load(path=None):
+    """Return {"tests": {key: [seconds...]}, "functions": {name: [seconds...]}}."""
+    try:
+        with open(path or history_file()) as _f:
+            data = json.load(_f)
+    except (OSError, ValueError):
+        data = {}
+    data.setdefault("tests", {})
+    data.setdefault("functions", {})
+    return data
+
+
+def save(path=None):
+    """Merge this process's durations into the history file."""
+    path = path or history_file()
+    with _LOCK:
+        tests, functions = dict(_TESTS), {name: statistics.mean(calls) for name, calls in _FUNCTIONS.items()}
+    if not tests and not functions:
+        return
+    with locked(path):
+        data = load(path)
+        for section, durations in (("tests", tests), ("functions", functions)):
+            for key, seconds in durations.items():
+                runs = data[section].setdefault(key, [])
+                runs.append(round(seconds, 3))
+                del runs[:-HISTORY_LENGTH]
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as _f:
+            json.dump(data, _f, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+
+
+def expected_durations(nodeids, data=None):
+    """
+    Expected seconds per node ID: the median of its recorded runs. Tests without history get
+    the mean of the known ones, so new tests are neither starved nor assumed to be instant.
+    """
+    tests = (data or load())["tests"]
+    known = {nodeid: statistics.median(tests[nodeid]) for nodeid in nodeids if tests.get(nodeid)}
+    fallback = statistics.mean(known.values()) if known else 0.0
+    return {nodeid: known.get(nodeid, fallback) for nodeid in nodeids}
+
+
+def has_history(nodeids, data=None):
+    """True when at least one of the node IDs has recorded runs."""
+    tests = (data or load())["tests"]
+    return any(tests.get(nodeid) for nodeid in nodeids)
+
+
+def plan_makespan(durations, workers):
+    """Makespan of dispatching durations longest-first to the least busy of `workers` workers."""
+    loads = [0.0] * max(1, workers)
+    for seconds in sorted(durations, reverse=True):
+        heapq.heapreplace(loads, loads[0] + seconds)
+    return max(loads)
+
+
+def report_makespan(expected, actual, workers):
+    """Record the planned vs actual makespan for the terminal summary."""
+    run_report.add(REPORT_SECTION, "makespan", expected=expected, actual=actual, workers=workers)
+
+
+def format_report(rows):
+    """Terminal summary lines for the schedule section."""
+    row = rows.get("makespan", {})
+    lines = [
+        f"workers: {int(row.get('workers', 1))}, expected makespan {row.get('expected', 0.0):.1f}s "
+        f"(from duration history), actual {row.get('actual', 0.0):.1f}s"
+    ]
+    functions = load()["functions"]
+    slowest = sorted(functions.items(), key=lambda item: -statistics.median(item[1]))[:5]
+    for name, runs in slowest:
+        lines.append(f"  {name}: median call {statistics.median(runs):.1f}s over the last {len(runs)} recordings")
+    return lines
+
+
+run_report.register(REPORT_SECTION, "schedule", format_report)
@@ -0,0 +1,42 @@
+# utils/file_lock.py
+"""Exclusive cross-process file lock shared by pytest-xdist workers."""
+import contextlib
+import os
+
+
+@contextlib.contextmanager
+def locked(path):
+    """Hold an exclusive lock on `<path>.lock` for the duration of the block."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(f"{path}.lock", "a+") as handle:
+        _lock_handle(handle)
+        try:
+            yield
+        finally:
+            _unlock_handle(handle)
+
+
+try:
+    import fcntl
+
+    def _lock_handle(handle):
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+
+    def _unlock_handle(handle):
+        fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+except ImportError:  # Windows
+    import msvcrt
+
+    def _lock_handle(handle):
+        handle.seek(0)
+        while True:
+            try:
+                msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                # LK_LOCK gives up after ~10 seconds; keep waiting for the other worker
+                continue
+
+    def _unlock_handle(handle):
+        handle.seek(0)
+        msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
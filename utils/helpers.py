@@ -2,11 +2,11 @@ import os
 import logging
 from selenium.common import TimeoutException
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
+from utils.deadline import DeadlineWait
 from selenium.webdriver.support import expected_conditions as EC
 
 def click_css_when_visible(driver, wait_time, css_selector):
-    element = WebDriverWait(driver, wait_time).until(
+    element = DeadlineWait(driver, wait_time).until(
         EC.visibility_of_element_located((By.CSS_SELECTOR, css_selector))
     )
     element.click()
@@ -14,7 +14,7 @@ def click_css_when_visible(driver, wait_time, css_selector):
 def wait_until_css_visible(driver, wait_time, element_tuple):
     """Wait until the element specified by the CSS selector is visible."""
     try:
-        element = WebDriverWait(driver, wait_time).until(
+        element = DeadlineWait(driver, wait_time).until(
             EC.visibility_of_element_located(element_tuple)
         )
         return element
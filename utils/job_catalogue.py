@@ -0,0 +1,261 @@
+# utils/job_catalogue.py
+"""
+Browser-free discovery of the openings listed on the careers page.
+
+The careers page HTML already contains every opening as a `[role="row"][data-department=...]` row
+(see CareersPageLocators.RND_JOB_CARDS). This module downloads the page over plain HTTP, parses it
+incrementally as it streams in, and returns JobRecord objects per department. Results are cached in
+memory and on disk for JOB_CATALOGUE_TTL seconds so tests and runners can plan work without
+launching a browser.
+
+    python -m utils.job_catalogue [url]
+"""
+import codecs
+import datetime
+import json
+import logging
+import os
+import re
+import sys
+import time
+import urllib.request
+from dataclasses import dataclass, asdict
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+from decouple import config
+
+from utils import site
+
+LOGGER = logging.getLogger(__name__)
+
+# -----------------------------------------------------------------------------
+# CONSTANTS
+# -----------------------------------------------------------------------------
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CACHE_FILE = os.path.join(PROJECT_ROOT, ".cache", "job_catalogue.json")
+DEFAULT_TTL = 3600
+CHUNK_SIZE = 16 * 1024
+REQUEST_TIMEOUT = 30
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) job-catalogue/1.0"
+JOB_ID_PATTERN = re.compile(r"(\d{5,})")
+
+# url -> (fetched_at, {department: [JobRecord]})
+_MEMORY_CACHE = {}
+
+
+@dataclass
+class JobRecord:
+    """One opening row of the careers page."""
+    department: str
+    index: int
+    title: str
+    link_text: str
+    href: str
+    url: str
+    row_index: int
+
+    @property
+    def job_id(self):
+        """Numeric job id taken from the URL, or the URL itself when it has none."""
+        match = JOB_ID_PATTERN.search(self.href or "")
+        return match.group(1) if match else self.url
+
+    @property
+    def can_apply(self):
+        return self.link_text == "Apply now"
+
+    def to_dict(self):
+        return asdict(self)
+
+
+class CareersPageParser(HTMLParser):
+    """
+    Incremental parser for the careers page job table. Feed it chunks as they arrive;
+    `records` holds the JobRecord objects of every completed row.
+    """
+    def __init__(self, base_url):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.records = []
+        self._row = None
+        self._row_index = 0
+        self._per_department = {}
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if self._row is None:
+            if attrs.get("role") == "row" and "data-department" in attrs:
+                self._row = {
+                    "tag": tag, "depth": 1, "department": attrs["data-department"],
+                    "cells": [], "cell": None, "link_cell": False, "href": None, "link_text": None,
+                    "in_link": False, "row_index": self._row_index,
+                }
+            if attrs.get("role") == "row":
+                self._row_index += 1
+            return
+
+        row = self._row
+        if tag == row["tag"]:
+            row["depth"] += 1
+        elif tag == "td":
+            row["cell"] = []
+            row["link_cell"] = attrs.get("class") == "link"
+        elif tag == "a" and row["link_cell"] and row["href"] is None:
+            row["href"] = attrs.get("href")
+            row["in_link"] = True
+            row["link_text"] = []
+
+    def handle_endtag(self, tag):
+        row = self._row
+        if row is None:
+            return
+        if tag == "a" and row["in_link"]:
+            row["in_link"] = False
+        elif tag == "td" and row["cell"] is not None:
+            if not row["link_cell"]:
+                row["cells"].append(_clean("".join(row["cell"])))
+            row["cell"] = None
+            row["link_cell"] = False
+        elif tag == row["tag"]:
+            row["depth"] -= 1
+            if row["depth"] == 0:
+                self._finish_row(row)
+                self._row = None
+
+    def handle_data(self, data):
+        row = self._row
+        if row is None:
+            return
+        if row["cell"] is not None:
+            row["cell"].append(data)
+        if row["in_link"]:
+            row["link_text"].append(data)
+
+    def _finish_row(self, row):
+        if not row["href"]:
+            return
+        department = row["department"]
+        index = self._per_department.get(department, 0)
+        self._per_department[department] = index + 1
+        self.records.append(JobRecord(
+            department=department,
+            index=index,
+            title=next((cell for cell in row["cells"] if cell), ""),
+            link_text=_clean("".join(row["link_text"] or [])),
+            href=row["href"],
+            url=urljoin(self.base_url, row["href"]),
+            row_index=row["row_index"],
+        ))
+
+
+def parse_catalogue(chunks, base_url):
+    """Parse an iterable of HTML text chunks into {department: [JobRecord]}."""
+    parser = CareersPageParser(base_url)
+    for chunk in chunks:
+        parser.feed(chunk)
+    parser.close()
+    return _group(parser.records)
+
+
+def fetch_catalogue(url=None):
+    """Download and parse the careers page, streaming the body through the parser."""
+    url = url or catalogue_url()
+    start_time = time.monotonic()
+    request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+    with urllib.request.urlopen(request, timeout=REQUEST_TIMEOUT) as response:
+        charset = response.headers.get_content_charset() or "utf-8"
+        catalogue = parse_catalogue(_decoded_chunks(response, charset), response.geturl())
+    count = sum(len(records) for records in catalogue.values())
+    LOGGER.info(f"Fetched {count} openings in {len(catalogue)} departments from {url} "
+                f"in {time.monotonic() - start_time:.2f}s")
+    return catalogue
+
+
+def load_catalogue(url=None, ttl=None, refresh=False, cache_file=None):
+    """
+    Return {department: [JobRecord]} for the careers page at url, from the memory or disk cache
+    when it is younger than ttl seconds, otherwise from a fresh download.
+    """
+    url = url or catalogue_url()
+    ttl = config('JOB_CATALOGUE_TTL', default=DEFAULT_TTL, cast=int) if ttl is None else ttl
+    cache_file = cache_file or config('JOB_CATALOGUE_CACHE', default=DEFAULT_CACHE_FILE)
+    now = time.time()
+
+    if not refresh:
+        cached = _MEMORY_CACHE.get(url)
+        if cached and now - cached[0] < ttl:
+            return cached[1]
+        entry = _read_cache(cache_file).get(url)
+        if entry and now - entry["fetched_at"] < ttl:
+            catalogue = {
+                department: [JobRecord(**record) for record in records]
+                for department, records in entry["departments"].items()
+            }
+            _MEMORY_CACHE[url] = (entry["fetched_at"], catalogue)
+            return catalogue
+
+    catalogue = fetch_catalogue(url)
+    _MEMORY_CACHE[url] = (now, catalogue)
+    entries = _read_cache(cache_file)
+    entries[url] = {
+        "fetched_at": now,
+        "departments": {
+            department: [record.to_dict() for record in records]
+            for department, records in catalogue.items()
+        },
+    }
+    _write_cache(cache_file, entries)
+    return catalogue
+
+
+def catalogue_url():
+    """The careers page the catalogue is read from."""
+    return config('JOB_CATALOGUE_URL', default=None) or site.careers_url()
+
+
+def _group(records):
+    catalogue = {}
+    for record in records:
+        catalogue.setdefault(record.department, []).append(record)
+    return catalogue
+
+
+def _decoded_chunks(response, charset):
+    decoder = codecs.getincrementaldecoder(charset)(errors="replace")
+    while True:
+        chunk = response.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        yield decoder.decode(chunk)
+    yield decoder.decode(b"", final=True)
+
+
+def _clean(text):
+    return " ".join(text.split())
+
+
+def _read_cache(cache_file):
+    try:
+        with open(cache_file) as _f:
+            return json.load(_f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_cache(cache_file, entries):
+    # Write-then-rename so parallel workers never read a half-written file
+    os.makedirs(os.path.dirname(cache_file) or ".", exist_ok=True)
+    tmp_path = f"{cache_file}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as _f:
+        json.dump(entries, _f, indent=2)
+    os.replace(tmp_path, cache_file)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    catalogue = load_catalogue(sys.argv[1] if len(sys.argv) > 1 else None)
+    print(f"Job catalogue ({datetime.datetime.now():%Y-%m-%d %H:%M:%S})")
+    for department, records in sorted(catalogue.items()):
+        open_count = sum(1 for record in records if record.can_apply)
+        print(f"  {department}: {len(records)} openings ({open_count} accepting applications)")
@@ -0,0 +1,365 @@
+# utils/local_site.py
+"""
+Local stand-in for the Connecteam careers site, for reproducible and offline runs.
+
+Serves a home page, a careers page, position pages and the embedded application form with the
+same DOM the locators in utils/locators.py expect:
+
+* home page footer link `a[href='/careers/']`
+* careers page `select#department-filter` and `[role="row"][data-department=...]` rows whose
+  `td.link a` reads "Apply now" (or "Position filled" for closed positions)
+* position pages with a `.job__embedded-wrapper` that receives `iframe#grnhse_iframe` holding
+  `first_name`, `last_name`, `email`, `phone` and the `resume` file input; closed and withdrawn
+  positions show the job board search (`#keyword-filter-label`) instead
+
+The catalogue is N departments x M openings. Every response can be delayed by latency_ms, and the
+application iframe and a careers page widget are loaded by script ajax_delay_ms after the page,
+the way the real site's embeds arrive late.
+
+Run the whole suite against it with CONNECTEAM_URL=local (see utils/site.py), or serve it by hand:
+
+    python -m utils.local_site --departments 3 --openings 100 --latency-ms 50
+"""
+import argparse
+import atexit
+import html
+import json
+import logging
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from decouple import config
+
+LOGGER = logging.getLogger(__name__)
+
+# -----------------------------------------------------------------------------
+# CONSTANTS
+# -----------------------------------------------------------------------------
+DEPARTMENT_NAMES = ["R&D", "G&A", "Marketing", "Sales", "Customer Success", "Product", "Operations", "HR"]
+FIRST_JOB_ID = 5417654000
+DEFAULT_DEPARTMENTS = 2
+DEFAULT_OPENINGS = 5
+DEFAULT_AJAX_DELAY_MS = 300
+# Every CLOSED_EVERY-th opening of a department is listed as "Position filled"
+DEFAULT_CLOSED_EVERY = 5
+# Every WITHDRAWN_EVERY-th opening is listed as "Apply now" but its page says it's closed
+DEFAULT_WITHDRAWN_EVERY = 0
+POSITION_PATH = re.compile(r"^/careers/(\d+)/?$")
+EMBED_PATH = re.compile(r"^/embed/job_app/(\d+)/?$")
+
+_SERVER = {"site": None}
+
+HOME_TEMPLATE = """<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"><title>Connecteam | All-in-One Employee App (local)</title></head>
+<body>
+<header><a href="/">Connecteam</a></header>
+<main style="min-height: 3000px">
+  <h1>The all-in-one app for deskless teams</h1>
+  <p>Local stand-in site.</p>
+</main>
+<footer>
+  <ul><li><a href="/about/">About</a></li><li><a href="/careers/">Careers</a></li></ul>
+</footer>
+</body></html>
+"""
+
+CAREERS_TEMPLATE = """<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"><title>Careers | Connecteam (local)</title>
+<style>tr.hidden {{ display: none; }}</style></head>
+<body>
+<div class="careers-page">
+<h1>Careers at Connecteam</h1>
+<div class="filter-wrapper">
+  <select id="department-filter">
+    <option value="all">All departments</option>
+{options}
+  </select>
+</div>
+<div id="careers-widget">Loading...</div>
+<table class="careers-table">
+  <thead><tr role="row"><th>Position</th><th>Location</th><th></th></tr></thead>
+  <tbody>
+{rows}
+  </tbody>
+</table>
+</div>
+<script>
+document.getElementById('department-filter').addEventListener('change', function (event) {{
+    var department = event.target.value;
+    // Re-render after a short delay, like the real page's filter
+    setTimeout(function () {{
+        document.querySelectorAll('tbody tr[role="row"]').forEach(function (row) {{
+            row.classList.toggle('hidden', department !== 'all' && row.getAttribute('data-department') !== department);
+        }});
+    }}, 100);
+}});
+setTimeout(function () {{
+    fetch('/api/widget').then(function (response) {{ return response.json(); }}).then(function (data) {{
+        document.getElementById('careers-widget').textContent = data.message;
+    }});
+}}, {ajax_delay_ms});
+</script>
+</body></html>
+"""
+
+ROW_TEMPLATE = """    <tr role="row" data-department="{department}">
+      <td class="title">{title}</td>
+      <td class="location">{location}</td>
+      <td class="link"><a href="/careers/{job_id}/">{link_text}</a></td>
+    </tr>"""
+
+POSITION_TEMPLATE = """<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"><title>{title} | Connecteam (local)</title></head>
+<body>
+<a class="section-careers-single-back" href="/careers/">Back to all careers</a>
+<h1>{title}</h1>
+<span>{department}</span>
+<div class="job-description"><p>Local stand-in position {job_id}.</p></div>
+<div class="job__embedded-wrapper" id="grnhse_app"></div>
+<script>
+setTimeout(function () {{
+    var iframe = document.createElement('iframe');
+    iframe.id = 'grnhse_iframe';
+    iframe.src = '/embed/job_app/{job_id}/';
+    iframe.style.width = '100%';
+    iframe.style.height = '800px';
+    document.getElementById('grnhse_app').appendChild(iframe);
+}}, {ajax_delay_ms});
+</script>
+</body></html>
+"""
+
+CLOSED_POSITION_TEMPLATE = """<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"><title>Jobs | Connecteam (local)</title></head>
+<body>
+<div class="job__embedded-wrapper">
+  <label id="keyword-filter-label" for="keyword-filter">Search jobs</label>
+  <input id="keyword-filter" type="text">
+  <p>The position {job_id} is no longer open.</p>
+</div>
+</body></html>
+"""
+
+APPLICATION_FORM_TEMPLATE = """<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"><title>Apply</title></head>
+<body>
+<form id="application-form" onsubmit="return false;">
+  <label for="first_name">First Name</label><input id="first_name" name="first_name" type="text">
+  <label for="last_name">Last Name</label><input id="last_name" name="last_name" type="text">
+  <label for="email">Email</label><input id="email" name="email" type="email">
+  <label for="phone">Phone</label><input id="phone" name="phone" type="tel">
+  <label for="resume">Resume/CV</label><input id="resume" name="resume" type="file">
+  <div id="resume-status"></div>
+  <button type="submit">Submit application</button>
+</form>
+<script>
+document.getElementById('resume').addEventListener('change', function (event) {{
+    var file = event.target.files[0];
+    setTimeout(function () {{
+        document.getElementById('resume-status').innerHTML =
+            '<div class="body body__secondary"></div>';
+        document.querySelector('#resume-status div').textContent = file ? file.name : '';
+    }}, {ajax_delay_ms});
+}});
+</script>
+</body></html>
+"""
+
+
+class Opening(object):
+    def __init__(self, job_id, department, title, location, is_open, is_withdrawn=False):
+        self.job_id = job_id
+        self.department = department
+        self.title = title
+        self.location = location
+        self.is_open = is_open
+        self.is_withdrawn = is_withdrawn
+
+
+class LocalCareersSite(object):
+    """Generated careers site served from a background thread. start() returns its base URL."""
+    def __init__(self, departments=DEFAULT_DEPARTMENTS, openings=DEFAULT_OPENINGS, latency_ms=0,
+                 ajax_delay_ms=DEFAULT_AJAX_DELAY_MS, closed_every=DEFAULT_CLOSED_EVERY,
+                 withdrawn_every=DEFAULT_WITHDRAWN_EVERY, host="127.0.0.1", port=0):
+        self.latency_ms = latency_ms
+        self.ajax_delay_ms = ajax_delay_ms
+        self.host = host
+        self.port = port
+        self.departments = department_names(departments)
+        self.openings = generate_openings(self.departments, openings, closed_every, withdrawn_every)
+        self._by_id = {opening.job_id: opening for opening in self.openings}
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}/"
+
+    def start(self):
+        site = self
+
+        class Handler(_Handler):
+            pass
+        Handler.site = site
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="local-site", daemon=True)
+        self._thread.start()
+        LOGGER.info(f"Local careers site with {len(self.departments)} departments x "
+                    f"{len(self.openings) // max(1, len(self.departments))} openings serving on {self.url}")
+        return self.url
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    # Pages ---------------------------------------------------------------
+    def home_page(self):
+        return HOME_TEMPLATE
+
+    def careers_page(self):
+        options = "\n".join(
+            f'    <option value="{html.escape(department)}">{html.escape(department)}</option>'
+            for department in self.departments
+        )
+        rows = "\n".join(
+            ROW_TEMPLATE.format(
+                department=html.escape(opening.department), title=html.escape(opening.title),
+                location=opening.location, job_id=opening.job_id,
+                link_text="Apply now" if opening.is_open else "Position filled",
+            )
+            for opening in self.openings
+        )
+        return CAREERS_TEMPLATE.format(options=options, rows=rows, ajax_delay_ms=self.ajax_delay_ms)
+
+    def position_page(self, job_id):
+        opening = self._by_id.get(job_id)
+        if opening is None:
+            return None
+        if not opening.is_open or opening.is_withdrawn:
+            return CLOSED_POSITION_TEMPLATE.format(job_id=job_id)
+        return POSITION_TEMPLATE.format(
+            title=html.escape(opening.title), department=html.escape(opening.department),
+            job_id=job_id, ajax_delay_ms=self.ajax_delay_ms,
+        )
+
+    def application_form(self, job_id):
+        if job_id not in self._by_id:
+            return None
+        return APPLICATION_FORM_TEMPLATE.format(ajax_delay_ms=self.ajax_delay_ms)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    site = None
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.site.latency_ms:
+            time.sleep(self.site.latency_ms / 1000)
+        path = self.path.split("?", 1)[0]
+        body, content_type = None, "text/html; charset=utf-8"
+        if path in ("/", "/index.html"):
+            body = self.site.home_page()
+        elif path in ("/careers", "/careers/"):
+            body = self.site.careers_page()
+        elif path == "/api/widget":
+            body, content_type = json.dumps({"message": "We're hiring!"}), "application/json"
+        elif POSITION_PATH.match(path):
+            body = self.site.position_page(int(POSITION_PATH.match(path).group(1)))
+        elif EMBED_PATH.match(path):
+            body = self.site.application_form(int(EMBED_PATH.match(path).group(1)))
+
+        if body is None:
+            self._send(404, "<h1>Not found</h1>", "text/html; charset=utf-8")
+        else:
+            self._send(200, body, content_type)
+
+    def _send(self, status, body, content_type):
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        LOGGER.debug(f"local site: {format % args}")
+
+
+def department_names(count):
+    """The first `count` department names; R&D and G&A come first so the suite's markers match."""
+    names = DEPARTMENT_NAMES[:count]
+    names.extend(f"Department {index}" for index in range(len(names) + 1, count + 1))
+    return names
+
+
+def generate_openings(departments, per_department, closed_every=DEFAULT_CLOSED_EVERY,
+                      withdrawn_every=DEFAULT_WITHDRAWN_EVERY):
+    """Openings interleaved across departments, like the real table, with stable job IDs."""
+    rng = random.Random(0)
+    openings = []
+    for index in range(per_department):
+        for department_index, department in enumerate(departments):
+            job_id = FIRST_JOB_ID + department_index * 100000 + index
+            is_open = not closed_every or (index + 1) % closed_every != 0
+            is_withdrawn = bool(withdrawn_every) and (index + 1) % withdrawn_every == 0
+            openings.append(Opening(
+                job_id, department, f"{department} Position {index + 1}",
+                rng.choice(["Tel Aviv", "Remote", "New York"]), is_open, is_withdrawn,
+            ))
+    return openings
+
+
+def start_from_config():
+    """Start (once per process) the site configured by the LOCAL_SITE_* settings and return its URL."""
+    if _SERVER["site"] is None:
+        site = LocalCareersSite(
+            departments=config('LOCAL_SITE_DEPARTMENTS', default=DEFAULT_DEPARTMENTS, cast=int),
+            openings=config('LOCAL_SITE_OPENINGS', default=DEFAULT_OPENINGS, cast=int),
+            latency_ms=config('LOCAL_SITE_LATENCY_MS', default=0, cast=int),
+            ajax_delay_ms=config('LOCAL_SITE_AJAX_DELAY_MS', default=DEFAULT_AJAX_DELAY_MS, cast=int),
+            closed_every=config('LOCAL_SITE_CLOSED_EVERY', default=DEFAULT_CLOSED_EVERY, cast=int),
+            withdrawn_every=config('LOCAL_SITE_WITHDRAWN_EVERY', default=DEFAULT_WITHDRAWN_EVERY, cast=int),
+            port=config('LOCAL_SITE_PORT', default=0, cast=int),
+        )
+        site.start()
+        atexit.register(site.stop)
+        _SERVER["site"] = site
+    return _SERVER["site"].url
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the local stand-in careers site")
+    parser.add_argument("--departments", type=int, default=DEFAULT_DEPARTMENTS)
+    parser.add_argument("--openings", type=int, default=DEFAULT_OPENINGS, help="Openings per department")
+    parser.add_argument("--latency-ms", type=int, default=0, help="Delay added to every response")
+    parser.add_argument("--ajax-delay-ms", type=int, default=DEFAULT_AJAX_DELAY_MS,
+                        help="Delay before the application iframe and widgets load")
+    parser.add_argument("--closed-every", type=int, default=DEFAULT_CLOSED_EVERY,
+                        help="List every Nth opening as closed (0 for none)")
+    parser.add_argument("--withdrawn-every", type=int, default=DEFAULT_WITHDRAWN_EVERY,
+                        help="Make every Nth listed opening's page say it is closed (0 for none)")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    site = LocalCareersSite(args.departments, args.openings, args.latency_ms, args.ajax_delay_ms,
+                            args.closed_every, args.withdrawn_every, port=args.port)
+    print(f"Serving on {site.start()} (CONNECTEAM_URL={site.url}) - Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        site.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -44,7 +44,12 @@ class PositionPageLocators(object):
         self.POSITION_FORM_LAST_NAME = (By.ID, 'last_name')
         self.POSITION_FORM_EMAIL = (By.ID, 'email')
         self.POSITION_FORM_PHONE = (By.ID, 'phone')
-        self.POSITION_FORM_SEARCH = (By.ID, 'id=keyword-filter-label')
+        self.POSITION_FORM_SEARCH = (By.ID, 'keyword-filter-label')
+        # Shown instead of the position when the link is broken or the job board is down
+        self.POSITION_ERROR_PAGE = (
+        By.XPATH, "//title[contains(., '404') or contains(., 'Not Found') or contains(., 'not found')]"
+                  " | //h1[contains(., 'Not Found') or contains(., 'not found') or contains(., 'Something went wrong')]")
+        self.POSITION_EMBEDDED_WRAPPER = (By.CLASS_NAME, "job__embedded-wrapper")
         self.POSITION_DESCRIPTION = (By.CSS_SELECTOR, "div.job-description")
         self.POSITION_DEPARTMENT = (By.XPATH, f"//span[contains(text(), '{param}')]")
         self.APPLY_NOW_BUTTON = (By.XPATH, "//a[contains(@class, 'apply-button') and contains(text(), 'Apply Now')]")
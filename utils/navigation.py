@@ -0,0 +1,212 @@
+# utils/navigation.py
+"""
+What each browser session is showing, so page objects don't wait for a page that has already loaded.
+
+Per driver a NavigationState keeps the URL, a load generation and a readiness flag:
+
+* The generation goes up when the document changes. A small marker object is put into every document
+  the first time it is probed, so a new document is recognised by its missing or different marker;
+  history.pushState, popstate and hashchange count as navigations too.
+* The page is ready once BasePage.wait_for_page_load() has seen it complete and settled.
+* Any WebDriver command that can change the page (clicks, typing, navigation, scripts other than the
+  read-only ones registered with read_only(), switching window or frame) clears the flag. Sessions from
+  utils.driver_factory.create_driver are watched this way; on other sessions the flag is never set.
+
+A readiness check on a ready page costs one script round trip: wait_for_page_load() and
+HomePage.check_homepage_page_loaded() return at once instead of polling readyState and settling
+again. The skipped waits are counted per test and in the terminal summary.
+NAVIGATION_STATE=false always waits, for comparison.
+"""
+import functools
+import logging
+import threading
+import weakref
+
+from decouple import config
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.command import Command
+
+from utils import run_report, settle, wire_stats
+
+LOGGER = logging.getLogger(__name__)
+
+# -----------------------------------------------------------------------------
+# CONSTANTS
+# -----------------------------------------------------------------------------
+ENABLED = config('NAVIGATION_STATE', default=True, cast=bool)
+REPORT_SECTION = "navigation"
+READY_STATE_SCRIPT = "return document.readyState"
+
+# Marks the document on first use and returns what identifies it, plus the settle tracker's
+# activity figures (see utils/settle.py) when the tracker is installed
+PROBE_SCRIPT = """
+var nav = window.__pomNavigation;
+if (!nav) {
+    nav = window.__pomNavigation = {
+        token: Date.now().toString(36) + Math.random().toString(36).slice(2), soft: 0, leaving: false
+    };
+    var bump = function () { nav.soft++; };
+    var originalPushState = history.pushState;
+    history.pushState = function () {
+        var result = originalPushState.apply(this, arguments);
+        bump();
+        return result;
+    };
+    window.addEventListener('popstate', bump);
+    window.addEventListener('hashchange', bump);
+    window.addEventListener('beforeunload', function () { nav.leaving = true; });
+    window.addEventListener('pagehide', function () { nav.leaving = true; });
+}
+var tracker = window.__pomSettle;
+return {
+    token: nav.token, soft: nav.soft, leaving: nav.leaving, url: location.href, readyState: document.readyState,
+    pending: tracker ? tracker.pending : null,
+    quietMs: tracker ? performance.now() - tracker.lastActivity : null
+};
+"""
+
+# Commands that only read the page and leave it as it was
+READ_ONLY_COMMANDS = {
+    Command.FIND_ELEMENT, Command.FIND_ELEMENTS, Command.FIND_CHILD_ELEMENT, Command.FIND_CHILD_ELEMENTS,
+    Command.GET_ELEMENT_TEXT, Command.GET_ELEMENT_TAG_NAME, Command.IS_ELEMENT_SELECTED,
+    Command.IS_ELEMENT_ENABLED, Command.GET_ELEMENT_RECT, Command.GET_ELEMENT_ATTRIBUTE,
+    Command.GET_ELEMENT_PROPERTY, Command.GET_ELEMENT_VALUE_OF_CSS_PROPERTY, Command.GET_CURRENT_URL,
+    Command.GET_TITLE, Command.GET_PAGE_SOURCE, Command.SCREENSHOT, Command.ELEMENT_SCREENSHOT,
+    Command.GET_COOKIE, Command.GET_ALL_COOKIES, Command.W3C_GET_CURRENT_WINDOW_HANDLE,
+    Command.W3C_GET_WINDOW_HANDLES, Command.GET_WINDOW_RECT, Command.GET_TIMEOUTS, Command.GET_LOG,
+}
+SCRIPT_COMMANDS = {Command.W3C_EXECUTE_SCRIPT, Command.W3C_EXECUTE_SCRIPT_ASYNC}
+
+_READ_ONLY_SCRIPTS = {PROBE_SCRIPT, READY_STATE_SCRIPT, settle.SETTLE_SCRIPT}
+_STATES = weakref.WeakKeyDictionary()
+_LOCK = threading.Lock()
+_ACTIVE = {"skipped": 0}
+
+
+class NavigationState(object):
+    """URL, load generation and readiness of one session's current page."""
+    def __init__(self):
+        self.url = None
+        self.generation = 0
+        self.ready = False
+        # Only sessions whose commands are watched (see instrument()) can be trusted to be ready
+        self.watched = False
+        self.ready_state = None
+        self._identity = None
+
+    def observe(self, probe):
+        """Update from a PROBE_SCRIPT result; True when it is still the same page as before."""
+        self.ready_state = probe.get("readyState")
+        identity = (probe.get("token"), probe.get("soft"), probe.get("url"))
+        if identity == self._identity and not probe.get("leaving"):
+            return True
+        if identity != self._identity:
+            self._identity = identity
+            self.url = probe.get("url")
+            self.generation += 1
+        self.ready = False
+        return False
+
+    def settled(self, probe):
+        """True when probe shows the page ready before is still complete and quiet."""
+        same_page = self.observe(probe)
+        quiet_ms = probe.get("quietMs")
+        return (same_page and self.ready and self.watched and self.ready_state == "complete"
+                and probe.get("pending") == 0 and quiet_ms is not None and quiet_ms >= settle.QUIET_MS)
+
+    def invalidate(self):
+        self.ready = False
+
+
+def state(driver):
+    """The NavigationState of a session."""
+    with _LOCK:
+        if driver not in _STATES:
+            _STATES[driver] = NavigationState()
+        return _STATES[driver]
+
+
+def read_only(*scripts):
+    """Register in-page scripts that don't change the page, so running them keeps it ready."""
+    _READ_ONLY_SCRIPTS.update(scripts)
+
+
+def instrument(driver):
+    """Clear the session's readiness whenever it sends a command that can change the page."""
+    executor = driver.command_executor
+    if getattr(executor, "_navigation_wrapped", False):
+        return driver
+    executor.execute = functools.partial(_execute, executor.execute, state(driver))
+    executor._navigation_wrapped = True
+    state(driver).watched = True
+    return driver
+
+
+def probe(driver):
+    """PROBE_SCRIPT result for the session's current page; None when the page can't be probed."""
+    try:
+        result = driver.execute_script(PROBE_SCRIPT)
+    except WebDriverException as e:
+        LOGGER.debug(f"Navigation probe failed: {e.__class__.__name__}")
+        return None
+    return result if isinstance(result, dict) else None
+
+
+def settled(driver, call_site):
+    """True (and counted as a skipped wait) when the page is the same one last seen settled."""
+    result = probe(driver)
+    if result is None:
+        # Nothing is known about the page, not even its readyState
+        state(driver).ready_state = None
+        return False
+    if not (ENABLED and state(driver).settled(result)):
+        return False
+    with _LOCK:
+        _ACTIVE["skipped"] += 1
+    run_report.add(REPORT_SECTION, call_site, skipped=1)
+    LOGGER.debug(f"{call_site}: page already loaded (generation {state(driver).generation}), not waiting")
+    return True
+
+
+def loaded(driver):
+    """
+    Mark the session's page as complete and settled, after a wait that started with settled().
+    A page that changed during the wait stays not ready.
+    """
+    result = probe(driver)
+    current = state(driver)
+    if result is not None:
+        current.ready = current.observe(result) and current.ready_state == "complete"
+    return current
+
+
+def start_test():
+    with _LOCK:
+        _ACTIVE["skipped"] = 0
+
+
+def finish_test():
+    """Number of waits skipped during the test."""
+    with _LOCK:
+        skipped, _ACTIVE["skipped"] = _ACTIVE["skipped"], 0
+    return skipped
+
+
+@wire_stats.passthrough
+def _execute(execute, navigation, command, params=None):
+    if command not in READ_ONLY_COMMANDS and not (
+        command in SCRIPT_COMMANDS and (params or {}).get("script") in _READ_ONLY_SCRIPTS
+    ):
+        navigation.invalidate()
+    return execute(command, params)
+
+
+def format_report(rows):
+    """Terminal summary lines: waits skipped per call site."""
+    lines = [f"{call_site}: {int(row.get('skipped', 0))} waits skipped"
+             for call_site, row in sorted(rows.items(), key=lambda item: -item[1].get("skipped", 0))]
+    lines.append(f"total: {sum(int(row.get('skipped', 0)) for row in rows.values())} waits skipped")
+    return lines
+
+
+run_report.register(REPORT_SECTION, "navigation state", format_report)
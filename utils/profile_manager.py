@@ -0,0 +1,241 @@
+# utils/profile_manager.py
+"""
+Browser profile directories for test sessions: where they live, how they start and when they go.
+
+Every session gets its own profile (`<root>/<browser>_profile_<session id>`) so parallel browsers don't
+collide. Left alone, the browser fills each one from nothing on first start, and nothing deletes it.
+
+* PROFILE_TEMPLATE=true builds one warmed profile per browser (launched once, the site opened, quit)
+  under a lock shared by xdist workers, and gives every session a copy of it.
+  The template is rebuilt after PROFILE_TEMPLATE_TTL hours.
+* PROFILE_TMPFS=true puts the profiles in /dev/shm when it exists.
+* A session's profile is deleted when its driver quits, and any left over (crashed sessions) when
+  the process exits. cleanup_stale() removes what runs left behind: profiles whose owning process
+  is gone, or without an owner and older than PROFILE_STALE_HOURS. Profiles of running tests stay.
+
+The terminal summary shows the time spent cloning against a cold start, and the disk used per profile.
+"""
+import atexit
+import functools
+import glob
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from decouple import config
+
+from utils import run_report, wire_stats
+from utils.file_lock import locked
+
+LOGGER = logging.getLogger(__name__)
+
+# -----------------------------------------------------------------------------
+# CONSTANTS
+# -----------------------------------------------------------------------------
+TMPFS_ROOT = "/dev/shm"
+REPORT_SECTION = "profiles"
+BROWSERS = ("chrome", "firefox", "edge")
+# Lock and singleton files a running browser leaves in its profile; a copy must not have them
+LOCK_FILES = ("SingletonLock", "SingletonSocket", "SingletonCookie", "lock", ".parentlock", "parent.lock")
+READY_MARKER = ".template_ready"
+# PID of the process a session profile belongs to
+OWNER_FILE = ".pom_owner"
+
+USE_TEMPLATE = config('PROFILE_TEMPLATE', default=False, cast=bool)
+USE_TMPFS = config('PROFILE_TMPFS', default=False, cast=bool)
+TEMPLATE_TTL_HOURS = config('PROFILE_TEMPLATE_TTL', default=24, cast=float)
+STALE_HOURS = config('PROFILE_STALE_HOURS', default=24, cast=float)
+
+_LOCK = threading.Lock()
+_LIVE = set()
+
+
+def root():
+    """Directory holding the profiles: PROFILE_ROOT, else /dev/shm with PROFILE_TMPFS, else the temp dir."""
+    configured = config('PROFILE_ROOT', default='')
+    if configured:
+        return configured
+    if USE_TMPFS and os.path.isdir(TMPFS_ROOT):
+        return TMPFS_ROOT
+    return tempfile.gettempdir()
+
+
+def profile_path(browser_type, session_id):
+    return os.path.join(root(), f"{browser_type}_profile_{session_id}")
+
+
+def template_path(browser_type):
+    return os.path.join(root(), f"pom_template_{browser_type}")
+
+
+def acquire(browser_type, session_id, warm=None):
+    """
+    Directory for a new session's profile: a copy of the browser's template with PROFILE_TEMPLATE,
+    else a path the browser fills itself. warm(directory) launches the browser on a directory and
+    quits it; it builds the template the first time.
+    """
+    path = profile_path(browser_type, session_id)
+    if USE_TEMPLATE and warm is not None:
+        template = ensure_template(browser_type, warm)
+        start_time = time.monotonic()
+        shutil.copytree(template, path, symlinks=True, ignore=shutil.ignore_patterns(READY_MARKER, *LOCK_FILES))
+        run_report.add(REPORT_SECTION, "total", clones=1, clone_seconds=time.monotonic() - start_time)
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, OWNER_FILE), "w") as _f:
+        _f.write(str(os.getpid()))
+    with _LOCK:
+        _LIVE.add(path)
+    return path
+
+
+def ensure_template(browser_type, warm):
+    """Build the browser's template profile unless a fresh one exists; returns its path."""
+    template = template_path(browser_type)
+    marker = os.path.join(template, READY_MARKER)
+    with locked(template):
+        if os.path.exists(marker) and time.time() - os.path.getmtime(marker) < TEMPLATE_TTL_HOURS * 3600:
+            return template
+        shutil.rmtree(template, ignore_errors=True)
+        LOGGER.info(f"Building the {browser_type} template profile in {template}")
+        start_time = time.monotonic()
+        warm(template)
+        duration = time.monotonic() - start_time
+        with open(marker, "w") as _f:
+            _f.write(f"{duration:.3f}")
+        run_report.add(REPORT_SECTION, "total", templates=1, template_seconds=duration)
+    return template
+
+
+def attach(driver, path):
+    """Delete the profile at path when driver quits."""
+    driver.quit = functools.partial(_quit_and_remove, driver.quit, path)
+    return driver
+
+
+def record_launch(seconds, from_template):
+    """Record how long a browser took to start, on a cloned template or on an empty profile."""
+    if from_template:
+        run_report.add(REPORT_SECTION, "total", launches_from_template=1, launch_seconds_template=seconds)
+    else:
+        run_report.add(REPORT_SECTION, "total", cold_launches=1, launch_seconds_cold=seconds)
+
+
+def remove(path):
+    """Delete a profile directory, recording the disk it used."""
+    with _LOCK:
+        _LIVE.discard(path)
+    if not os.path.isdir(path):
+        return
+    size = disk_usage(path)
+    shutil.rmtree(path, ignore_errors=True)
+    run_report.add(REPORT_SECTION, "total", removed=1, bytes=size)
+
+
+def remove_live():
+    """Delete every profile of this process still on disk (sessions that never quit)."""
+    with _LOCK:
+        live = list(_LIVE)
+    for path in live:
+        remove(path)
+
+
+def cleanup_stale(directories=None, max_age_hours=STALE_HOURS):
+    """
+    Delete abandoned session profiles in directories (default: the temp dir and /dev/shm), leaving
+    those of other runs still going. Returns the count.
+    """
+    directories = directories or {tempfile.gettempdir(), TMPFS_ROOT, root()}
+    removed = 0
+    for directory in directories:
+        for browser_type in BROWSERS:
+            for path in glob.glob(os.path.join(directory, f"{browser_type}_profile_*")):
+                if not is_stale(path, max_age_hours):
+                    continue
+                shutil.rmtree(path, ignore_errors=True)
+                if not os.path.exists(path):
+                    removed += 1
+    return removed
+
+
+def is_stale(path, max_age_hours=STALE_HOURS):
+    """
+    True when the profile's owning process is gone. Without an owner, or where it can't be checked,
+    when the profile is older than max_age_hours.
+    """
+    try:
+        with open(os.path.join(path, OWNER_FILE)) as _f:
+            alive = _process_alive(int(_f.read().strip()))
+    except (OSError, ValueError):
+        alive = None
+    if alive is not None:
+        return not alive
+    try:
+        return time.time() - os.path.getmtime(path) > max_age_hours * 3600
+    except OSError:
+        return False
+
+
+def disk_usage(path):
+    total = 0
+    for directory, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(directory, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+def _process_alive(pid):
+    """Whether pid is running; None where that can't be checked."""
+    if os.name == "nt":
+        # os.kill would terminate it; leave Windows profiles to the age limit
+        return None
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Alive, owned by another user
+        return True
+    return True
+
+
+@wire_stats.passthrough
+def _quit_and_remove(quit, path):
+    try:
+        quit()
+    finally:
+        remove(path)
+
+
+atexit.register(remove_live)
+
+
+def format_report(rows):
+    """Terminal summary lines: clone time against a cold start, and disk used per profile."""
+    row = rows.get("total", {})
+    lines = []
+    clones = int(row.get("clones", 0))
+    if clones:
+        lines.append(f"cloned {clones} profiles from templates in {row.get('clone_seconds', 0.0):.1f}s "
+                     f"({row.get('clone_seconds', 0.0) / clones:.2f}s each); "
+                     f"{int(row.get('templates', 0))} templates built in {row.get('template_seconds', 0.0):.1f}s")
+    launches = []
+    for kind, count_key, seconds_key in (("from template", "launches_from_template", "launch_seconds_template"),
+                                         ("cold", "cold_launches", "launch_seconds_cold")):
+        if row.get(count_key):
+            launches.append(f"{row[seconds_key] / row[count_key]:.2f}s {kind} ({int(row[count_key])} launches)")
+    if launches:
+        lines.append("mean launch: " + " vs ".join(launches))
+    removed = int(row.get("removed", 0))
+    if removed:
+        lines.append(f"removed {removed} profiles from {root()}, "
+                     f"{row.get('bytes', 0) / removed / 2 ** 20:.1f} MiB each on average")
+    return lines
+
+
+run_report.register(REPORT_SECTION, "browser profiles", format_report)
@@ -0,0 +1,366 @@
+# utils/replay_proxy.py
+"""
+Local record/replay HTTP proxy, so repeated runs load the site from disk.
+
+With HTTP_CACHE=record, browsers launched by utils.driver_factory.create_driver go through a proxy on
+localhost. The proxy forwards every request and stores the response in a HAR-like archive
+(`.cache/http/archive.har`). With HTTP_CACHE=replay, responses are served from that archive only.
+A request missing from it gets a 504, so a replayed run never touches the network.
+Entries are keyed by method, URL and a hash of the request body. Query parameters listed in
+HTTP_CACHE_IGNORE_PARAMS (cache busters) are left out of the key.
+
+HTTPS goes through CONNECT. The proxy terminates TLS with a self-signed certificate made once with
+the openssl CLI, which the sessions accept because they ignore certificate errors. Without openssl,
+HTTPS is tunnelled untouched and not cached.
+
+Like the local site, the proxy is started once by the pytest controller, and its address is
+exported in HTTP_CACHE_PROXY for xdist workers. The terminal summary shows hits, misses and the
+network time recorded, so a record run and a replay run of the same tests show how much of the
+test time is the network.
+"""
+import atexit
+import base64
+import datetime
+import hashlib
+import http.client
+import json
+import logging
+import os
+import shutil
+import socket
+import ssl
+import subprocess
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from decouple import Csv, config
+
+from utils import run_report
+from utils.file_lock import locked
+
+LOGGER = logging.getLogger(__name__)
+
+# -----------------------------------------------------------------------------
+# CONSTANTS
+# -----------------------------------------------------------------------------
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CACHE_DIR = os.path.join(PROJECT_ROOT, ".cache", "http")
+ARCHIVE_NAME = "archive.har"
+OFF = "off"
+RECORD = "record"
+REPLAY = "replay"
+REPORT_SECTION = "http_cache"
+UPSTREAM_TIMEOUT = 30
+HOP_BY_HOP_HEADERS = {
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization", "proxy-connection",
+    "te", "trailer", "transfer-encoding", "upgrade", "content-length",
+}
+
+_PROXY = {"proxy": None}
+
+
+class ReplayProxy(object):
+    """Record/replay proxy serving on host:port (port 0 picks a free one)."""
+    def __init__(self, mode, directory=None, host="127.0.0.1", port=0, ignore_params=None):
+        self.mode = mode
+        self.directory = directory or config('HTTP_CACHE_DIR', default=DEFAULT_CACHE_DIR)
+        self.archive_path = os.path.join(self.directory, ARCHIVE_NAME)
+        self.host = host
+        self.port = port
+        self.ignore_params = set(ignore_params if ignore_params is not None else
+                                 config('HTTP_CACHE_IGNORE_PARAMS', default='_', cast=Csv()))
+        self.entries = {}
+        self.recorded = {}
+        self.tls_context = None
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def address(self):
+        return f"{self.host}:{self.port}"
+
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self.entries = load_archive(self.archive_path)
+        self.tls_context = _tls_context(self.directory)
+        handler = type("_BoundHandler", (_Handler,), {"proxy": self})
+        self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, name="replay-proxy", daemon=True).start()
+        LOGGER.info(f"HTTP cache proxy ({self.mode}) on {self.address}, {len(self.entries)} archived responses")
+        return self.address
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        self.save()
+
+    def key(self, method, url, body=b""):
+        """Archive key: method, URL without ignored query parameters, and a hash of the body."""
+        parts = urlsplit(url)
+        query = urlencode([(name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+                           if name not in self.ignore_params])
+        url = urlunsplit((parts.scheme, parts.netloc.lower(), parts.path or "/", query, ""))
+        return f"{method} {url} {hashlib.sha256(body or b'').hexdigest()[:16]}"
+
+    def lookup(self, key):
+        with self._lock:
+            return self.entries.get(key)
+
+    def store(self, key, entry):
+        entry["_key"] = key
+        with self._lock:
+            self.entries[key] = entry
+            self.recorded[key] = entry
+
+    def save(self):
+        """Merge the responses recorded by this proxy into the archive."""
+        with self._lock:
+            recorded, self.recorded = self.recorded, {}
+        if not recorded:
+            return
+        with locked(self.archive_path):
+            entries = load_archive(self.archive_path)
+            entries.update(recorded)
+            with open(self.archive_path, "w") as _f:
+                json.dump({"log": {
+                    "version": "1.2", "creator": {"name": "replay_proxy", "version": "1"},
+                    "entries": list(entries.values()),
+                }}, _f)
+        LOGGER.info(f"Saved {len(recorded)} recorded responses to {self.archive_path}")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    proxy = None
+    protocol_version = "HTTP/1.1"
+    # "host:port" of the CONNECT tunnel the requests on this connection came through
+    tunnel = None
+
+    def do_CONNECT(self):
+        if self.proxy.tls_context is None:
+            self._blind_tunnel()
+            return
+        self.send_response(200, "Connection Established")
+        self.end_headers()
+        self.wfile.flush()
+        connection = self.proxy.tls_context.wrap_socket(self.connection, server_side=True)
+        self.connection = connection
+        self.rfile = connection.makefile("rb")
+        self.wfile = connection.makefile("wb")
+        self.tunnel = self.path
+        self.close_connection = False
+
+    def do_GET(self):
+        self._handle()
+
+    do_POST = do_PUT = do_PATCH = do_DELETE = do_HEAD = do_OPTIONS = do_GET
+
+    def _handle(self):
+        url = f"https://{self._tunnel_netloc()}{self.path}" if self.tunnel else self.path
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        key = self.proxy.key(self.command, url, body)
+        entry = self.proxy.lookup(key) if self.proxy.mode == REPLAY else None
+        if entry is not None:
+            run_report.add(REPORT_SECTION, "total", hits=1, recorded_network_seconds=entry["time"] / 1000)
+            self._send_entry(entry)
+            return
+        if self.proxy.mode == REPLAY:
+            run_report.add(REPORT_SECTION, "total", misses=1)
+            LOGGER.debug(f"HTTP cache miss: {key}")
+            self._send(504, [("Content-Type", "text/plain"), ("X-Replay", "miss")], b"Not in the HTTP cache")
+            return
+        try:
+            entry = self._fetch(url, body)
+        except (OSError, http.client.HTTPException) as e:
+            LOGGER.debug(f"Upstream request {self.command} {url} failed: {e}")
+            self._send(502, [("Content-Type", "text/plain")], str(e).encode())
+            return
+        self.proxy.store(key, entry)
+        run_report.add(REPORT_SECTION, "total", recorded=1, network_seconds=entry["time"] / 1000,
+                       bytes=entry["response"]["content"]["size"])
+        self._send_entry(entry)
+
+    def _fetch(self, url, body):
+        parts = urlsplit(url)
+        if parts.scheme == "https":
+            upstream = http.client.HTTPSConnection(parts.hostname, parts.port or 443, timeout=UPSTREAM_TIMEOUT,
+                                                   context=ssl.create_default_context())
+        else:
+            upstream = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=UPSTREAM_TIMEOUT)
+        headers = {name: value for name, value in self.headers.items() if name.lower() not in HOP_BY_HOP_HEADERS}
+        path = urlunsplit(("", "", parts.path or "/", parts.query, ""))
+        start_time = time.monotonic()
+        try:
+            upstream.request(self.command, path, body=body or None, headers=headers)
+            response = upstream.getresponse()
+            content = response.read()
+        finally:
+            upstream.close()
+        return {
+            "startedDateTime": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "time": round((time.monotonic() - start_time) * 1000, 1),
+            "request": {"method": self.command, "url": url, "bodySize": len(body)},
+            "response": {
+                "status": response.status, "statusText": response.reason,
+                "headers": [{"name": name, "value": value} for name, value in response.getheaders()
+                            if name.lower() not in HOP_BY_HOP_HEADERS],
+                "content": {"size": len(content), "mimeType": response.getheader("Content-Type", ""),
+                            "encoding": "base64", "text": base64.b64encode(content).decode("ascii")},
+            },
+        }
+
+    def _send_entry(self, entry):
+        response = entry["response"]
+        headers = [(header["name"], header["value"]) for header in response["headers"]]
+        self._send(response["status"], headers, base64.b64decode(response["content"]["text"]),
+                   response.get("statusText"))
+
+    def _send(self, status, headers, payload, reason=None):
+        self.send_response(status, reason)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(payload)
+
+    def _tunnel_netloc(self):
+        host, _, port = self.tunnel.rpartition(":")
+        return host if port == "443" else self.tunnel
+
+    def _blind_tunnel(self):
+        host, _, port = self.path.rpartition(":")
+        try:
+            upstream = socket.create_connection((host, int(port or 443)), timeout=UPSTREAM_TIMEOUT)
+        except OSError as e:
+            self._send(502, [("Content-Type", "text/plain")], str(e).encode())
+            return
+        self.send_response(200, "Connection Established")
+        self.end_headers()
+        self.wfile.flush()
+        _pipe(self.connection, upstream)
+        upstream.close()
+        self.close_connection = True
+
+    def log_message(self, format, *args):
+        LOGGER.debug(f"replay proxy: {format % args}")
+
+
+def _pipe(client, upstream):
+    """Copy bytes both ways until either side closes."""
+    def copy(source, target):
+        try:
+            while True:
+                data = source.recv(65536)
+                if not data:
+                    break
+                target.sendall(data)
+        except OSError:
+            pass
+        finally:
+            try:
+                target.shutdown(2)
+            except OSError:
+                pass
+    thread = threading.Thread(target=copy, args=(upstream, client), daemon=True)
+    thread.start()
+    copy(client, upstream)
+    thread.join()
+
+
+def load_archive(path):
+    """{key: HAR entry} from an archive file; empty when there is none yet."""
+    try:
+        with open(path) as _f:
+            entries = json.load(_f)["log"]["entries"]
+    except (OSError, ValueError, KeyError):
+        return {}
+    return {entry["_key"]: entry for entry in entries if "_key" in entry}
+
+
+def _tls_context(directory):
+    """Server TLS context with a self-signed certificate made by openssl, or None without openssl."""
+    cert_path = os.path.join(directory, "proxy-cert.pem")
+    key_path = os.path.join(directory, "proxy-key.pem")
+    if not os.path.exists(cert_path):
+        if shutil.which("openssl") is None:
+            LOGGER.warning("openssl not found: HTTPS is tunnelled through the HTTP cache proxy uncached")
+            return None
+        subprocess.run(
+            ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "3650",
+             "-subj", "/CN=pom-replay-proxy", "-keyout", key_path, "-out", cert_path],
+            check=True, capture_output=True
+        )
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert_path, key_path)
+    context.set_alpn_protocols(["http/1.1"])
+    return context
+
+
+def mode():
+    return config('HTTP_CACHE', default=OFF)
+
+
+def address():
+    """
+    host:port of the proxy sessions should use, or None when HTTP_CACHE is off. Starts the proxy in
+    this process on first use and exports its address in HTTP_CACHE_PROXY for child processes.
+    """
+    if mode() == OFF:
+        return None
+    exported = config('HTTP_CACHE_PROXY', default='')
+    if exported:
+        return exported
+    if _PROXY["proxy"] is None:
+        proxy = ReplayProxy(mode())
+        proxy.start()
+        atexit.register(proxy.stop)
+        _PROXY["proxy"] = proxy
+        os.environ['HTTP_CACHE_PROXY'] = proxy.address
+    return _PROXY["proxy"].address
+
+
+def apply_options(browser_type, options):
+    """Route a new session through the proxy when HTTP_CACHE is on."""
+    proxy_address = address()
+    if proxy_address is None:
+        return options
+    if browser_type != "firefox":
+        options.add_argument(f"--proxy-server=http://{proxy_address}")
+        return options
+
+    host, _, port = proxy_address.rpartition(":")
+    options.accept_insecure_certs = True
+    if options.preferences.get("network.proxy.type") == 2:
+        # The resource policy's auto-config script blocks hosts; send the rest to the proxy
+        from utils import resource_policy
+        options.set_preference("network.proxy.autoconfig_url", resource_policy.firefox_pac(
+            resource_policy.blocked_urls(), proxy=f"PROXY {proxy_address}"
+        ))
+        return options
+    options.set_preference("network.proxy.type", 1)
+    for scheme in ("http", "ssl"):
+        options.set_preference(f"network.proxy.{scheme}", host)
+        options.set_preference(f"network.proxy.{scheme}_port", int(port))
+    return options
+
+
+def format_report(rows):
+    """Terminal summary lines: hits and misses when replaying, requests and network time when recording."""
+    row = rows.get("total", {})
+    lines = [f"mode: {mode()}"]
+    if row.get("recorded"):
+        lines.append(f"recorded: {int(row['recorded'])} responses, {row.get('bytes', 0) / 1024:.0f} KiB, "
+                     f"{row.get('network_seconds', 0.0):.1f}s waiting for the network")
+    if row.get("hits") or row.get("misses"):
+        lines.append(f"replayed: {int(row.get('hits', 0))} hits, {int(row.get('misses', 0))} misses, "
+                     f"{row.get('recorded_network_seconds', 0.0):.1f}s of network time they took when recorded")
+    return lines
+
+
+run_report.register(REPORT_SECTION, "http cache", format_report)
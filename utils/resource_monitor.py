@@ -0,0 +1,340 @@
+# utils/resource_monitor.py
+"""
+Memory and CPU used by the browser behind a test, sampled from /proc.
+
+With RESOURCE_MONITOR=true the driver fixture starts a sampler thread for each test. Every
+RESOURCE_SAMPLE_INTERVAL seconds it walks the process tree of the test's driver service
+(chromedriver/geckodriver and every browser process started under it), and of any other session
+the test launches (e.g. for concurrent openings), and sums resident memory and CPU time.
+When the test ends:
+
+* its peak and mean RSS and CPU are attached to the report and added to the terminal summary,
+* the samples go to `reports/resources/<test id>.csv`, each row with the number of openings
+  processed so far, and one row per test is appended to `reports/resources/tests.csv`,
+* a pooled session whose browser is above RESOURCE_RECYCLE_MB when it is given back is recycled,
+  both in the worker's DRIVER_POOL and in the pool used for concurrent openings.
+
+RSS is summed per process, so memory shared between browser processes is counted more than once;
+the figures are for comparing tests and runs, not for the exact footprint.
+Only local sessions on Linux are sampled; elsewhere start_test() returns None.
+"""
+import csv
+import logging
+import os
+import re
+import threading
+import time
+
+import allure
+from decouple import config
+
+from utils import run_report
+from utils.file_lock import locked
+
+LOGGER = logging.getLogger(__name__)
+
+# -----------------------------------------------------------------------------
+# CONSTANTS
+# -----------------------------------------------------------------------------
+PROC = "/proc"
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_RESOURCE_DIR = os.path.join(PROJECT_ROOT, "reports", "resources")
+TESTS_FILE = "tests.csv"
+REPORT_SECTION = "browser_resources"
+SUMMARY_ROWS = 5
+MIB = 2 ** 20
+UNSAFE_FILENAME_CHARS = re.compile(r"[^\w.\-\[\]&]+")
+SAMPLE_FIELDS = ("seconds", "rss_mb", "cpu_percent", "processes", "openings")
+TEST_FIELDS = ("test", "seconds", "samples", "peak_rss_mb", "mean_rss_mb", "last_rss_mb",
+               "cpu_seconds", "mean_cpu_percent", "peak_cpu_percent", "peak_processes", "openings")
+
+SAMPLE_INTERVAL = config('RESOURCE_SAMPLE_INTERVAL', default=0.5, cast=float)
+# 0 = never recycle for memory
+RECYCLE_BYTES = int(config('RESOURCE_RECYCLE_MB', default=0, cast=float) * MIB)
+
+try:
+    PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+    CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+except (AttributeError, ValueError, OSError):  # Windows
+    PAGE_SIZE = CLOCK_TICKS = None
+
+_ACTIVE = {"sampler": None}
+
+
+class Sampler(object):
+    """Background thread sampling the process trees under one or more driver pids."""
+    def __init__(self, pid, name, interval=None):
+        self.pids = [pid]
+        self.name = name
+        self.interval = interval or SAMPLE_INTERVAL
+        # (seconds since start, rss bytes, cpu percent since the previous sample, processes, openings)
+        self.samples = []
+        self.cpu_seconds = 0.0
+        self.openings = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"resource-monitor-{pid}", daemon=True)
+        self._started = None
+        self._last = None
+
+    def start(self):
+        self._started = time.monotonic()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop sampling, after one last sample."""
+        self._stop.set()
+        self._thread.join()
+        self.sample()
+        return self
+
+    def add(self, pid):
+        """Sample the tree under pid too (another session of the same test)."""
+        with self._lock:
+            if pid not in self.pids:
+                self.pids.append(pid)
+
+    def opening_processed(self):
+        with self._lock:
+            self.openings += 1
+
+    def sample(self):
+        now = time.monotonic()
+        with self._lock:
+            pids = list(self.pids)
+        rss, cpu, processes = usage(pids)
+        if not processes:
+            return
+        with self._lock:
+            cpu_percent = 0.0
+            if self._last is not None:
+                # Processes that exited take their CPU time with them, so the total can drop
+                spent = max(0.0, cpu - self._last[1])
+                self.cpu_seconds += spent
+                cpu_percent = 100 * spent / max(now - self._last[0], 1e-6)
+            self._last = (now, cpu)
+            self.samples.append((now - self._started, rss, cpu_percent, processes, self.openings))
+
+    def summary(self):
+        """Peak/mean figures of the samples so far (sizes in MiB)."""
+        with self._lock:
+            samples = list(self.samples)
+        if not samples:
+            return {}
+        rss = [sample[1] for sample in samples]
+        # The first sample has no CPU figure
+        cpu = [sample[2] for sample in samples[1:]] or [0.0]
+        return {
+            "test": self.name,
+            "seconds": round(samples[-1][0], 2),
+            "samples": len(samples),
+            "peak_rss_mb": round(max(rss) / MIB, 1),
+            "mean_rss_mb": round(sum(rss) / len(rss) / MIB, 1),
+            "last_rss_mb": round(rss[-1] / MIB, 1),
+            "cpu_seconds": round(self.cpu_seconds, 2),
+            "mean_cpu_percent": round(sum(cpu) / len(cpu), 1),
+            "peak_cpu_percent": round(max(cpu), 1),
+            "peak_processes": max(sample[3] for sample in samples),
+            "openings": self.openings,
+        }
+
+    def write(self, directory=None):
+        """Write the samples to <directory>/<test id>.csv and append the summary to tests.csv; returns the samples path."""
+        directory = directory or config('RESOURCE_MONITOR_DIR', default=DEFAULT_RESOURCE_DIR)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{UNSAFE_FILENAME_CHARS.sub('_', self.name)}.csv")
+        with self._lock:
+            samples = list(self.samples)
+        with open(path, "w", newline="") as _f:
+            writer = csv.writer(_f)
+            writer.writerow(SAMPLE_FIELDS)
+            for seconds, rss, cpu_percent, processes, openings in samples:
+                writer.writerow((f"{seconds:.2f}", f"{rss / MIB:.1f}", f"{cpu_percent:.1f}", processes, openings))
+
+        tests_path = os.path.join(directory, TESTS_FILE)
+        # Every xdist worker appends to the same file
+        with locked(tests_path):
+            new_file = not os.path.exists(tests_path)
+            with open(tests_path, "a", newline="") as _f:
+                writer = csv.DictWriter(_f, fieldnames=TEST_FIELDS)
+                if new_file:
+                    writer.writeheader()
+                writer.writerow(self.summary())
+        return path
+
+    def _run(self):
+        while True:
+            try:
+                self.sample()
+            except Exception as e:
+                LOGGER.warning(f"Resource sampling of {self.name} stopped: {e}")
+                return
+            if self._stop.wait(self.interval):
+                return
+
+
+def enabled():
+    return config('RESOURCE_MONITOR', default=False, cast=bool)
+
+
+def available():
+    """True where processes can be sampled (Linux)."""
+    return PAGE_SIZE is not None and os.path.isdir(PROC)
+
+
+def driver_pid(driver):
+    """Pid of the local driver service (chromedriver, geckodriver, ...) behind a session, or None."""
+    process = getattr(getattr(driver, "service", None), "process", None)
+    return getattr(process, "pid", None)
+
+
+def process_tree(pids, table=None):
+    """The given pids and every process descending from them."""
+    table = table if table is not None else _process_table()
+    children = {}
+    for member, (parent, _) in table.items():
+        children.setdefault(parent, []).append(member)
+    tree = list(dict.fromkeys(pids))
+    for parent in tree:
+        tree.extend(children.get(parent, ()))
+    return tree
+
+
+def usage(pids):
+    """(rss bytes, cpu seconds, process count) summed over the trees under pids."""
+    table = _process_table()
+    rss = 0
+    cpu = 0.0
+    processes = 0
+    for member in process_tree(pids, table):
+        if member not in table:
+            continue
+        try:
+            with open(os.path.join(PROC, str(member), "statm")) as _f:
+                resident_pages = int(_f.read().split()[1])
+        except (OSError, IndexError, ValueError):
+            # Exited since the table was read
+            continue
+        rss += resident_pages * PAGE_SIZE
+        cpu += table[member][1]
+        processes += 1
+    return rss, cpu, processes
+
+
+def start_test(driver, name):
+    """Start sampling the browser of driver for the current test; None when there is nothing to sample."""
+    pid = driver_pid(driver)
+    if not enabled() or pid is None or not available():
+        _ACTIVE["sampler"] = None
+        return None
+    _ACTIVE["sampler"] = Sampler(pid, name).start()
+    return _ACTIVE["sampler"]
+
+
+def track(driver):
+    """Include a session launched during the current test in its samples."""
+    sampler = _ACTIVE["sampler"]
+    pid = driver_pid(driver)
+    if sampler is not None and pid is not None:
+        sampler.add(pid)
+
+
+def session_rss(driver):
+    """Current memory of one session's browser in bytes, or None when it isn't monitored."""
+    pid = driver_pid(driver)
+    if not enabled() or pid is None or not available():
+        return None
+    return usage([pid])[0]
+
+
+def finish_test():
+    """Stop sampling and return the current test's Sampler (or None)."""
+    sampler, _ACTIVE["sampler"] = _ACTIVE["sampler"], None
+    if sampler is not None:
+        sampler.stop()
+    return sampler
+
+
+def opening_processed():
+    """Count one processed opening against the current test's samples."""
+    sampler = _ACTIVE["sampler"]
+    if sampler is not None:
+        sampler.opening_processed()
+
+
+def record(sampler, item=None):
+    """Add a finished test's figures to the terminal summary, the report and reports/resources/."""
+    summary = sampler.summary()
+    if not summary:
+        return summary
+    run_report.add(REPORT_SECTION, sampler.name, tests=1, peak_rss_mb=summary["peak_rss_mb"],
+                   mean_rss_mb=summary["mean_rss_mb"], cpu_seconds=summary["cpu_seconds"],
+                   openings=summary["openings"])
+    if item is not None:
+        # Shown by pytest-html and written to junit xml
+        item.user_properties.extend(
+            (key, summary[key]) for key in ("peak_rss_mb", "mean_rss_mb", "cpu_seconds", "mean_cpu_percent")
+        )
+    text = "\n".join(f"{key}: {value}" for key, value in summary.items())
+    try:
+        path = sampler.write()
+        allure.attach(text, name="Browser resources", attachment_type=allure.attachment_type.TEXT)
+        allure.attach.file(path, name="Browser resource samples", attachment_type=allure.attachment_type.CSV)
+    except OSError as e:
+        LOGGER.warning(f"Could not write the browser resource samples: {e}")
+    LOGGER.info(f"Browser resources for {sampler.name}: peak {summary['peak_rss_mb']} MiB, "
+                f"mean {summary['mean_rss_mb']} MiB, {summary['cpu_seconds']}s CPU")
+    return summary
+
+
+def _process_table():
+    """{pid: (ppid, cpu seconds)} of every process in /proc."""
+    table = {}
+    for entry in os.listdir(PROC):
+        if entry.isdigit():
+            stat = _read_stat(int(entry))
+            if stat is not None:
+                table[int(entry)] = stat
+    return table
+
+
+def _read_stat(pid):
+    """(ppid, cpu seconds) from /proc/<pid>/stat, or None once the process is gone."""
+    try:
+        with open(os.path.join(PROC, str(pid), "stat")) as _f:
+            content = _f.read()
+    except OSError:
+        return None
+    # The command name is in parentheses and may contain spaces; fields after it start at state (3)
+    fields = content[content.rfind(")") + 2:].split()
+    try:
+        return int(fields[1]), (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+    except (IndexError, ValueError):
+        return None
+
+
+def format_report(rows):
+    """Terminal summary lines: run-wide memory figures and the tests with the highest peak."""
+    tests = sum(int(row.get("tests", 0)) for row in rows.values())
+    if not tests:
+        return []
+    openings = sum(int(row.get("openings", 0)) for row in rows.values())
+    peaks = sorted(rows.items(), key=lambda item: -item[1].get("peak_rss_mb", 0.0))
+    lines = [
+        f"{tests} tests sampled: highest peak {peaks[0][1].get('peak_rss_mb', 0.0):.0f} MiB, "
+        f"mean {sum(row.get('mean_rss_mb', 0.0) for row in rows.values()) / tests:.0f} MiB, "
+        f"{sum(row.get('cpu_seconds', 0.0) for row in rows.values()):.0f}s browser CPU, "
+        f"{openings} openings processed"
+    ]
+    for name, row in peaks[:SUMMARY_ROWS]:
+        line = f"{name}: peak {row.get('peak_rss_mb', 0.0):.0f} MiB, mean {row.get('mean_rss_mb', 0.0):.0f} MiB"
+        if row.get("openings"):
+            line += f", {int(row['openings'])} openings"
+        lines.append(line)
+    if len(rows) > SUMMARY_ROWS:
+        lines.append("... samples for every test in reports/resources/")
+    return lines
+
+
+run_report.register(REPORT_SECTION, "browser resources", format_report)
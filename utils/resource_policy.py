@@ -0,0 +1,208 @@
+# utils/resource_policy.py
+"""
+Trim what the browser loads during a test session.
+
+The pages under test pull in marketing trackers, chat widgets, web fonts and large images that neither
+CareersPage nor PositionPage needs. Sessions launched by utils.driver_factory.create_driver can:
+  * block URL patterns (BLOCK_RESOURCES=true for the built-in list, plus any in BLOCKED_URLS):
+    Chromium browsers through DevTools Network.setBlockedURLs. Firefox has no such command, so it gets
+    a proxy auto-config script that sends matching hosts to a closed port and disables web fonts;
+  * skip images (BLOCK_IMAGES=true), through a content setting or pref;
+  * run headless (HEADLESS, on by default on Linux).
+
+With RESOURCE_REPORT=true every page load is weighed with the Navigation/Resource Timing API (requests,
+bytes transferred, load time) per page. The figures are kept in `.cache/page_weight.json` per policy
+("full" or "trimmed"), so the summary of a trimmed run shows what it saved against the last full one.
+"""
+import json
+import logging
+import os
+import platform
+import re
+import urllib.parse
+
+from decouple import Csv, config
+
+from utils import run_report
+from utils.file_lock import locked
+
+LOGGER = logging.getLogger(__name__)
+
+# -----------------------------------------------------------------------------
+# CONSTANTS
+# -----------------------------------------------------------------------------
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_WEIGHT_FILE = os.path.join(PROJECT_ROOT, ".cache", "page_weight.json")
+REPORT_SECTION = "page_weight"
+FULL = "full"
+TRIMMED = "trimmed"
+WINDOW_SIZE = (1920, 1080)
+# Requests for blocked hosts go here and are refused at once
+BLACKHOLE_PROXY = "PROXY 127.0.0.1:9"
+
+# Third parties the careers and position pages load that no test looks at
+DEFAULT_BLOCKED_URLS = [
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*googleadservices.com*",
+    "*facebook.net*", "*connect.facebook.com*", "*hotjar.com*", "*clarity.ms*", "*bat.bing.com*",
+    "*snap.licdn.com*", "*px.ads.linkedin.com*", "*intercom.io*", "*intercomcdn.com*",
+    "*hs-scripts.com*", "*hs-analytics.net*", "*hsforms.net*", "*hubspot.com*", "*drift.com*",
+    "*zdassets.com*", "*segment.io*", "*cdn.segment.com*", "*fullstory.com*", "*youtube.com*",
+    "*vimeo.com*", "*fonts.googleapis.com*", "*fonts.gstatic.com*", "*.woff2", "*.woff", "*.ttf",
+]
+
+BLOCK_RESOURCES = config('BLOCK_RESOURCES', default=False, cast=bool)
+BLOCKED_URLS = config('BLOCKED_URLS', default='', cast=Csv())
+BLOCK_IMAGES = config('BLOCK_IMAGES', default=False, cast=bool)
+HEADLESS = config('HEADLESS', default=platform.system() == "Linux", cast=bool)
+REPORT = config('RESOURCE_REPORT', default=False, cast=bool)
+
+# Weight of the current document, once per document: (page, requests, bytes, load_ms) or null
+PAGE_WEIGHT_SCRIPT = """
+if (window.__pomWeighed) { return null; }
+var navigation = performance.getEntriesByType('navigation')[0];
+if (!navigation) { return null; }
+window.__pomWeighed = true;
+var resources = performance.getEntriesByType('resource');
+var bytes = navigation.transferSize || 0;
+resources.forEach(function (resource) { bytes += resource.transferSize || 0; });
+return {
+    page: location.host + location.pathname,
+    requests: resources.length + 1,
+    bytes: bytes,
+    load_ms: Math.max(navigation.loadEventEnd, navigation.domComplete) - navigation.startTime
+};
+"""
+NUMBERS = re.compile(r"\d+")
+
+
+def blocked_urls():
+    """URL patterns ('*' wildcards) blocked in new sessions."""
+    patterns = list(DEFAULT_BLOCKED_URLS) if BLOCK_RESOURCES else []
+    return patterns + [pattern for pattern in BLOCKED_URLS if pattern not in patterns]
+
+
+def mode():
+    return TRIMMED if blocked_urls() or BLOCK_IMAGES else FULL
+
+
+def apply_options(browser_type, options):
+    """Add the launch-time part of the policy (headless, images, Firefox blocking) to browser options."""
+    if HEADLESS:
+        if browser_type == "firefox":
+            options.add_argument("-headless")
+            options.add_argument(f"--width={WINDOW_SIZE[0]}")
+            options.add_argument(f"--height={WINDOW_SIZE[1]}")
+        else:
+            options.add_argument("--headless=new")
+            options.add_argument(f"--window-size={WINDOW_SIZE[0]},{WINDOW_SIZE[1]}")
+
+    if browser_type == "firefox":
+        if BLOCK_IMAGES:
+            options.set_preference("permissions.default.image", 2)
+        patterns = blocked_urls()
+        if patterns:
+            options.set_preference("network.proxy.type", 2)
+            options.set_preference("network.proxy.autoconfig_url", firefox_pac(patterns))
+            options.set_preference("gfx.downloadable_fonts.enabled", False)
+    elif BLOCK_IMAGES:
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    return options
+
+
+def apply_session(driver):
+    """Block URL patterns in a running Chromium session; Firefox got its blocking at launch."""
+    patterns = blocked_urls()
+    if not patterns or not hasattr(driver, "execute_cdp_cmd"):
+        return driver
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    LOGGER.info(f"Blocking {len(patterns)} URL patterns in this session")
+    return driver
+
+
+def firefox_pac(patterns, proxy=None):
+    """
+    data: URL of a proxy auto-config script sending hosts that match patterns to a closed port, and
+    everything else to proxy (default DIRECT). Firefox only shows PAC scripts the host of https URLs,
+    so path patterns only apply to plain http.
+    """
+    script = (
+        "function FindProxyForURL(url, host) {\n"
+        f"    var blocked = {json.dumps(patterns)};\n"
+        "    for (var i = 0; i < blocked.length; i++) {\n"
+        "        if (shExpMatch(url, blocked[i]) || shExpMatch(host, blocked[i])) {\n"
+        f"            return '{BLACKHOLE_PROXY}';\n"
+        "        }\n"
+        "    }\n"
+        f"    return '{proxy or 'DIRECT'}';\n"
+        "}\n"
+    )
+    return "data:application/x-ns-proxy-autoconfig," + urllib.parse.quote(script)
+
+
+def record_page(driver):
+    """Weigh the current document once, when RESOURCE_REPORT is on."""
+    if not REPORT:
+        return None
+    try:
+        weight = driver.execute_script(PAGE_WEIGHT_SCRIPT)
+    except Exception as e:
+        LOGGER.debug(f"Could not weigh the page: {e}")
+        return None
+    if weight:
+        run_report.add(REPORT_SECTION, NUMBERS.sub("<id>", weight["page"]), loads=1,
+                       requests=weight["requests"], bytes=weight["bytes"], load_ms=weight["load_ms"])
+    return weight
+
+
+def weight_file():
+    return config('PAGE_WEIGHT_FILE', default=DEFAULT_WEIGHT_FILE)
+
+
+def load(path=None):
+    """Return {mode: {page: {requests, bytes, load_ms}}} with per-load means from earlier runs."""
+    try:
+        with open(path or weight_file()) as _f:
+            return json.load(_f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save(rows=None, path=None):
+    """Store this run's per-load means under the current mode, replacing the previous run's."""
+    rows = run_report.section(REPORT_SECTION) if rows is None else rows
+    if not rows:
+        return
+    path = path or weight_file()
+    with locked(path):
+        data = load(path)
+        data[mode()] = {page: _per_load(row) for page, row in rows.items()}
+        with open(path, "w") as _f:
+            json.dump(data, _f, indent=2, sort_keys=True)
+
+
+def _per_load(row):
+    loads = row["loads"] or 1
+    return {metric: row[metric] / loads for metric in ("requests", "bytes", "load_ms")}
+
+
+def format_report(rows):
+    """Terminal summary lines: mean weight per page load, and the saving against the other policy's last run."""
+    current = mode()
+    other = load().get(FULL if current == TRIMMED else TRIMMED, {})
+    lines = [f"policy: {current} ({len(blocked_urls())} blocked patterns, images "
+             f"{'off' if BLOCK_IMAGES else 'on'}, {'headless' if HEADLESS else 'headed'})"]
+    for page, row in sorted(rows.items(), key=lambda item: -item[1]["loads"]):
+        weight = _per_load(row)
+        line = (f"{page}: {int(row['loads'])} loads, {weight['requests']:.0f} requests, "
+                f"{weight['bytes'] / 1024:.0f} KiB, {weight['load_ms']:.0f} ms")
+        if page in other:
+            full, trimmed = (other[page], weight) if current == TRIMMED else (weight, other[page])
+            line += (f" | trimmed saves {full['requests'] - trimmed['requests']:.0f} requests, "
+                     f"{(full['bytes'] - trimmed['bytes']) / 1024:.0f} KiB, "
+                     f"{full['load_ms'] - trimmed['load_ms']:.0f} ms per load")
+        lines.append(line)
+    return lines
+
+
+run_report.register(REPORT_SECTION, "page weight", format_report)
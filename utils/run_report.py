@@ -0,0 +1,96 @@
+# utils/run_report.py
+"""
+Run-wide counters collected by the framework and printed in the pytest terminal summary.
+
+Counters are grouped as section -> key -> metric. Under pytest-xdist every worker keeps its
+own counters; conftest ships them to the controller through `workeroutput`, where they are
+merged before the summary is printed.
+"""
+import contextlib
+import threading
+from collections import defaultdict
+
+_LOCK = threading.Lock()
+
+
+def _new_counters():
+    return defaultdict(lambda: defaultdict(lambda: defaultdict(float)))
+
+
+_COUNTERS = _new_counters()
+_FORMATTERS = {}
+_TITLES = {}
+
+
+def add(section, key, **metrics):
+    """Add the given metric values to section/key."""
+    with _LOCK:
+        row = _COUNTERS[section][key]
+        for metric, value in metrics.items():
+            row[metric] += value
+
+
+def register(section, title, formatter=None):
+    """
+    Register a section for the terminal summary.
+    formatter receives {key: {metric: value}} and returns the lines to print.
+    """
+    _TITLES[section] = title
+    if formatter is not None:
+        _FORMATTERS[section] = formatter
+
+
+def snapshot():
+    """Return a plain-dict copy of every counter, safe to send over xdist's channel."""
+    with _LOCK:
+        return {
+            section: {key: dict(row) for key, row in rows.items()}
+            for section, rows in _COUNTERS.items()
+        }
+
+
+def merge(data):
+    """Merge a snapshot taken on another process into the local counters."""
+    for section, rows in (data or {}).items():
+        for key, row in rows.items():
+            add(section, key, **row)
+
+
+@contextlib.contextmanager
+def isolated():
+    """Collect into scratch counters that are dropped on exit, e.g. while a unit test drives fakes."""
+    global _COUNTERS
+    with _LOCK:
+        saved, _COUNTERS = _COUNTERS, _new_counters()
+    try:
+        yield
+    finally:
+        with _LOCK:
+            _COUNTERS = saved
+
+
+def section(name):
+    """Return {key: {metric: value}} for one section."""
+    return snapshot().get(name, {})
+
+
+def summary():
+    """Yield (title, lines) for every section that has data."""
+    data = snapshot()
+    for name, rows in data.items():
+        if not rows:
+            continue
+        formatter = _FORMATTERS.get(name, _default_formatter)
+        yield _TITLES.get(name, name), formatter(rows)
+
+
+def _default_formatter(rows):
+    lines = []
+    for key, row in sorted(rows.items()):
+        metrics = ", ".join(f"{metric}={_fmt(value)}" for metric, value in sorted(row.items()))
+        lines.append(f"{key}: {metrics}")
+    return lines
+
+
+def _fmt(value):
+    return f"{value:.0f}" if float(value).is_integer() else f"{value:.2f}"
@@ -0,0 +1,68 @@
+# utils/scheduling.py
+"""
+pytest-xdist scheduler that dispatches the longest tests first (LPT), using utils.duration_history.
+
+Enabled with `--dist=load --longest-first`. Tests are sorted by their expected duration and handed
+out one at a time to whichever worker frees up, keeping two queued per worker (a worker needs to
+know its next test before it can finish the current one).
+"""
+from xdist.scheduler import LoadScheduling
+
+from utils import duration_history
+
+# Tests queued per worker; xdist workers hold back their last test until they get another one
+QUEUED_PER_WORKER = 2
+
+
+class LongestFirstScheduling(LoadScheduling):
+    def __init__(self, config, log=None):
+        super().__init__(config, log)
+        self.expected = {}
+        self.expected_makespan = 0.0
+        self.workers = 0
+
+    def schedule(self):
+        assert self.collection_is_completed
+
+        # Initial distribution already happened, reschedule on all nodes
+        if self.collection is not None:
+            for node in self.nodes:
+                self.check_schedule(node)
+            return
+
+        if not self._check_nodes_have_same_collection():
+            self.log("**Different tests collected, aborting run**")
+            return
+
+        self.collection = next(iter(self.node2collection.values()))
+        self.expected = duration_history.expected_durations(self.collection)
+        # sorted() is stable, so tests without history keep their collection order
+        self.pending[:] = sorted(
+            range(len(self.collection)), key=lambda index: -self.expected[self.collection[index]]
+        )
+        self.workers = len(self.nodes)
+        self.expected_makespan = duration_history.plan_makespan(self.expected.values(), self.workers)
+        self.log(f"longest-first: expected makespan {self.expected_makespan:.1f}s on {self.workers} workers")
+        if not self.collection:
+            return
+
+        # Deal the longest tests round-robin so no worker starts with two of them
+        for _ in range(QUEUED_PER_WORKER):
+            for node in self.nodes:
+                self._send_tests(node, 1)
+
+        if not self.pending:
+            for node in self.nodes:
+                node.shutdown()
+
+    def check_schedule(self, node, duration=0):
+        """Top the node back up to QUEUED_PER_WORKER from the front (longest end) of the queue."""
+        if node.shutting_down:
+            return
+        if self.pending:
+            missing = QUEUED_PER_WORKER - len(self.node2pending[node])
+            if missing > 0:
+                self._send_tests(node, missing)
+        else:
+            node.shutdown()
+        self.log("num items waiting for node:", len(self.pending))
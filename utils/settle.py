@@ -0,0 +1,140 @@
+# utils/settle.py
+"""
+Event-driven "settle" detection used by BasePage.settle() in place of fixed sleeps.
+
+A small tracker is injected into the page once per document. It counts in-flight fetch/XHR
+requests and timestamps the latest DOM mutation, scroll movement and finite CSS animation
+(sampled every animation frame). The page is considered settled once the document is complete,
+nothing is in flight and nothing has changed for QUIET_MS.
+
+The tracker is injected by the first settle() on a document, not when it starts loading, so a
+request the page started before that is not counted. Only the DOM changes it causes when it
+completes, and the readyState for requests made during the load, cover it.
+
+SETTLE_MODE=sleep restores the old fixed sleeps for A/B comparison.
+SETTLE_REPORT=true prints, per call site, the time spent waiting and the time saved
+compared with the fixed sleep it replaced.
+"""
+from decouple import config
+
+from utils import run_report
+
+# -----------------------------------------------------------------------------
+# CONSTANTS
+# -----------------------------------------------------------------------------
+MODE = config('SETTLE_MODE', default='settle')
+REPORT = config('SETTLE_REPORT', default=False, cast=bool)
+QUIET_MS = config('SETTLE_QUIET_MS', default=250, cast=int)
+DEFAULT_TIMEOUT = config('SETTLE_TIMEOUT', default=5, cast=float)
+POLL_MS = 25
+REPORT_SECTION = "settle"
+
+TRACKER_SCRIPT = """
+(function () {
+    if (window.__pomSettle) { return; }
+    var state = window.__pomSettle = {pending: 0, lastActivity: performance.now()};
+    function touch() { state.lastActivity = performance.now(); }
+    function done() { state.pending = Math.max(0, state.pending - 1); touch(); }
+
+    if (window.fetch) {
+        var originalFetch = window.fetch;
+        window.fetch = function () {
+            state.pending++;
+            touch();
+            var request;
+            try {
+                request = originalFetch.apply(this, arguments);
+            } catch (e) {
+                done();
+                throw e;
+            }
+            request.then(done, done);
+            return request;
+        };
+    }
+    var originalSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        var xhr = this, sent = false, finished = false;
+        function finish() {
+            if (finished) { return; }
+            finished = true;
+            xhr.removeEventListener('loadend', finish);
+            done();
+        }
+        state.pending++;
+        touch();
+        xhr.addEventListener('loadend', finish);
+        try {
+            var result = originalSend.apply(xhr, arguments);
+            sent = true;
+            return result;
+        } finally {
+            // send() threw (e.g. the request was not opened): no loadend will come
+            if (!sent) { finish(); }
+        }
+    };
+
+    new MutationObserver(touch).observe(document.documentElement, {
+        childList: true, subtree: true, attributes: true, characterData: true
+    });
+
+    var lastScroll = window.scrollY;
+    (function frame() {
+        if (window.scrollY !== lastScroll) { lastScroll = window.scrollY; touch(); }
+        if (document.getAnimations) {
+            var running = document.getAnimations().some(function (animation) {
+                var timing = animation.effect && animation.effect.getTiming();
+                return animation.playState === 'running' && timing && timing.iterations !== Infinity;
+            });
+            if (running) { touch(); }
+        }
+        window.requestAnimationFrame(frame);
+    })();
+})();
+"""
+
+# Async script: arguments are (quiet_ms, max_wait_ms, poll_ms, callback)
+SETTLE_SCRIPT = TRACKER_SCRIPT + """
+var quietMs = arguments[0], maxWaitMs = arguments[1], pollMs = arguments[2];
+var callback = arguments[arguments.length - 1];
+var started = performance.now();
+(function check() {
+    var state = window.__pomSettle, now = performance.now();
+    if (document.readyState === 'complete' && state.pending === 0 && now - state.lastActivity >= quietMs) {
+        return callback({settled: true, waited: now - started});
+    }
+    if (now - started >= maxWaitMs) {
+        return callback({settled: false, waited: now - started, pending: state.pending});
+    }
+    setTimeout(check, pollMs);
+})();
+"""
+
+
+def record(call_site, waited, legacy_sleep, settled):
+    """Record one settle call when SETTLE_REPORT is on."""
+    if not REPORT:
+        return
+    run_report.add(
+        REPORT_SECTION, call_site,
+        calls=1, waited=waited, legacy=legacy_sleep, capped=0 if settled else 1
+    )
+
+
+def format_report(rows):
+    """Terminal summary lines for the settle section, biggest savings first."""
+    lines = []
+    total_saved = 0.0
+    for call_site, row in sorted(rows.items(), key=lambda item: item[1]["waited"] - item[1]["legacy"]):
+        saved = row["legacy"] - row["waited"]
+        total_saved += saved
+        lines.append(
+            f"{call_site}: {int(row['calls'])} calls, waited {row['waited']:.1f}s "
+            f"vs {row['legacy']:.1f}s of fixed sleeps -> saved {saved:.1f}s "
+            f"({int(row['capped'])} hit the cap)"
+        )
+    lines.append(f"total saved: {total_saved:.1f}s")
+    return lines
+
+
+run_report.register(REPORT_SECTION, "settle", format_report)
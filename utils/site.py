@@ -0,0 +1,34 @@
+# utils/site.py
+"""
+Where the site under test lives.
+
+CONNECTEAM_URL selects the site (default https://connecteam.com/). CONNECTEAM_URL=local starts the
+bundled stand-in from utils/local_site.py in this process and exports its real URL back to
+CONNECTEAM_URL, so pytest-xdist workers and other child processes reuse the same server.
+"""
+import os
+from urllib.parse import urljoin
+
+from decouple import config
+
+from utils.constants import Constant as CONST
+
+# -----------------------------------------------------------------------------
+# CONSTANTS
+# -----------------------------------------------------------------------------
+LOCAL = "local"
+
+
+def base_url():
+    """Base URL of the site under test, always ending with '/'."""
+    url = config('CONNECTEAM_URL', default=CONST.HOME_PAGE)
+    if url == LOCAL:
+        from utils import local_site
+        url = local_site.start_from_config()
+        os.environ['CONNECTEAM_URL'] = url
+    return url if url.endswith("/") else f"{url}/"
+
+
+def careers_url():
+    return urljoin(base_url(), "careers/")
+
@@ -0,0 +1,59 @@
+# utils/table_watch.py
+"""
+In-page watcher telling CareersPage whether the job table changed since the cards were harvested.
+
+WATCH_SCRIPT installs, once per document, a MutationObserver on the table holding the matched job
+cards. The observer counts the mutations that can move or replace cards: rows or cells added or removed,
+text changes, and `href`/`data-department` changes. Filtering by department only toggles classes and
+does not count. Each call returns `[token, generation]`, where token is new for every installed watcher,
+or null when no card is on the page. That costs one round trip, with no element handles involved.
+
+The job-card loop compares this with what it saw at harvest time. The same pair means the harvested
+cards are still valid. A different generation means it re-harvests and matches cards by href. A stale
+element with the table still present is re-resolved and retried once instead of reloading the page.
+Only a page without the table falls back to the full reload. The `job table` section of the terminal
+summary counts checks, re-harvests, retries and reloads.
+"""
+from utils import run_report
+
+# -----------------------------------------------------------------------------
+# CONSTANTS
+# -----------------------------------------------------------------------------
+REPORT_SECTION = "job_table"
+
+# arguments[0] is 'css' or 'xpath', arguments[1] the job card selector; expects matchElements()
+WATCH_SCRIPT = """
+var watch = window.__pomJobTable;
+if (!watch || !document.documentElement.contains(watch.root)) {
+    var card = matchElements(arguments[0], arguments[1])[0];
+    if (!card) { return null; }
+    var root = card.closest('table, [role="table"], [role="grid"]') || card.parentElement;
+    watch = window.__pomJobTable = {
+        root: root, generation: 0, token: Date.now().toString(36) + Math.random().toString(36).slice(2)
+    };
+    new MutationObserver(function (mutations) {
+        watch.generation += mutations.length;
+    }).observe(root, {
+        childList: true, subtree: true, characterData: true,
+        attributes: true, attributeFilter: ['href', 'data-department']
+    });
+}
+return [watch.token, watch.generation];
+"""
+
+
+def record(**metrics):
+    """Count table checks, re-resolutions and reloads (checks, reresolved, retried, gone, reloads)."""
+    run_report.add(REPORT_SECTION, "total", **metrics)
+
+
+def format_report(rows):
+    row = rows.get("total", {})
+    return [
+        f"{int(row.get('checks', 0))} table checks, {int(row.get('reresolved', 0))} re-harvests after a change",
+        f"{int(row.get('retried', 0))} stale cards retried in place, {int(row.get('gone', 0))} cards gone from "
+        f"the table, {int(row.get('reloads', 0))} full reloads",
+    ]
+
+
+run_report.register(REPORT_SECTION, "job table", format_report)
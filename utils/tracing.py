@@ -0,0 +1,263 @@
+# utils/tracing.py
+"""
+Nested timing spans for page-object methods, BasePage waits and Allure steps.
+
+With TRACE_SPANS=true every test gets a Chrome trace-event file in `reports/traces/` that opens in
+Perfetto (ui.perfetto.dev) or chrome://tracing, and a summary of its slowest spans attached to the
+Allure report. Spans are timed with the monotonic perf_counter_ns clock and kept per thread, so the
+browser sessions of a concurrent department run show up as separate tracks.
+
+When tracing is off @traced costs one attribute check per call and span() returns a shared no-op
+context manager.
+"""
+import contextlib
+import functools
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+import allure_commons
+from decouple import config
+
+LOGGER = logging.getLogger(__name__)
+
+# -----------------------------------------------------------------------------
+# CONSTANTS
+# -----------------------------------------------------------------------------
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_TRACE_DIR = os.path.join(PROJECT_ROOT, "reports", "traces")
+DEFAULT_TOP_N = 15
+UNSAFE_FILENAME_CHARS = re.compile(r"[^\w.\-\[\]&]+")
+
+# Span categories, shown as colours/filters in Perfetto
+PAGE = "page"
+WAIT = "wait"
+STEP = "allure"
+SCREENSHOT = "screenshot"
+SLEEP = "sleep"
+DRIVER = "driver"
+
+_NOOP = contextlib.nullcontext()
+
+
+class _State(threading.local):
+    """Per-thread stack of open spans; `paused` hides Allure steps replayed from a recorder."""
+    def __init__(self):
+        self.stack = []
+        self.paused = False
+
+
+class Tracer(object):
+    """Completed spans of one test, from every thread that worked on it."""
+    def __init__(self, name):
+        self.name = name
+        self.origin_ns = time.perf_counter_ns()
+        self.spans = []
+        self.threads = {}
+        self._lock = threading.Lock()
+
+    def add(self, name, category, start_ns, end_ns, depth, outer=True, args=None):
+        thread = threading.current_thread()
+        with self._lock:
+            self.threads.setdefault(thread.ident, thread.name)
+            self.spans.append({
+                "name": name, "cat": category, "start_ns": start_ns, "dur_ns": end_ns - start_ns,
+                "tid": thread.ident, "depth": depth, "outer": outer, "args": args or {},
+            })
+
+    def trace_events(self):
+        """Chrome trace-event format: one complete ('X') event per span, timestamps in microseconds."""
+        pid = os.getpid()
+        events = [
+            {"ph": "M", "name": "thread_name", "pid": pid, "tid": tid, "args": {"name": thread_name}}
+            for tid, thread_name in self.threads.items()
+        ]
+        events.extend(
+            {
+                "ph": "X", "name": span["name"], "cat": span["cat"], "pid": pid, "tid": span["tid"],
+                "ts": (span["start_ns"] - self.origin_ns) / 1000, "dur": span["dur_ns"] / 1000,
+                "args": {key: str(value) for key, value in span["args"].items()},
+            }
+            for span in sorted(self.spans, key=lambda span: (span["start_ns"], -span["dur_ns"]))
+        )
+        return events
+
+    def write(self, directory=None):
+        """Write the trace file for this test and return its path."""
+        directory = directory or config('TRACE_DIR', default=DEFAULT_TRACE_DIR)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{UNSAFE_FILENAME_CHARS.sub('_', self.name)}.trace.json")
+        with open(path, "w") as _f:
+            json.dump({"traceEvents": self.trace_events(), "displayTimeUnit": "ms",
+                       "otherData": {"test": self.name}}, _f)
+        return path
+
+    def summary(self, top_n=None):
+        """Text summary: the slowest individual spans, then total time per span name and per category."""
+        top_n = top_n or config('TRACE_TOP_N', default=DEFAULT_TOP_N, cast=int)
+        lines = [f"Slowest {top_n} spans of {self.name}:"]
+        for span in sorted(self.spans, key=lambda span: -span["dur_ns"])[:top_n]:
+            lines.append(f"  {span['dur_ns'] / 1e9:8.3f}s  {'  ' * span['depth']}{span['name']} [{span['cat']}]")
+
+        totals = {}
+        categories = {}
+        for span in self.spans:
+            count, seconds = totals.get(span["name"], (0, 0.0))
+            totals[span["name"]] = (count + 1, seconds + span["dur_ns"] / 1e9)
+            # Only outermost spans of a category count, so nested waits aren't added twice
+            if span["outer"]:
+                categories[span["cat"]] = categories.get(span["cat"], 0.0) + span["dur_ns"] / 1e9
+        lines.append("Total time per span:")
+        for name, (count, seconds) in sorted(totals.items(), key=lambda item: -item[1][1])[:top_n]:
+            lines.append(f"  {seconds:8.3f}s  {count:4d}x  {name}")
+        lines.append("Total time per category: " + ", ".join(
+            f"{category} {seconds:.1f}s" for category, seconds in sorted(categories.items(), key=lambda item: -item[1])
+        ))
+        return "\n".join(lines)
+
+
+class _AllureStepListener(object):
+    """Allure plugin that turns every allure.step into a span."""
+    def __init__(self):
+        self._open = {}
+
+    @allure_commons.hookimpl
+    def start_step(self, uuid, title, params):
+        if _ACTIVE["tracer"] is not None and not _THREAD.paused:
+            self._open[uuid] = _open_span(title, STEP, {})
+
+    @allure_commons.hookimpl
+    def stop_step(self, uuid, exc_type, exc_val, exc_tb):
+        opened = self._open.pop(uuid, None)
+        if opened is not None:
+            _close_span(opened, exc_type)
+
+
+_THREAD = _State()
+_ACTIVE = {"enabled": False, "tracer": None, "listener": None}
+
+
+def enabled():
+    return _ACTIVE["enabled"]
+
+
+def enable():
+    """Turn tracing on for this process and start listening to Allure steps."""
+    if _ACTIVE["listener"] is None:
+        _ACTIVE["listener"] = _AllureStepListener()
+        allure_commons.plugin_manager.register(_ACTIVE["listener"])
+    _ACTIVE["enabled"] = True
+
+
+def disable():
+    _ACTIVE["enabled"] = False
+    _ACTIVE["tracer"] = None
+
+
+def configure():
+    """Enable tracing when TRACE_SPANS is set."""
+    if config('TRACE_SPANS', default=False, cast=bool):
+        enable()
+    return enabled()
+
+
+def start_test(name):
+    """Begin collecting spans for a test. Returns the Tracer, or None when tracing is off."""
+    if not _ACTIVE["enabled"]:
+        return None
+    _ACTIVE["tracer"] = Tracer(name)
+    return _ACTIVE["tracer"]
+
+
+def finish_test():
+    """Stop collecting spans and return the finished Tracer (None when tracing is off)."""
+    tracer, _ACTIVE["tracer"] = _ACTIVE["tracer"], None
+    return tracer
+
+
+def current_span():
+    """Name of the innermost open span on this thread, or None."""
+    return _THREAD.stack[-1]["name"] if _THREAD.stack else None
+
+
+def open_spans(category=None):
+    """Names of the open spans on this thread, outermost first, optionally of one category."""
+    return [opened["name"] for opened in _THREAD.stack if category is None or opened["cat"] == category]
+
+
+def span(name, category=PAGE, **args):
+    """`with span(name):` times the block as a span nested under the current one."""
+    if _ACTIVE["tracer"] is None:
+        return _NOOP
+    return _span(name, category, args)
+
+
+@contextlib.contextmanager
+def _span(name, category, args):
+    opened = _open_span(name, category, args)
+    exc_type = None
+    try:
+        yield
+    except BaseException as e:
+        exc_type = type(e)
+        raise
+    finally:
+        _close_span(opened, exc_type)
+
+
+@contextlib.contextmanager
+def paused():
+    """Ignore Allure steps on this thread, e.g. while DeferredAllure replays already traced steps."""
+    previous, _THREAD.paused = _THREAD.paused, True
+    try:
+        yield
+    finally:
+        _THREAD.paused = previous
+
+
+def traced(func=None, name=None, category=PAGE):
+    """
+    Decorator recording each call as a span named after the method (e.g. 'BasePage.wait_element').
+    Usable bare (@traced) or with arguments (@traced(category=tracing.WAIT)).
+    """
+    if func is None:
+        return functools.partial(traced, name=name, category=category)
+    span_name = name or func.__qualname__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if _ACTIVE["tracer"] is None:
+            return func(*args, **kwargs)
+        with _span(span_name, category, {}):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def _open_span(name, category, args):
+    outer = not any(opened["cat"] == category for opened in _THREAD.stack)
+    opened = {"name": name, "cat": category, "args": args, "outer": outer,
+              "tracer": _ACTIVE["tracer"], "depth": len(_THREAD.stack), "start_ns": time.perf_counter_ns()}
+    _THREAD.stack.append(opened)
+    return opened
+
+
+def _close_span(opened, exc_type=None):
+    end_ns = time.perf_counter_ns()
+    if opened in _THREAD.stack:
+        # Pop it and anything opened inside it that was never closed
+        del _THREAD.stack[_THREAD.stack.index(opened):]
+    args = opened["args"]
+    if exc_type is not None:
+        args = dict(args, error=exc_type.__name__)
+    tracer = opened["tracer"]
+    if tracer is not None:
+        tracer.add(opened["name"], opened["cat"], opened["start_ns"], end_ns, opened["depth"], opened["outer"], args)
+
+
+def sleep(seconds):
+    """time.sleep that shows up as a span, so fixed sleeps stand out in the trace."""
+    with span("time.sleep", SLEEP, seconds=seconds):
+        time.sleep(seconds)
@@ -0,0 +1,127 @@
+# utils/wait_engine.py
+"""
+Explicit-wait engine used by BasePage when the implicit wait is switched off.
+
+With an implicit wait, chromedriver blocks every find_element/find_elements that has no match
+for up to IMPLICIT_WAIT seconds, including each poll of a WebDriverWait. A negative check such as
+`is_element_present(..., timeout=10)` then costs its own timeout plus up to 20 s per poll.
+
+With WAIT_MODE=explicit new sessions get an implicit wait of 0. The BasePage waits then go
+through poll(): the element and its state (present / visible / clickable) are checked in one
+in-page script per poll, and the polls start short and back off. WAIT_MODE=implicit (the default)
+keeps the old behaviour for comparison.
+
+WAIT_REPORT=true prints how long negative lookups (checks and lookups that found nothing) took
+against the timeout they were given. The time above the timeout is what the implicit wait added.
+"""
+import time
+
+from decouple import config
+from selenium.common.exceptions import (
+    JavascriptException,
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException
+)
+
+from utils import deadline, run_report
+
+# -----------------------------------------------------------------------------
+# CONSTANTS
+# -----------------------------------------------------------------------------
+MODE = config('WAIT_MODE', default='implicit')
+IMPLICIT_WAIT = config('IMPLICIT_WAIT', default=20, cast=float)
+POLL_START = config('WAIT_POLL_START', default=0.05, cast=float)
+POLL_MAX = config('WAIT_POLL_MAX', default=0.5, cast=float)
+POLL_BACKOFF = config('WAIT_POLL_BACKOFF', default=1.5, cast=float)
+REPORT = config('WAIT_REPORT', default=False, cast=bool)
+REPORT_SECTION = "negative_lookups"
+SUMMARY_ROWS = 15
+
+# Element states checked in the page, see BasePage.ELEMENT_STATE_SCRIPT
+PRESENT = "present"
+VISIBLE = "visible"
+CLICKABLE = "clickable"
+
+# A poll that hits a node replaced by a re-render is retried
+IGNORED_EXCEPTIONS = (NoSuchElementException, StaleElementReferenceException)
+# ... and so is a first poll that runs into the previous document being unloaded. After that a script
+# error is the script's own (e.g. an invalid selector) and is raised rather than polled until the timeout.
+FIRST_POLL_EXCEPTIONS = (JavascriptException,)
+
+
+def explicit():
+    return MODE == "explicit"
+
+
+def implicit_wait(default=None):
+    """Implicit wait (seconds) for new sessions: 0 in explicit mode, else default or IMPLICIT_WAIT."""
+    if explicit():
+        return 0
+    return IMPLICIT_WAIT if default is None else default
+
+
+def intervals(start=None, maximum=None, backoff=None):
+    """Poll intervals: start, start * backoff, ... capped at maximum."""
+    interval = start or POLL_START
+    maximum = maximum or POLL_MAX
+    backoff = backoff or POLL_BACKOFF
+    while True:
+        yield interval
+        interval = min(interval * backoff, maximum)
+
+
+def poll(driver, condition, timeout, label, message="", ignored_exceptions=IGNORED_EXCEPTIONS):
+    """
+    Call condition(driver) until it returns something truthy and return that value.
+    Raises TimeoutException(message) after timeout seconds, clamped to the active time budget.
+    """
+    with deadline.waiting(label, timeout) as timeout:
+        end_time = time.monotonic() + timeout
+        delays = intervals()
+        first_poll = True
+        while True:
+            try:
+                value = condition(driver)
+                if value:
+                    return value
+            except ignored_exceptions:
+                pass
+            except FIRST_POLL_EXCEPTIONS:
+                if not first_poll:
+                    raise
+            first_poll = False
+            remaining = end_time - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutException(message)
+            time.sleep(min(next(delays), remaining))
+
+
+def record_negative(key, seconds, timeout):
+    """Record a lookup that found nothing, with the timeout it was allowed (0 for a plain find)."""
+    if not REPORT:
+        return
+    run_report.add(REPORT_SECTION, key, calls=1, seconds=seconds, timeout=timeout or 0)
+
+
+def format_report(rows):
+    """Terminal summary lines: negative lookups, slowest first, with the time spent above their timeout."""
+    if explicit():
+        lines = [f"mode: explicit (implicit wait 0s, polls {POLL_START:g}s -> {POLL_MAX:g}s, x{POLL_BACKOFF:g})"]
+    else:
+        lines = [f"mode: implicit (implicit wait {IMPLICIT_WAIT:g}s)"]
+    total_seconds = total_excess = 0.0
+    for key, row in sorted(rows.items(), key=lambda item: -item[1]["seconds"]):
+        excess = max(row["seconds"] - row["timeout"], 0.0)
+        total_seconds += row["seconds"]
+        total_excess += excess
+        if len(lines) <= SUMMARY_ROWS:
+            lines.append(
+                f"{key}: {int(row['calls'])} calls, {row['seconds']:.1f}s "
+                f"(timeouts {row['timeout']:.1f}s, {excess:.1f}s over)"
+            )
+    lines.append(f"total: {total_seconds:.1f}s in negative lookups, {total_excess:.1f}s over their timeouts")
+    return lines
+
+
+run_report.register(REPORT_SECTION, "negative lookups", format_report)
@@ -0,0 +1,212 @@
+# utils/wire_stats.py
+"""
+Count and time every WebDriver wire-protocol command a test sends.
+
+Each find_element, .text, execute_script or screenshot is one HTTP round trip to the driver.
+With WIRE_STATS=true, sessions launched by utils.driver_factory.create_driver have their
+RemoteConnection wrapped so every command is recorded with its latency and payload sizes, and
+attributed to the page-object method that issued it: the innermost method of a page class
+(e.g. 'PositionPage.fill_up_position_form'), or the BasePage method called directly from a test,
+or otherwise the innermost project function (a fixture, DriverPool.reset, the test itself).
+Wrappers other modules put around the session (see passthrough()) are never what a command is
+attributed to.
+
+Per test the rollup is written to `reports/wire/<test id>.json`; the run-wide rollup per
+page-object method is printed in the terminal summary.
+"""
+import functools
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+
+from decouple import config
+
+from utils import run_report, tracing
+
+LOGGER = logging.getLogger(__name__)
+
+# -----------------------------------------------------------------------------
+# CONSTANTS
+# -----------------------------------------------------------------------------
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES_DIR = os.path.join(PROJECT_ROOT, "pages") + os.sep
+BASE_PAGE_FILE = os.path.join(PAGES_DIR, "base_page.py")
+# Decorator wrappers and this module are never what a command gets attributed to
+SKIPPED_FILES = {
+    os.path.join(PROJECT_ROOT, "utils", name) for name in ("wire_stats.py", "tracing.py", "decorators.py")
+}
+DEFAULT_WIRE_DIR = os.path.join(PROJECT_ROOT, "reports", "wire")
+REPORT_SECTION = "wire_protocol"
+TEST_CODE = "test code"
+SUMMARY_ROWS = 15
+UNSAFE_FILENAME_CHARS = re.compile(r"[^\w.\-\[\]&]+")
+
+_LOCK = threading.Lock()
+_ACTIVE = {"test": None}
+# Code of functions that wrap a session's executor or methods and only pass commands on
+_PASSTHROUGH = set()
+
+
+class TestWireStats(object):
+    """Commands of one test: {method: {command: {count, seconds, bytes_sent, bytes_received}}}."""
+    def __init__(self, name):
+        self.name = name
+        self.methods = {}
+
+    def add(self, method, command, seconds, bytes_sent, bytes_received):
+        with _LOCK:
+            row = self.methods.setdefault(method, {}).setdefault(
+                command, {"count": 0, "seconds": 0.0, "bytes_sent": 0, "bytes_received": 0}
+            )
+            row["count"] += 1
+            row["seconds"] += seconds
+            row["bytes_sent"] += bytes_sent
+            row["bytes_received"] += bytes_received
+
+    def to_dict(self):
+        with _LOCK:
+            methods = {
+                method: {
+                    "count": sum(row["count"] for row in commands.values()),
+                    "seconds": round(sum(row["seconds"] for row in commands.values()), 4),
+                    "commands": {command: dict(row, seconds=round(row["seconds"], 4))
+                                 for command, row in commands.items()},
+                }
+                for method, commands in self.methods.items()
+            }
+        return {
+            "test": self.name,
+            "count": sum(method["count"] for method in methods.values()),
+            "seconds": round(sum(method["seconds"] for method in methods.values()), 4),
+            "methods": methods,
+        }
+
+    def write(self, directory=None):
+        """Write the rollup of this test and return its path."""
+        directory = directory or config('WIRE_STATS_DIR', default=DEFAULT_WIRE_DIR)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{UNSAFE_FILENAME_CHARS.sub('_', self.name)}.json")
+        with open(path, "w") as _f:
+            json.dump(self.to_dict(), _f, indent=2)
+        return path
+
+
+def enabled():
+    return config('WIRE_STATS', default=False, cast=bool)
+
+
+def instrument(driver):
+    """Record every command sent by driver. Safe to call more than once on the same session."""
+    executor = driver.command_executor
+    if getattr(executor, "_wire_stats_wrapped", False):
+        return driver
+    executor.execute = functools.partial(_execute, executor.execute)
+    executor._wire_stats_wrapped = True
+    return driver
+
+
+def passthrough(func):
+    """Register func as a wrapper around a session that only passes commands on; returns func."""
+    _PASSTHROUGH.add(func.__code__)
+    return func
+
+
+def start_test(name):
+    _ACTIVE["test"] = TestWireStats(name)
+    return _ACTIVE["test"]
+
+
+def finish_test():
+    """Stop attributing commands to the current test and return its TestWireStats (or None)."""
+    stats, _ACTIVE["test"] = _ACTIVE["test"], None
+    return stats
+
+
+def record(method, command, seconds, bytes_sent=0, bytes_received=0):
+    """Add one command to the run-wide counters and to the current test."""
+    run_report.add(REPORT_SECTION, method, commands=1, seconds=seconds, bytes_sent=bytes_sent,
+                   bytes_received=bytes_received, **{f"command:{command}": 1})
+    stats = _ACTIVE["test"]
+    if stats is not None:
+        stats.add(method, command, seconds, bytes_sent, bytes_received)
+
+
+def attribute(frame):
+    """Name of the page-object method a command issued from frame belongs to (see module docstring)."""
+    outermost_base = None
+    innermost_project = None
+    while frame is not None:
+        if frame.f_code in _PASSTHROUGH:
+            frame = frame.f_back
+            continue
+        filename = frame.f_code.co_filename
+        if filename.startswith(PAGES_DIR):
+            if filename != BASE_PAGE_FILE:
+                return _qualname(frame)
+            outermost_base = _qualname(frame)
+        elif innermost_project is None and filename.startswith(PROJECT_ROOT) and filename not in SKIPPED_FILES:
+            innermost_project = _qualname(frame)
+        frame = frame.f_back
+    return outermost_base or innermost_project or TEST_CODE
+
+
+def _execute(execute, command, params=None):
+    # Sized before sending; RemoteConnection removes URL parameters from params in place
+    bytes_sent = _size(params)
+    method = attribute(sys._getframe(1))
+    start_time = time.perf_counter()
+    try:
+        with tracing.span(command, tracing.DRIVER):
+            response = execute(command, params)
+    except Exception:
+        record(method, command, time.perf_counter() - start_time, bytes_sent)
+        raise
+    record(method, command, time.perf_counter() - start_time, bytes_sent,
+           _size(response.get("value") if isinstance(response, dict) else response))
+    return response
+
+
+def _size(payload):
+    if not payload:
+        return 0
+    if isinstance(payload, str):
+        return len(payload)
+    try:
+        return len(json.dumps(payload, separators=(",", ":"), default=str))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _qualname(frame):
+    qualname = getattr(frame.f_code, "co_qualname", None)
+    if qualname:
+        return qualname
+    instance = frame.f_locals.get("self")
+    if instance is None:
+        return frame.f_code.co_name
+    return f"{type(instance).__name__}.{frame.f_code.co_name}"
+
+
+def format_report(rows):
+    """Terminal summary lines: commands and time per page-object method, chattiest first."""
+    lines = []
+    for method, row in sorted(rows.items(), key=lambda item: -item[1].get("seconds", 0.0))[:SUMMARY_ROWS]:
+        commands = sorted(
+            ((metric[len("command:"):], count) for metric, count in row.items() if metric.startswith("command:")),
+            key=lambda item: -item[1]
+        )
+        top = ", ".join(f"{command} {int(count)}" for command, count in commands[:3])
+        lines.append(
+            f"{method}: {int(row.get('commands', 0))} commands, {row.get('seconds', 0.0):.1f} s, "
+            f"{row.get('bytes_received', 0) / 1024:.0f} KiB received ({top})"
+        )
+    if len(rows) > SUMMARY_ROWS:
+        lines.append(f"... {len(rows) - SUMMARY_ROWS} more in reports/wire/")
+    return lines
+
+
+run_report.register(REPORT_SECTION, "webdriver commands", format_report)